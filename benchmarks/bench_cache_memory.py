@@ -0,0 +1,64 @@
+# ✅ 메타데이터 캐시 메모리 비교 (전체 레코드 dict vs title 인덱스 + LRU) 및 조회 비용
+# 실행: python -m benchmarks.bench_cache_memory
+import os
+import random
+import shutil
+import tempfile
+import timeit
+import tracemalloc
+
+import pandas as pd
+
+from lib.metadata.metadata_cache import CACHE_COLUMNS, MetadataCache, IndexedMetadataCache
+
+CACHE_PATH = './cache/metadata_cache.csv'
+CACHE_SIZES = [1_324, 10_000, 50_000]
+TITLES_PER_RUN = 400  # 하루 실행에서 실제로 조회하는 제목 수 (채널 17개 × 중복 제외 제목)
+LOOKUPS = 5_000
+
+
+def make_cache_csv(base, size, path):
+    # 실제 캐시 행을 반복해 제목만 바꾼 size 행 CSV
+    rows = base.sample(n=size, replace=size > len(base), random_state=0).reset_index(drop=True)
+    rows['title'] = [f"{title} {i}" for i, title in enumerate(rows['title'])]
+    rows[CACHE_COLUMNS].to_csv(path, index=False, encoding='utf-8-sig')
+    return rows['title'].tolist()
+
+
+def measure(factory):
+    tracemalloc.start()
+    cache = factory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cache, current
+
+
+def main():
+    random.seed(0)
+    base = pd.read_csv(CACHE_PATH, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+    root = tempfile.mkdtemp(prefix='bench_cache_')
+    try:
+        print(f"{'cache size':>10} | {'file (MB)':>9} | {'dict (MB)':>9} | {'indexed (MB)':>12} | "
+              f"{'dict get (us)':>13} | {'indexed get (us)':>16}")
+        for size in CACHE_SIZES:
+            path = os.path.join(root, f"cache_{size}.csv")
+            titles = make_cache_csv(base, size, path)
+            full, full_bytes = measure(lambda: MetadataCache(path))
+            indexed, indexed_bytes = measure(lambda: IndexedMetadataCache(path))
+
+            # 실행 하나가 조회하는 제목들 (반복 조회 포함)
+            hot = random.sample(titles, min(TITLES_PER_RUN, len(titles)))
+            lookups = [random.choice(hot) for _ in range(LOOKUPS)]
+            assert all(full.get(t)['description'] == indexed.get(t)['description'] for t in hot)
+
+            full_us = min(timeit.repeat(lambda: [full.get(t) for t in lookups], number=1, repeat=3)) / LOOKUPS * 1e6
+            indexed_us = min(timeit.repeat(lambda: [indexed.get(t) for t in lookups], number=1, repeat=3)) / LOOKUPS * 1e6
+            print(f"{size:>10,} | {os.path.getsize(path) / 1e6:>9.1f} | {full_bytes / 1e6:>9.1f} | "
+                  f"{indexed_bytes / 1e6:>12.1f} | {full_us:>13.2f} | {indexed_us:>16.2f}")
+            indexed.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
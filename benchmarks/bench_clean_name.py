@@ -0,0 +1,116 @@
+# ✅ 제목 정제 비용 비교 (기존 re.sub 체인 vs 사전 컴파일 + LRU 메모 + Series 배치)
+# 결과 검증은 tests/test_text_cleaning.py 가 golden 파일로 수행
+# 실행: python -m benchmarks.bench_clean_name            (벤치마크)
+#       python -m benchmarks.bench_clean_name --update   (기존 구현으로 golden 파일 재생성)
+import os
+import re
+import sys
+import timeit
+
+import pandas as pd
+
+from lib.utils.text_cleaning import clean_name, split_episode, split_episodes
+
+CACHE_PATH = './cache/metadata_cache.csv'
+GOLDEN_PATH = './benchmarks/golden/clean_name.csv'
+SCHEDULE_REPEAT = 20  # 같은 제목이 여러 채널/시간대에 반복되는 편성표 흉내
+
+
+def legacy_clean_name(text):
+    # 변경 전 text_cleaning.clean_name (호출마다 패턴 조회)
+    text = re.sub(r'\([^)]*\)', '', text)
+    text = re.sub(r'\[[^]]*\]', '', text)
+    text = re.sub(r'〈.*?〉', '', text)
+    text = re.sub(r'\<.*?\>', '', text)
+
+    text = re.sub(r'\b(수목드라마|월화드라마|일일드라마|주말드라마|재방송|특별판|스페셜|본방송|본|재|특집|종영|마지막회|최종화|HD|SD|NEW|다시보기)\b', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\d+부', '', text)
+
+    text = re.sub(r'[“”"\':\-|·,~!@#$%^&*+=]+', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+
+    text = re.sub(r'([가-힣])\s+([A-Za-z])', r'\1\2', text)
+    text = re.sub(r'([A-Za-z])\s+([가-힣])', r'\1\2', text)
+
+    text = text.strip("()[]〈〉 ")
+    return text.strip()
+
+
+def legacy_split_episode(raw_title):
+    # 변경 전 Crawler 의 회차 분리
+    match = re.search(r'(\d{1,4}회)', raw_title)
+    episode = match.group(1) if match else ''
+    return legacy_clean_name(raw_title.replace(episode, '').strip()), episode
+
+
+def load_inputs():
+    # 캐시 제목 + 편성표에서 보이는 형태(회차 / 재방송 / 화질 표기)로 변형한 제목
+    titles = pd.read_csv(CACHE_PATH, encoding='utf-8-sig')['title'].dropna().astype(str).tolist()
+    inputs = []
+    for i, title in enumerate(titles):
+        inputs.append(title)
+        inputs.append(f"{title} {i % 120 + 1}회")
+        inputs.append(f"(재) {title} [HD]")
+    return inputs
+
+
+def write_golden(inputs):
+    rows = []
+    for raw in inputs:
+        title, episode = legacy_split_episode(raw)
+        rows.append({'input': raw, 'clean_name': legacy_clean_name(raw), 'title': title, 'episode': episode})
+    os.makedirs(os.path.dirname(GOLDEN_PATH), exist_ok=True)
+    pd.DataFrame(rows).to_csv(GOLDEN_PATH, index=False, encoding='utf-8-sig')
+    print(f"[golden 저장] {GOLDEN_PATH} ({len(rows)}건)")
+
+
+def bench(inputs):
+    schedule = inputs * SCHEDULE_REPEAT
+    series = pd.Series(schedule)
+    n = len(schedule)
+
+    def legacy():
+        for raw in schedule:
+            legacy_split_episode(raw)
+
+    def compiled_cold():
+        # 메모 없이 사전 컴파일 패턴만의 효과
+        for raw in schedule:
+            match = re.search(r'(\d{1,4}회)', raw)
+            episode = match.group(1) if match else ''
+            clean_name.__wrapped__(raw.replace(episode, '').strip())
+
+    def memoized():
+        split_episode.cache_clear()
+        clean_name.cache_clear()
+        for raw in schedule:
+            split_episode(raw)
+
+    def batch():
+        split_episode.cache_clear()
+        clean_name.cache_clear()
+        split_episodes(series)
+
+    print(f"[벤치마크] 제목 {n:,}건 (고유 {len(set(schedule)):,}건)")
+    print(f"{'variant':>28} | {'us/title':>9} | {'speedup':>8}")
+    base = None
+    for name, fn in [
+        ('legacy re.sub chain', legacy),
+        ('precompiled (no memo)', compiled_cold),
+        ('precompiled + LRU memo', memoized),
+        ('Series batch (factorize)', batch),
+    ]:
+        us = min(timeit.repeat(fn, number=1, repeat=3)) / n * 1e6
+        base = base or us
+        print(f"{name:>28} | {us:>9.2f} | {base / us:>7.1f}x")
+
+
+def main():
+    if '--update' in sys.argv:
+        write_golden(load_inputs())
+        return
+    bench(load_inputs())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+# ✅ 로컬 스텁 서버로 Crawler.run 전체를 실행하는 end-to-end 벤치마크
+# - 부모 프로세스: 스텁 서버(편성표/TMDb/네이버/Gemini) 기동 + 설정별 자식 프로세스 실행 + 결과 표/JSON
+# - 자식 프로세스: 임시 작업 디렉터리(빈 캐시)에서 Crawler.run → 단계별 시간, 외부 호출 수, peak RSS 보고
+# 실행 예:
+#   python -m benchmarks.bench_end_to_end --channels 10 --slots 48 --engine thread,async --mode default,pipeline
+#   python -m benchmarks.bench_end_to_end --unthrottled --json result.json
+#   python -m benchmarks.bench_end_to_end --baseline result.json --tolerance 0.2   (느려지면 exit 1)
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import itertools
+import threading
+import subprocess
+from collections import defaultdict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = 'BENCH_RESULT '
+STAGES = ['schedule', 'enrich', 'write_channel', 'save', 'cache_save']
+SERVICES = ['schedule', 'tmdb', 'naver', 'gemini']
+DEFAULT_LATENCY = 'schedule=0.05,tmdb=0.05,naver=0.15,gemini=0.8'
+
+
+def parse_pairs(text, cast=float):
+    # 'tmdb=0.05,gemini=0.8' → {'tmdb': 0.05, 'gemini': 0.8}
+    pairs = {}
+    for item in filter(None, (text or '').split(',')):
+        key, value = item.split('=')
+        pairs[key.strip()] = cast(value)
+    return pairs
+
+
+# ---------------------------------------------------------------------------
+# 자식 프로세스
+# ---------------------------------------------------------------------------
+
+class StageTimer:
+    # 메서드를 감싸 단계별 누적 시간(스레드 합) 측정 — 같은 단계 안에서 중첩 호출은 바깥만 계산
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def wrap(self, stage, fn):
+        def wrapper(*args, **kwargs):
+            depth = getattr(self._local, stage, 0)
+            setattr(self._local, stage, depth + 1)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                setattr(self._local, stage, depth)
+                if depth == 0:
+                    with self._lock:
+                        self.seconds[stage] += time.perf_counter() - start
+                        self.calls[stage] += 1
+        return wrapper
+
+
+def run_worker(config):
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(config['workdir'])
+    os.makedirs('./ifitv_crawler/data_crawling_tmdb_gemini', exist_ok=True)
+    os.makedirs('./ifitv_crawler/cache', exist_ok=True)
+
+    import resource
+    from modules.crawler import Crawler
+    from lib.utils import rate_limit
+
+    class BenchCrawler(Crawler):
+        def setup_driver(self):
+            # 브라우저 없이 측정할 때는 Selenium fallback 이 바로 실패하도록
+            if not config['browser']:
+                raise RuntimeError("벤치마크: 브라우저 비활성화 (--browser 로 사용)")
+            return super().setup_driver()
+
+    crawler = BenchCrawler(
+        max_workers=config['max_workers'],
+        channel_list=config['channels'],
+        schedule_source=config['schedule'],
+        cache_backend=config['cache'],
+        pipeline=config['mode'] == 'pipeline',
+        metadata_engine=config['engine'],
+    )
+
+    timer = StageTimer()
+    source = crawler.schedule_source
+    if source is not None:
+        for name in ['fetch', 'fetch_many', 'fetch_days']:
+            setattr(source, name, timer.wrap('schedule', getattr(source, name)))
+    for name in ['scrape_channel_days', 'scrape_channel_schedule', 'iter_channel_schedules']:
+        setattr(crawler, name, timer.wrap('schedule', getattr(crawler, name)))
+    for stage, name in [('enrich', 'enrich_leaders'), ('write_channel', 'write_channel_programs'),
+                        ('save', 'save_final_program_data'), ('cache_save', 'update_metadata_cache')]:
+        setattr(crawler, name, timer.wrap(stage, getattr(crawler, name)))
+
+    rows = {}
+    original_save = crawler.save_final_program_data
+
+    def counting_save(all_data, filename, *args, **kwargs):
+        rows[filename] = len(all_data)
+        return original_save(all_data, filename, *args, **kwargs)
+    crawler.save_final_program_data = counting_save
+
+    start = time.perf_counter()
+    crawler.run(config['days'])
+    wall = time.perf_counter() - start
+
+    limiters = {
+        source_name: {'calls': limiter.calls, 'retried': limiter.retried}
+        for source_name, limiter in rate_limit._limiters.items()
+    }
+    result = {
+        'wall': wall,
+        'stages': dict(timer.seconds),
+        'stage_calls': dict(timer.calls),
+        'rows': sum(rows.values()),
+        'files': len(rows),
+        'titles_fetched': crawler.metadata_flight.leader_count,
+        'titles_shared': crawler.metadata_flight.shared_count,
+        'limiters': limiters,
+        # 실행 리포트(RunMetrics)의 소스별 요청 지연 분포 / 제한 대기
+        'source_latency': {
+            entry['labels']['source']: {key: entry[key] for key in ['count', 'p50', 'p95', 'max']}
+            for entry in crawler.metrics.report()['histograms'] if entry['name'] == 'source_request_seconds'
+        },
+        'source_wait': {
+            entry['labels']['source']: entry['sum']
+            for entry in crawler.metrics.report()['histograms'] if entry['name'] == 'source_wait_seconds'
+        },
+        # Linux 는 KB 단위 (이 프로세스만, 브라우저 자식 프로세스 제외)
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    print(RESULT_PREFIX + json.dumps(result))
+
+
+# ---------------------------------------------------------------------------
+# 부모 프로세스
+# ---------------------------------------------------------------------------
+
+def run_config(name, config, services, env, verbose):
+    before = {key: dict(service.counts) for key, service in services.items()}
+    workdir = tempfile.mkdtemp(prefix='bench_e2e_')
+    config = {**config, 'workdir': workdir}
+    try:
+        proc = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_end_to_end', '--worker', json.dumps(config)],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if verbose or proc.returncode != 0:
+        print(proc.stdout[-20000:])
+        print(proc.stderr[-5000:], file=sys.stderr)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"[{name}] 벤치마크 실행 실패 (exit {proc.returncode})")
+
+    result = json.loads(lines[-1][len(RESULT_PREFIX):])
+    result['external'] = {
+        key: {
+            count_key: value - before[key].get(count_key, 0)
+            for count_key, value in service.counts.items()
+            if value - before[key].get(count_key, 0)
+        }
+        for key, service in services.items()
+    }
+    return result
+
+
+def print_results(results):
+    header = (f"{'config':<28} | {'wall (s)':>8} | " + ' | '.join(f"{s:>8}" for s in ['sched', 'enrich', 'write', 'save'])
+              + f" | {'rows':>6} | {'fetched':>7} | " + ' | '.join(f"{s:>8}" for s in SERVICES)
+              + f" | {'errors':>6} | {'RSS (MB)':>8}")
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        stages = result['stages']
+        external = result['external']
+        print(
+            f"{name:<28} | {result['wall']:>8.2f} | "
+            + ' | '.join(f"{stages.get(stage, 0.0):>8.2f}" for stage in ['schedule', 'enrich', 'write_channel', 'save'])
+            + f" | {result['rows']:>6} | {result['titles_fetched']:>7} | "
+            + ' | '.join(f"{external.get(service, {}).get('requests', 0):>8}" for service in SERVICES)
+            + f" | {sum(external.get(service, {}).get('errors', 0) for service in SERVICES):>6}"
+            + f" | {result['peak_rss_mb']:>8.1f}"
+        )
+    print("(단계 시간은 스레드 누적 초, 외부 호출 수는 스텁 서버가 받은 요청 수 — 재시도 포함)")
+
+    # 소스별 요청 지연 (실행 리포트 기준): p50 / p95, 제한 대기 합계
+    print()
+    header = f"{'config':<28} | " + ' | '.join(f"{service + ' p50/p95 (wait)':>26}" for service in SERVICES)
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        cells = []
+        for service in SERVICES:
+            latency = result.get('source_latency', {}).get(service)
+            wait = result.get('source_wait', {}).get(service, 0.0)
+            cells.append(f"{latency['p50']:.3f}/{latency['p95']:.3f} ({wait:.1f}s)" if latency else '-')
+        print(f"{name:<28} | " + ' | '.join(f"{cell:>26}" for cell in cells))
+
+
+def compare_baseline(results, workload, baseline, tolerance):
+    # 워크로드(채널/슬롯/지연/오류율 등)가 다르면 비교 자체가 무의미
+    if baseline.get('workload') != workload:
+        print(f"[기준 비교] 워크로드가 다름 — 비교 생략 (기준 {baseline.get('workload')})")
+        return False
+    # wall 시간이 tolerance 이상 늘었거나 외부 호출이 늘어난 설정 → 회귀
+    regressions = []
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        if result['wall'] > base['wall'] * (1 + tolerance):
+            regressions.append(f"{name}: wall {base['wall']:.2f}s → {result['wall']:.2f}s")
+        for service in SERVICES:
+            now = result['external'].get(service, {}).get('requests', 0) - result['external'].get(service, {}).get('errors', 0)
+            was = base['external'].get(service, {}).get('requests', 0) - base['external'].get(service, {}).get('errors', 0)
+            if now > was * (1 + tolerance):
+                regressions.append(f"{name}: {service} 호출 {was} → {now}")
+    for line in regressions:
+        print(f"[회귀] {line}")
+    if not regressions:
+        print(f"[기준 비교] 회귀 없음 (허용 {tolerance:.0%})")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='스텁 서버 기반 Crawler.run end-to-end 벤치마크')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--channels', type=int, default=5)
+    parser.add_argument('--slots', type=int, default=24, help='채널당 하루 슬롯 수')
+    parser.add_argument('--days', type=int, default=1, help='수집 날짜 수 (day offset 0..days-1)')
+    parser.add_argument('--unique-titles', type=int, default=None, help='제목 풀 크기 (기본 channels*slots/3)')
+    parser.add_argument('--engine', default='thread', help='thread,async')
+    parser.add_argument('--mode', default='default', help='default,pipeline')
+    parser.add_argument('--cache', default='sqlite', help='sqlite,csv,indexed')
+    parser.add_argument('--schedule', default='http', help='http (스텁 XHR) 또는 selenium (--browser 필요)')
+    parser.add_argument('--browser', action='store_true', help='Chrome 사용 (스텁 편성표 페이지 / Selenium fallback)')
+    parser.add_argument('--max-workers', type=int, default=5)
+    parser.add_argument('--latency', default=DEFAULT_LATENCY, help='서비스별 응답 지연(초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503 응답 비율 (모든 서비스)')
+    parser.add_argument('--retry-after', type=float, default=0.2, help='503 응답의 Retry-After(초)')
+    parser.add_argument('--tmdb-hit-rate', type=float, default=0.7)
+    parser.add_argument('--qps', default='', help='소스별 QPS 덮어쓰기 (예: naver=20,gemini=10)')
+    parser.add_argument('--unthrottled', action='store_true', help='모든 소스 QPS 제한 해제 (코드 변경 비교용)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='결과 저장 경로')
+    parser.add_argument('--baseline', help='비교할 이전 결과 JSON')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--verbose', action='store_true', help='자식 프로세스 로그 출력')
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(args.worker))
+        return
+
+    sys.path.insert(0, REPO_ROOT)
+    from benchmarks.stub_services import Lineup, start_stub_services, stub_environ
+
+    lineup = Lineup(args.channels, args.slots, args.unique_titles, seed=args.seed)
+    services = start_stub_services(
+        lineup, latency=parse_pairs(args.latency), error_rate=args.error_rate,
+        tmdb_hit_rate=args.tmdb_hit_rate, retry_after=args.retry_after, seed=args.seed,
+    )
+
+    env = {**os.environ, **stub_environ(services), 'PYTHONUNBUFFERED': '1'}
+    qps = parse_pairs(args.qps)
+    if args.unthrottled:
+        qps = {source: 1000.0 for source in ['tmdb', 'naver', 'gemini']}
+    for source, value in qps.items():
+        env[f"{source.upper()}_QPS"] = str(value)
+
+    workload = {
+        'channels': args.channels, 'slots': args.slots, 'days': args.days, 'unique_titles': len(lineup.titles),
+        'latency': args.latency, 'error_rate': args.error_rate, 'tmdb_hit_rate': args.tmdb_hit_rate,
+        'qps': qps, 'seed': args.seed, 'schedule': args.schedule,
+    }
+    print(f"[벤치마크] 채널 {args.channels}개 × {args.slots}슬롯 × {args.days}일, 제목 풀 {len(lineup.titles)}개, "
+          f"지연 {args.latency}, 오류율 {args.error_rate:.0%}, QPS {qps or '기본값'}")
+
+    results = {}
+    try:
+        for engine, mode, cache in itertools.product(
+            args.engine.split(','), args.mode.split(','), args.cache.split(',')
+        ):
+            name = f"{engine}/{mode}/{cache}"
+            config = {
+                'channels': lineup.channels, 'days': list(range(args.days)), 'engine': engine, 'mode': mode,
+                'cache': cache, 'schedule': args.schedule, 'browser': args.browser, 'max_workers': args.max_workers,
+            }
+            print(f"[실행] {name} ...", flush=True)
+            results[name] = run_config(name, config, services, env, args.verbose)
+    finally:
+        for service in services.values():
+            service.stop()
+
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'workload': workload, 'results': results}, f, ensure_ascii=False, indent=1)
+        print(f"[저장] {args.json}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare_baseline(results, workload, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
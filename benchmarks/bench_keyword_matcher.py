@@ -0,0 +1,50 @@
+# ✅ 키워드 매칭 비용 비교 (호출마다 키워드 정리 + 이중 루프 vs 한 번 만든 KeywordMatcher)
+# 결과 일치 검증은 tests/test_keyword_matcher.py
+# 실행: python -m benchmarks.bench_keyword_matcher
+import re
+import timeit
+
+import pandas as pd
+
+from lib.config.genre_config import desc_keywords
+from lib.metadata.metadata_cache import metadata_exceptions, match_exception
+from lib.metadata.metadata_manager import guess_subgenre_by_desc
+
+CACHE_PATH = './cache/metadata_cache.csv'
+
+
+def legacy_guess_subgenre_by_desc(desc):
+    desc_clean = re.sub(r'[^\w\s]', ' ', desc).lower()
+    desc_clean = re.sub(r'\s+', ' ', desc_clean).strip()
+    for subgenre, keywords in desc_keywords.items():
+        for keyword in keywords:
+            if keyword.lower().strip() in desc_clean:
+                return subgenre
+    return ''
+
+
+def legacy_match_exception(title):
+    title_lower = title.strip().lower()
+    for entry in metadata_exceptions:
+        for keyword in entry['title_keywords']:
+            if keyword.lower() in title_lower:
+                return entry
+    return None
+
+
+def per_call_us(fn, inputs):
+    return min(timeit.repeat(lambda: [fn(item) for item in inputs], number=1, repeat=3)) / len(inputs) * 1e6
+
+
+def main():
+    frame = pd.read_csv(CACHE_PATH, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+    for label, inputs, legacy, current in [
+        ('guess_subgenre_by_desc', frame['description'].tolist(), legacy_guess_subgenre_by_desc, guess_subgenre_by_desc),
+        ('match_exception', frame['title'].tolist(), legacy_match_exception, match_exception),
+    ]:
+        print(f"[{label}] {len(inputs):,}건 (평균 {sum(map(len, inputs)) / len(inputs):.0f}자): "
+              f"기존 {per_call_us(legacy, inputs):.1f}us → 매처 {per_call_us(current, inputs):.1f}us")
+
+
+if __name__ == '__main__':
+    main()
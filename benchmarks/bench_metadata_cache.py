@@ -0,0 +1,49 @@
+# ✅ 메타데이터 캐시 조회 비용 비교 (DataFrame boolean scan vs title 해시 인덱스)
+# 실행: python -m benchmarks.bench_metadata_cache
+import random
+import timeit
+
+import pandas as pd
+
+from lib.metadata.metadata_cache import CACHE_COLUMNS, MetadataCache
+
+CACHE_SIZES = [1_000, 5_000, 20_000, 100_000]
+LOOKUPS = 2_000
+
+
+def make_cache_frame(size):
+    rows = [
+        {
+            'title': f'프로그램{i}', 'genre': '예능', 'subgenre': '버라이어티',
+            'description': '설명 ' * 20, 'thumbnail': f'https://image/{i}.jpg',
+            'age_rating': '15세 이상', 'cast': '홍길동, 김철수'
+        }
+        for i in range(size)
+    ]
+    return pd.DataFrame(rows, columns=CACHE_COLUMNS)
+
+
+def main():
+    print(f"{'cache size':>12} | {'df scan (us)':>14} | {'index (us)':>12} | {'speedup':>8}")
+    for size in CACHE_SIZES:
+        df = make_cache_frame(size)
+        cache = MetadataCache.from_frame(df)
+        titles = [f'프로그램{random.randrange(size * 2)}' for _ in range(LOOKUPS)]
+
+        def scan():
+            for title in titles:
+                cached = df[df['title'] == title]
+                if not cached.empty:
+                    cached.iloc[0]
+
+        def indexed():
+            for title in titles:
+                cache.get(title)
+
+        scan_us = min(timeit.repeat(scan, number=1, repeat=3)) / LOOKUPS * 1e6
+        index_us = min(timeit.repeat(indexed, number=1, repeat=3)) / LOOKUPS * 1e6
+        print(f"{size:>12,} | {scan_us:>14.2f} | {index_us:>12.3f} | {scan_us / index_us:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
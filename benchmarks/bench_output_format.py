@@ -0,0 +1,99 @@
+# ✅ 일일 결과 파일 형식 비교 (UTF-8-SIG CSV vs 날짜 파티션 parquet) — 파일 크기, 쓰기/읽기, 하류 조회 비용
+# 실행: python -m benchmarks.bench_output_format (pyarrow 필요)
+import os
+import random
+import shutil
+import tempfile
+import timeit
+
+import pandas as pd
+
+from modules.program_output import write_daily_parquet, daily_parquet_path, load_programs
+
+CACHE_PATH = './cache/metadata_cache.csv'
+CHANNELS = 17
+SLOTS_PER_DAY = 48
+DAYS = 7
+COLUMNS = [
+    'program_id', 'channel', 'airtime', 'title', 'episode', 'genre', 'subgenre',
+    'runtime', 'description', 'thumbnail', 'age_rating', 'cast'
+]
+
+
+def make_days(cache):
+    # 캐시의 실제 메타데이터로 채널 × 슬롯 × 날짜 행 생성 (제목은 날짜 간 반복)
+    records = cache.to_dict('records')
+    days = {}
+    program_id = 0
+    for day in range(DAYS):
+        rows = []
+        for c in range(CHANNELS):
+            for slot in range(SLOTS_PER_DAY):
+                record = records[(c * SLOTS_PER_DAY + slot * 7 + day % 2) % len(records)]
+                program_id += 1
+                rows.append([
+                    program_id, f"CH{c}[{c}]", f"{slot // 2:02d}:{slot % 2 * 30:02d}:00", record['title'],
+                    f"{random.randrange(1, 200)}회", record['genre'], record['subgenre'], 30,
+                    record['description'], record['thumbnail'], record['age_rating'], record['cast'],
+                ])
+        days[f"2025-01-{day + 1:02d}"] = pd.DataFrame(rows, columns=COLUMNS)
+    return days
+
+
+def main():
+    random.seed(0)
+    cache = pd.read_csv(CACHE_PATH, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+    days = make_days(cache)
+    root = tempfile.mkdtemp(prefix='bench_output_')
+    csv_paths = {date: os.path.join(root, f"{date}.csv") for date in days}
+    parquet_root = os.path.join(root, 'parquet')
+
+    try:
+        def write_csv():
+            for date, df in days.items():
+                df.to_csv(csv_paths[date], index=False, encoding='utf-8-sig')
+
+        def write_parquet():
+            for date, df in days.items():
+                write_daily_parquet(df, date, root=parquet_root)
+
+        def read_csv():
+            return pd.concat([pd.read_csv(path, encoding='utf-8-sig') for path in csv_paths.values()])
+
+        def read_parquet():
+            return load_programs(root=parquet_root)
+
+        def query_csv():
+            # 하류 작업 예: 한 채널의 하루치 제목/시각만 필요해도 CSV 는 전체를 파싱
+            df = pd.read_csv(csv_paths['2025-01-03'], encoding='utf-8-sig')
+            return df.loc[df['channel'] == 'CH3[3]', ['program_id', 'airtime', 'title']]
+
+        def query_parquet():
+            return load_programs(dates=['2025-01-03'], channels=['CH3[3]'],
+                                 columns=['program_id', 'airtime', 'title'], root=parquet_root)
+
+        write_csv()
+        write_parquet()
+        csv_size = sum(os.path.getsize(path) for path in csv_paths.values())
+        parquet_size = sum(os.path.getsize(daily_parquet_path(date, parquet_root)) for date in days)
+        rows = sum(len(df) for df in days.values())
+        assert len(read_parquet()) == len(read_csv()) == rows
+        assert len(query_parquet()) == len(query_csv()) == SLOTS_PER_DAY
+
+        print(f"[파일 크기] {DAYS}일 {rows:,}행: CSV {csv_size / 1e6:.2f}MB → parquet {parquet_size / 1e6:.2f}MB "
+              f"({csv_size / parquet_size:.1f}x)")
+        print(f"{'step':>14} | {'csv (ms)':>9} | {'parquet (ms)':>12} | {'speedup':>8}")
+        for name, csv_fn, parquet_fn in [
+            ('write', write_csv, write_parquet),
+            ('read all', read_csv, read_parquet),
+            ('1 day/channel', query_csv, query_parquet),
+        ]:
+            csv_ms = min(timeit.repeat(csv_fn, number=1, repeat=5)) * 1e3
+            parquet_ms = min(timeit.repeat(parquet_fn, number=1, repeat=5)) * 1e3
+            print(f"{name:>14} | {csv_ms:>9.1f} | {parquet_ms:>12.1f} | {csv_ms / parquet_ms:>7.1f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
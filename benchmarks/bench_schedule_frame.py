@@ -0,0 +1,110 @@
+# ✅ 편성표 정리 비용 비교 (행 단위 strptime / 병합 / 회차 루프 vs 채널 전체 vectorized frame)
+# 실행: python -m benchmarks.bench_schedule_frame
+import re
+import sys
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from lib.utils.schedule_frame import prepare_schedule_frame, frame_to_programs
+from lib.utils.text_cleaning import clean_name, split_episode
+
+CHANNELS = 17
+SLOTS_PER_DAY = 48
+DAYS = [1, 7]
+
+
+def legacy_prepare(temp_list):
+    # 변경 전 Crawler.calculate_runtime + 같은 시각 병합 + 회차 분리
+    programs = []
+    for i in range(len(temp_list)):
+        current_time = datetime.strptime(temp_list[i][1], "%H:%M:%S")
+        if i < len(temp_list) - 1:
+            next_time = datetime.strptime(temp_list[i + 1][1], "%H:%M:%S")
+            if next_time < current_time:
+                next_time += timedelta(days=1)
+            runtime = int((next_time - current_time).total_seconds() / 60)
+        else:
+            runtime = 60
+        programs.append(temp_list[i] + [runtime])
+
+    merged_programs = []
+    skip_next = False
+    for i in range(len(programs)):
+        if skip_next:
+            skip_next = False
+            continue
+        if i < len(programs) - 1 and programs[i][1] == programs[i + 1][1]:
+            merged = programs[i][:]
+            merged[3] = programs[i][3] + programs[i + 1][3]
+            merged_programs.append(merged)
+            skip_next = True
+        else:
+            merged_programs.append(programs[i])
+
+    episode_list = []
+    for item in merged_programs:
+        raw_title = item[2]
+        match = re.search(r'(\d{1,4}회)', raw_title)
+        episode = match.group(1) if match else ''
+        item[2] = clean_name(raw_title.replace(episode, '').strip())
+        episode_list.append(episode)
+    return [tuple(item) for item in merged_programs], episode_list
+
+
+def make_schedule(channel, slots, duplicate_every=0):
+    rows = []
+    minute = 5 * 60
+    for i in range(slots):
+        minute += random.choice([30, 40, 60, 70, 90])
+        airtime = f"{(minute // 60) % 24:02d}:{minute % 60:02d}:00"
+        rows.append([channel, airtime, f"프로그램{random.randrange(200)} {i % 50 + 1}회 (재)", '예능'])
+        if duplicate_every and i % duplicate_every == 0:
+            rows.append([channel, airtime, f"부제{i}", '드라마'])
+    return rows
+
+
+def check(schedules):
+    # 같은 시각 중복이 없으면 기존 결과와 완전히 같아야 함
+    mismatches = 0
+    for rows in schedules.values():
+        expected = legacy_prepare([row[:] for row in rows])
+        actual = frame_to_programs(prepare_schedule_frame(rows))
+        if expected != actual:
+            mismatches += 1
+    print(f"[결과 검증] 채널 {len(schedules)}개, 불일치 {mismatches}개")
+    return mismatches == 0
+
+
+def main():
+    random.seed(0)
+    if not check({f"CH{c}": make_schedule(f"CH{c}", SLOTS_PER_DAY) for c in range(CHANNELS)}):
+        sys.exit(1)
+
+    # 중복 시각 병합 슬롯은 러닝타임을 병합 후 기준으로 계산 (기존은 0분)
+    rows = make_schedule('CH', 6, duplicate_every=3)
+    legacy_runtimes = [p[4] for p in legacy_prepare([row[:] for row in rows])[0]]
+    new_runtimes = [p[4] for p in frame_to_programs(prepare_schedule_frame(rows))[0]]
+    print(f"[중복 시각 병합] 기존 러닝타임 {legacy_runtimes} → {new_runtimes}")
+
+    print(f"{'days':>5} | {'rows':>7} | {'legacy (ms)':>11} | {'frame (ms)':>10} | {'speedup':>8}")
+    for days in DAYS:
+        schedules = {f"CH{c}": make_schedule(f"CH{c}", SLOTS_PER_DAY * days) for c in range(CHANNELS)}
+        all_rows = [row for rows in schedules.values() for row in rows]
+
+        def legacy():
+            for rows in schedules.values():
+                legacy_prepare([row[:] for row in rows])
+
+        def framed():
+            split_episode.cache_clear()
+            clean_name.cache_clear()
+            prepare_schedule_frame(all_rows)
+
+        legacy_ms = min(timeit.repeat(legacy, number=1, repeat=3)) * 1e3
+        frame_ms = min(timeit.repeat(framed, number=1, repeat=3)) * 1e3
+        print(f"{days:>5} | {len(all_rows):>7,} | {legacy_ms:>11.1f} | {frame_ms:>10.1f} | {legacy_ms / frame_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+# ✅ 벤치마크용 로컬 스텁 서버 (lguplus 편성표 / TMDb / 네이버 검색 / Gemini)
+# - 서비스마다 ThreadingHTTPServer 하나 (127.0.0.1 임의 포트), 응답 지연/오류 비율 설정 가능
+# - 오류는 503 + Retry-After 로 돌려줌 → 크롤러의 재시도/백오프 경로까지 그대로 측정
+# - 요청 수/주입한 오류 수는 서비스별 counts 로 집계
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SCHEDULE_GENRES = ['연예/오락', '드라마', '뉴스/정보', '만화', '영화']
+WEEKDAYS = ['(월)', '(화)', '(수)', '(목)', '(금)', '(토)', '(일)']
+
+
+def stable_hash(text):
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+class StubService:
+    # routes: [(method, path regex, handler(request) → (status, content_type, body))]
+    name = 'stub'
+
+    def __init__(self, latency=0.0, error_rate=0.0, retry_after=0.2, seed=0):
+        self.latency = latency          # 응답 지연(초), ±30% jitter
+        self.error_rate = error_rate    # 503 으로 응답할 비율
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.counts = {'requests': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name=f'stub-{self.name}', daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def routes(self):
+        return []
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _count(self, key, route=None):
+        with self._lock:
+            self.counts[key] += 1
+            if route is not None:
+                self.counts[route] = self.counts.get(route, 0) + 1
+
+    def _draw(self):
+        with self._lock:
+            jitter = self.random.uniform(0.7, 1.3)
+            failed = self.random.random() < self.error_rate
+        return self.latency * jitter, failed
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _dispatch(self, method):
+                parsed = urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                for route_method, pattern, handler in service.routes():
+                    match = re.fullmatch(pattern, parsed.path)
+                    if route_method != method or not match:
+                        continue
+                    service._count('requests', handler.__name__)
+                    delay, failed = service._draw()
+                    if delay:
+                        time.sleep(delay)
+                    if failed:
+                        service._count('errors')
+                        # Google API 오류 형식 (google-api-core 가 error.message 를 파싱)
+                        error = {'error': {'code': 503, 'message': 'stub unavailable', 'status': 'UNAVAILABLE'}}
+                        return self._send(503, 'application/json', json.dumps(error),
+                                          {'Retry-After': str(service.retry_after)})
+                    request = {
+                        'match': match, 'query': {k: v[0] for k, v in parse_qs(parsed.query).items()},
+                        'body': body, 'headers': self.headers,
+                    }
+                    return self._send(*handler(request))
+                return self._send(404, 'text/plain', b'not found')
+
+            def _send(self, status, content_type, body, headers=None):
+                if isinstance(body, str):
+                    body = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+# ---------------------------------------------------------------------------
+# 편성표: 채널 N 개 × 하루 M 슬롯, 제목은 공유 풀에서 뽑아 채널/날짜 간 반복
+# ---------------------------------------------------------------------------
+
+class Lineup:
+
+    def __init__(self, channels, slots, unique_titles=None, seed=0):
+        self.channels = [f"채널{i:02d}[{101 + i}]" for i in range(channels)]
+        self.slots = slots
+        self.seed = seed
+        size = unique_titles or max(10, channels * slots // 3)
+        self.titles = [f"스텁 프로그램 {i:04d}" for i in range(size)]
+
+    def codes(self):
+        return {re.search(r'\[(\d+)\]', channel).group(1): channel for channel in self.channels}
+
+    def rows(self, code, date_str):
+        # → [(airtime, title, genre)] (슬롯 간격 균등, 회차 일부 포함)
+        rng = random.Random(f"{self.seed}:{code}:{date_str}")
+        step = 24 * 60 // self.slots
+        rows = []
+        for slot in range(self.slots):
+            minute = 5 * 60 + slot * step
+            airtime = f"{(minute // 60) % 24:02d}:{minute % 60:02d}:00"
+            title = rng.choice(self.titles)
+            if rng.random() < 0.3:
+                title = f"{title} {rng.randrange(1, 120)}회"
+            rows.append((airtime, title, rng.choice(SCHEDULE_GENRES)))
+        return rows
+
+
+def schedule_rows_html(rows):
+    return ''.join(
+        f'<tr class="point"><td>{airtime}</td><td>\n{title}\n</td><td>{genre}</td></tr>'
+        for airtime, title, genre in rows
+    )
+
+
+def date_label(date):
+    return f"{date.month}월 {date.day}일 {WEEKDAYS[date.weekday()]}"
+
+
+class ScheduleStub(StubService):
+    # /schedule?chnlCd=&brdcDt=YYYYMMDD → tr.point 행 HTML 조각 (HttpScheduleSource)
+    # /iptv/channel-guide → 메뉴/채널 드롭다운/날짜 탭/편성표 DOM (Selenium 경로, 같은 /schedule 로 행을 그림)
+    name = 'schedule'
+
+    def __init__(self, lineup, **kwargs):
+        self.lineup = lineup
+        self.code_map = lineup.codes()
+        super().__init__(**kwargs)
+
+    def routes(self):
+        return [('GET', r'/schedule', self.schedule), ('GET', r'/iptv/channel-guide', self.guide)]
+
+    def schedule(self, request):
+        code = request['query'].get('chnlCd', '')
+        if code not in self.code_map:
+            return 200, 'text/html', ''
+        return 200, 'text/html', schedule_rows_html(self.lineup.rows(code, request['query'].get('brdcDt', '')))
+
+    def guide(self, request):
+        today = datetime.now()
+        channel_links = ''.join(
+            f'<li><a href="#" data-code="{code}">{channel}</a></li>' for code, channel in self.code_map.items()
+        )
+        date_tabs = ''.join(
+            f'<li><a href="#" data-date="{(today + timedelta(days=d)).strftime("%Y%m%d")}">'
+            f'{date_label(today + timedelta(days=d))}</a></li>'
+            for d in range(7)
+        )
+        first_code = next(iter(self.code_map))
+        return 200, 'text/html', GUIDE_PAGE.replace('{{channels}}', channel_links) \
+            .replace('{{dates}}', date_tabs).replace('{{first_code}}', first_code)
+
+
+GUIDE_PAGE = '''<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>채널 편성표 (stub)</title></head>
+<body>
+<a href="#" id="menu-guide">채널 편성표 안내</a>
+<div id="guide" style="display:none">
+  <a href="#" id="menu-all">전체채널</a>
+  <div id="channel-area" style="display:none">
+    <a href="#" class="c-btn-outline-2-s open">채널 선택</a>
+    <ul id="channel-list" style="display:none">{{channels}}</ul>
+    <ul id="date-tabs">{{dates}}</ul>
+    <table><tbody id="rows"></tbody></table>
+  </div>
+</div>
+<script>
+var state = {code: '{{first_code}}', date: null};
+function show(id) { document.getElementById(id).style.display = 'block'; }
+function dateTabs() { return document.querySelectorAll('#date-tabs a'); }
+function activate(date) {
+  state.date = date;
+  dateTabs().forEach(function (a) { a.className = a.dataset.date === date ? 'on' : ''; });
+}
+function render() {
+  // 기존 행을 먼저 비운 뒤 응답으로 다시 그림 (staleness 대기 경로 재현)
+  document.getElementById('rows').innerHTML = '';
+  fetch('/schedule?chnlCd=' + state.code + '&brdcDt=' + state.date)
+    .then(function (r) { return r.text(); })
+    .then(function (html) { document.getElementById('rows').innerHTML = html; });
+}
+document.getElementById('menu-guide').onclick = function (e) { e.preventDefault(); show('guide'); };
+document.getElementById('menu-all').onclick = function (e) {
+  e.preventDefault(); show('channel-area'); activate(dateTabs()[0].dataset.date); render();
+};
+document.querySelector('a.c-btn-outline-2-s.open').onclick = function (e) { e.preventDefault(); show('channel-list'); };
+document.querySelectorAll('#channel-list a').forEach(function (a) {
+  a.onclick = function (e) {
+    e.preventDefault();
+    document.getElementById('channel-list').style.display = 'none';
+    state.code = a.dataset.code; activate(dateTabs()[0].dataset.date); render();
+  };
+});
+dateTabs().forEach(function (a) {
+  a.onclick = function (e) { e.preventDefault(); activate(a.dataset.date); render(); };
+});
+</script>
+</body></html>
+'''
+
+
+# ---------------------------------------------------------------------------
+# TMDb: 검색 적중률 hit_rate (제목 해시로 결정), 상세는 append_to_response 형식
+# ---------------------------------------------------------------------------
+
+class TmdbStub(StubService):
+    name = 'tmdb'
+
+    def __init__(self, hit_rate=0.7, **kwargs):
+        self.hit_rate = hit_rate
+        super().__init__(**kwargs)
+
+    def routes(self):
+        return [
+            ('GET', r'/3/search/(tv|movie)', self.search),
+            ('GET', r'/3/(tv|movie)/(\d+)', self.detail),
+        ]
+
+    def search(self, request):
+        query = request['query'].get('query', '')
+        content_type = request['match'].group(1)
+        h = stable_hash(f"{content_type}:{query}")
+        results = []
+        if (h % 1000) / 1000 < self.hit_rate:
+            results = [{'id': h % 900000 + 1, 'name' if content_type == 'tv' else 'title': query}]
+        return 200, 'application/json', json.dumps({'page': 1, 'results': results})
+
+    def detail(self, request):
+        content_type, content_id = request['match'].group(1), int(request['match'].group(2))
+        detail = {
+            'id': content_id,
+            'overview': f"스텁 줄거리 {content_id}. 가족과 친구들이 함께 웃고 우는 이야기.",
+            'poster_path': f"/stub{content_id}.jpg",
+            'genres': [{'id': [18, 35, 10749, 80][content_id % 4], 'name': 'Drama'}],
+            'credits': {'cast': [{'name': f"Actor {(content_id + i) % 200}"} for i in range(3)]},
+        }
+        if content_type == 'tv':
+            detail['content_ratings'] = {'results': [{'iso_3166_1': 'KR', 'rating': '15'}]}
+        else:
+            detail['release_dates'] = {'results': [{'iso_3166_1': 'KR', 'release_dates': [{'certification': '12'}]}]}
+        return 200, 'application/json', json.dumps(detail)
+
+
+# ---------------------------------------------------------------------------
+# 네이버 검색: lib.metadata.naver 의 장르/썸네일/출연진 셀렉터에 맞는 결과 페이지
+# ---------------------------------------------------------------------------
+
+NAVER_PAGE = '''<html><body><div id="main_pack">
+<div class="sc_new _kgs_broadcast cs_common_module _broadcast_button_scroller case_normal color_13">
+  <div class="cm_content_wrap _broadcast_normal_total">
+    <div><div class="sub_title"><span>{genre}</span></div>
+      <div class="detail_info"><a href="#"><img src="https://search.stub/{thumb}.jpg"></a></div></div>
+    <div><div class="list_image_info _content"><ul>{cast}</ul></div></div>
+  </div>
+</div></div></body></html>'''
+
+
+class NaverStub(StubService):
+    name = 'naver'
+
+    def routes(self):
+        return [('GET', r'/search\.naver', self.search)]
+
+    def search(self, request):
+        query = request['query'].get('query', '')
+        h = stable_hash(query)
+        cast = ''.join(
+            f'<li><div><div><span><a href="#">배우{(h + i) % 300}</a></span></div></div></li>' for i in range(4)
+        )
+        genre = ['드라마', '예능', '애니메이션', '시사/교양'][h % 4]
+        return 200, 'text/html', NAVER_PAGE.format(genre=genre, thumb=h, cast=cast)
+
+
+# ---------------------------------------------------------------------------
+# Gemini: REST generateContent — 프롬프트 종류(배치 JSON / 이름 번역 / 단건 / 출연진)에 맞춰 응답
+# ---------------------------------------------------------------------------
+
+class GeminiStub(StubService):
+    name = 'gemini'
+
+    def routes(self):
+        return [('POST', r'/v1beta/models/[^/:]+:generateContent', self.generate)]
+
+    def generate(self, request):
+        payload = json.loads(request['body'] or b'{}')
+        prompt = ''.join(part.get('text', '') for part in payload['contents'][0]['parts'])
+        if '메타데이터 목록(JSON)' in prompt:
+            self._count_kind('batch')
+            text = json.dumps([self.fill_entry(entry) for entry in self.prompt_json(prompt)], ensure_ascii=False)
+        elif '인물 이름들을' in prompt:
+            self._count_kind('names')
+            text = json.dumps([{'name': name, 'korean': f"배우 {name.split()[-1]}"}
+                               for name in self.prompt_json(prompt)], ensure_ascii=False)
+        elif '이름들을 한국어 이름으로' in prompt:
+            self._count_kind('cast')
+            text = '홍길동, 김철수'
+        else:
+            self._count_kind('single')
+            text = '장르: 예능\n설명: 스텁 설명\n서브장르: 토크쇼\n썸네일: 정보 없음\n연령등급: 15세 이상\n출연진: 홍길동'
+        response = {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'},
+                                    'finishReason': 'STOP', 'index': 0}]}
+        return 200, 'application/json', json.dumps(response, ensure_ascii=False)
+
+    def _count_kind(self, kind):
+        with self._lock:
+            self.counts[f"prompt_{kind}"] = self.counts.get(f"prompt_{kind}", 0) + 1
+
+    @staticmethod
+    def prompt_json(prompt):
+        # 프롬프트 끝에 붙은 JSON 배열
+        return json.loads(prompt[prompt.index('\n[') + 1:].strip())
+
+    @staticmethod
+    def fill_entry(entry):
+        def keep(field, default):
+            value = entry.get(field)
+            return default if not value or value == '비어 있음' else value
+
+        genre = keep('genre', '예능')
+        allowed = entry.get('allowed_subgenres') or []
+        return {
+            'id': entry['id'],
+            'genre': genre if genre in ['영화', '드라마', '예능', '애니'] else '예능',
+            'desc': keep('desc', f"{entry.get('program_name', '')} 스텁 설명"),
+            'subgenre': keep('subgenre', allowed[0] if allowed else ''),
+            'thumbnail': keep('thumbnail', '정보 없음'),
+            'age_rating': keep('age_rating', '15세 이상'),
+            'cast': keep('cast', '홍길동'),
+        }
+
+
+def start_stub_services(lineup, latency=None, error_rate=0.0, tmdb_hit_rate=0.7, retry_after=0.2, seed=0):
+    # latency: {'schedule': 초, 'tmdb': 초, 'naver': 초, 'gemini': 초}
+    latency = latency or {}
+    common = {'error_rate': error_rate, 'retry_after': retry_after}
+    services = {
+        'schedule': ScheduleStub(lineup, latency=latency.get('schedule', 0.0), seed=seed, **common),
+        'tmdb': TmdbStub(hit_rate=tmdb_hit_rate, latency=latency.get('tmdb', 0.0), seed=seed + 1, **common),
+        'naver': NaverStub(latency=latency.get('naver', 0.0), seed=seed + 2, **common),
+        'gemini': GeminiStub(latency=latency.get('gemini', 0.0), seed=seed + 3, **common),
+    }
+    for service in services.values():
+        service.start()
+    return services
+
+
+def stub_environ(services):
+    # 크롤러가 스텁을 보도록 하는 환경변수 (모듈 import 전에 설정되어야 함)
+    return {
+        'LGU_SCHEDULE_API_URL': f"{services['schedule'].url}/schedule",
+        'LGU_SCHEDULE_API_PARAMS': 'chnlCd={code}&brdcDt={date:%Y%m%d}',
+        'LGU_CHANNEL_GUIDE_URL': f"{services['schedule'].url}/iptv/channel-guide",
+        'TMDB_API_BASE': f"{services['tmdb'].url}/3",
+        'TMDB_API_KEY': 'stub',
+        'NAVER_SEARCH_URL': f"{services['naver'].url}/search.naver",
+        'GEMINI_API_ENDPOINT': services['gemini'].url,
+        'GEMINI_API_KEY': 'stub',
+    }
@@ -0,0 +1,66 @@
+import asyncio
+import aiohttp
+from threading import Thread, Lock
+
+from lib.metadata.metadata_manager import get_program_metadata_async, get_program_metadata_batch_async
+
+
+# ✅ asyncio 메타데이터 수집 엔진 (기존 동기 코드에서 호출하는 래퍼)
+# - 백그라운드 스레드의 이벤트 루프 하나 + aiohttp 세션 하나를 실행 내내 재사용
+#   (Gemini async 클라이언트 / 소스별 세마포어가 루프에 묶이므로 호출마다 asyncio.run 하지 않음)
+# - 여러 스레드에서 동시에 호출해도 같은 루프에서 코루틴으로 실행됨
+class AsyncMetadataEngine:
+
+    def __init__(self, connection_limit=100):
+        self.connection_limit = connection_limit
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = Thread(target=self._loop.run_forever, name='metadata-async', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _get_session(self):
+        # 루프 스레드 안에서만 호출되므로 별도 잠금 불필요
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.connection_limit, ttl_dns_cache=300)
+            )
+        return self._session
+
+    def run(self, coro_fn, *args, **kwargs):
+        # coro_fn(session, *args, **kwargs) 를 엔진 루프에서 실행하고 결과를 기다림
+        async def call():
+            return await coro_fn(await self._get_session(), *args, **kwargs)
+
+        return asyncio.run_coroutine_threadsafe(call(), self._ensure_loop()).result()
+
+    def get_program_metadata(self, program_name, original_genre, channel):
+        return self.run(get_program_metadata_async, program_name, original_genre, channel)
+
+    def get_program_metadata_batch(self, programs, batch_size=None):
+        # programs: [(program_name, original_genre, channel)] → get_program_metadata_batch 와 같은 형식
+        return self.run(get_program_metadata_batch_async, programs, batch_size=batch_size)
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def shutdown():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
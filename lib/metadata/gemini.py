@@ -1,18 +1,65 @@
 import os
-import re
-import pandas as pd
-from datetime import datetime
+import json
+import asyncio
+from threading import Lock
 from dotenv import load_dotenv
 import google.generativeai as genai
+from lib.utils.rate_limit import call_with_retry, call_with_retry_async
 
 load_dotenv()
 
-def fill_missing_metadata_with_gemini(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre):
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel(model_name="gemini-2.5-flash")
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+GEMINI_BATCH_SIZE = int(os.getenv("GEMINI_BATCH_SIZE", 25))
+# 인물명 번역 요청 1회당 최대 이름 수
+GEMINI_NAME_BATCH_SIZE = int(os.getenv("GEMINI_NAME_BATCH_SIZE", 200))
+# ✅ 기본 엔드포인트 대신 프록시/로컬 스텁 등으로 보낼 때 (예: http://127.0.0.1:8080) → REST transport 사용
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+
+GENRE_LIST = ['영화', '드라마', '예능', '애니']
+AGE_RATINGS = ['전체 이용가', '12세 이상', '15세 이상', '19세 이상']
+METADATA_FIELDS = ['genre', 'desc', 'subgenre', 'thumbnail', 'age_rating', 'cast']
+
+# ✅ 배치 응답 JSON 스키마 (id 로 입력 순서와 매칭)
+BATCH_RESPONSE_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'integer'},
+            **{field: {'type': 'string'} for field in METADATA_FIELDS},
+        },
+        'required': ['id'] + METADATA_FIELDS,
+    },
+}
+
+_model = None
+_model_lock = Lock()
 
+def get_model():
+    # ✅ configure + GenerativeModel 생성은 프로세스당 한 번만
+    global _model
+    with _model_lock:
+        if _model is None:
+            if GEMINI_API_ENDPOINT:
+                genai.configure(
+                    api_key=os.getenv("GEMINI_API_KEY"), transport='rest',
+                    client_options={'api_endpoint': GEMINI_API_ENDPOINT},
+                )
+            else:
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _model = genai.GenerativeModel(model_name=GEMINI_MODEL_NAME)
+        return _model
+
+async def _generate_content_async(prompt, **kwargs):
+    # REST transport 는 generate_content_async 를 지원하지 않으므로 동기 호출을 스레드에서 실행
+    model = get_model()
+    if GEMINI_API_ENDPOINT:
+        return await asyncio.to_thread(model.generate_content, prompt, **kwargs)
+    return await model.generate_content_async(prompt, **kwargs)
+
+def _build_fill_prompt(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre):
     genre_safe = original_genre if original_genre else "비어 있음"
-    genre_list = ['영화', '드라마', '예능', '애니']
+    genre_list = GENRE_LIST
 
     prompt = f"""
 다음은 IPTV 프로그램의 메타데이터입니다. 비어 있는 항목(desc, genre, subgenre, thumbnail 등)이 있다면 추론하여 채워주세요.
@@ -44,77 +91,285 @@ def fill_missing_metadata_with_gemini(program_name, original_genre, desc, subgen
 연령등급: ...
 출연진: ...
 """
+    return prompt
+
+def _parse_fill_response(content, original_genre, desc, subgenre, thumbnail, age_rating, cast):
+    genre_out = original_genre or "정보 없음"
+    desc_out = desc or "정보 없음"
+    sub_out = subgenre or "정보 없음"
+    thumb_out = thumbnail or "정보 없음"
+    age_out = age_rating or "정보 없음"
+    cast_out = cast or "정보 없음"
+
+    lines = [line.strip() for line in content.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith("장르:"):
+            genre_out = line.replace("장르:", "").strip() or genre_out
+        elif line.startswith("설명:"):
+            desc_out = line.replace("설명:", "").strip() or desc_out
+        elif line.startswith("서브장르:"):
+            sub_out = line.replace("서브장르:", "").strip() or sub_out
+        elif line.startswith("썸네일:"):
+            thumb_out = line.replace("썸네일:", "").strip() or thumb_out
+        elif line.startswith("연령등급:"):
+            age_out = line.replace("연령등급:", "").strip() or age_out
+        elif line.startswith("출연진:"):
+            cast_out = line.replace("출연진:", "").strip() or cast_out
+
+    return genre_out, sub_out, desc_out, thumb_out, age_out, cast_out
+
+def _fill_fallback(original_genre, desc, subgenre, thumbnail, age_rating, cast):
+    return original_genre or "정보 없음", subgenre or "정보 없음", desc or "정보 없음", thumbnail or "정보 없음", age_rating or "정보 없음", cast or "정보 없음"
+
+def fill_missing_metadata_with_gemini(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre):
+    model = get_model()
+    prompt = _build_fill_prompt(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre)
+    try:
+        response = call_with_retry('gemini', model.generate_content, prompt)
+        return _parse_fill_response(response.text.strip(), original_genre, desc, subgenre, thumbnail, age_rating, cast)
+
+    except Exception as e:
+        print(f"[Gemini 오류] {program_name}: {e}")
+        return _fill_fallback(original_genre, desc, subgenre, thumbnail, age_rating, cast)
+
+async def fill_missing_metadata_with_gemini_async(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre):
+    prompt = _build_fill_prompt(program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre)
     try:
-        response = model.generate_content(prompt)
-        content = response.text.strip()
-
-        genre_out = original_genre or "정보 없음"
-        desc_out = desc or "정보 없음"
-        sub_out = subgenre or "정보 없음"
-        thumb_out = thumbnail or "정보 없음"
-        age_out = age_rating or "정보 없음"
-        cast_out = cast or "정보 없음"
-
-        lines = [line.strip() for line in content.splitlines() if line.strip()]
-        for line in lines:
-            if line.startswith("장르:"):
-                genre_out = line.replace("장르:", "").strip() or genre_out
-            elif line.startswith("설명:"):
-                desc_out = line.replace("설명:", "").strip() or desc_out
-            elif line.startswith("서브장르:"):
-                sub_out = line.replace("서브장르:", "").strip() or sub_out
-            elif line.startswith("썸네일:"):
-                thumb_out = line.replace("썸네일:", "").strip() or thumb_out
-            elif line.startswith("연령등급:"):
-                age_out = line.replace("연령등급:", "").strip() or age_out
-            elif line.startswith("출연진:"):
-                cast_out = line.replace("출연진:", "").strip() or cast_out
-
-        return genre_out, sub_out, desc_out, thumb_out, age_out, cast_out
+        response = await call_with_retry_async('gemini', _generate_content_async, prompt)
+        return _parse_fill_response(response.text.strip(), original_genre, desc, subgenre, thumbnail, age_rating, cast)
 
     except Exception as e:
         print(f"[Gemini 오류] {program_name}: {e}")
-        return original_genre or "정보 없음", subgenre or "정보 없음", desc or "정보 없음", thumbnail or "정보 없음", age_rating or "정보 없음", cast or "정보 없음"
+        return _fill_fallback(original_genre, desc, subgenre, thumbnail, age_rating, cast)
+
+def _merge_gemini_item(item, parsed):
+    # 응답 값이 비어 있으면 기존 값 → '정보 없음' 순으로 유지 (단건 파싱 규칙과 동일)
+    def pick(field, current):
+        value = (parsed.get(field) or '').strip() if isinstance(parsed.get(field), str) else ''
+        return value or current or "정보 없음"
+
+    return (
+        pick('genre', item.get('original_genre')),
+        pick('subgenre', item.get('subgenre')),
+        pick('desc', item.get('desc')),
+        pick('thumbnail', item.get('thumbnail')),
+        pick('age_rating', item.get('age_rating')),
+        pick('cast', item.get('cast')),
+    )
+
+def _is_valid_batch_result(item, merged, allowed_subgenres_by_genre):
+    genre_out, sub_out = merged[0], merged[1]
+    # 입력 장르를 유지했거나, 허용된 장르로 추론한 경우만 통과
+    if genre_out != item.get('original_genre') and genre_out not in allowed_subgenres_by_genre and genre_out not in GENRE_LIST:
+        return False
+    allowed = allowed_subgenres_by_genre.get(genre_out, [])
+    if allowed and not any(sg.strip() in allowed for sg in sub_out.split(',')):
+        return False
+    return True
+
+def _build_batch_prompt(items, allowed_subgenres_by_genre):
+    entries = []
+    for idx, item in enumerate(items):
+        genre = item.get('original_genre') or ''
+        entries.append({
+            'id': idx,
+            'program_name': item['program_name'],
+            'genre': genre or '비어 있음',
+            'desc': item.get('desc') or '비어 있음',
+            'subgenre': item.get('subgenre') or '비어 있음',
+            'thumbnail': item.get('thumbnail') or '비어 있음',
+            'age_rating': item.get('age_rating') or '비어 있음',
+            'cast': item.get('cast') or '비어 있음',
+            'allowed_subgenres': allowed_subgenres_by_genre.get(genre, []),
+        })
+
+    prompt = f"""
+다음은 IPTV 프로그램들의 메타데이터 목록(JSON)입니다. 각 항목에서 '비어 있음'인 값을 추론하여 채워주세요.
+
+❗️주의사항:
+- 'genre'가 비어 있는 경우에는 반드시 다음 중 하나로만 추론해 주세요: **{', '.join(GENRE_LIST)}**
+- 'subgenre'는 반드시 해당 항목의 allowed_subgenres 목록 중에서만 고르고, 여러 개면 쉼표로 구분해 주세요.
+- 'thumbnail'은 반드시 실제 이미지 URL만 작성해 주세요 (예: https://...). 모르면 '정보 없음'.
+- 'age_rating'은 반드시 {', '.join(f"'{r}'" for r in AGE_RATINGS)} 중 하나로 작성하세요.
+- 'cast'에 영어 이름이 있다면 반드시 한글로 번역해 주세요 (예: Tom Cruise → 톰 크루즈).
+- 이미 값이 있는 항목은 그대로 돌려주세요.
+- 입력의 id 를 그대로 포함해 모든 항목을 JSON 배열로만 출력하세요.
+
+{json.dumps(entries, ensure_ascii=False, indent=1)}
+"""
+    return prompt
+
+def _parse_batch_response(text):
+    parsed = json.loads(text)
+    return {entry['id']: entry for entry in parsed if isinstance(entry, dict) and 'id' in entry}
+
+def _batch_generation_config():
+    return genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=BATCH_RESPONSE_SCHEMA,
+    )
+
+def _request_gemini_batch(items, allowed_subgenres_by_genre):
+    prompt = _build_batch_prompt(items, allowed_subgenres_by_genre)
+    response = call_with_retry('gemini', get_model().generate_content, prompt, generation_config=_batch_generation_config())
+    return _parse_batch_response(response.text)
+
+async def _request_gemini_batch_async(items, allowed_subgenres_by_genre):
+    prompt = _build_batch_prompt(items, allowed_subgenres_by_genre)
+    response = await call_with_retry_async(
+        'gemini', _generate_content_async, prompt, generation_config=_batch_generation_config()
+    )
+    return _parse_batch_response(response.text)
+
+def fill_missing_metadata_with_gemini_batch(items, allowed_subgenres_by_genre, batch_size=None):
+    # ✅ 여러 프로그램을 한 번의 요청(JSON 스키마 응답)으로 보완
+    # items: [{'program_name', 'original_genre', 'desc', 'subgenre', 'thumbnail', 'age_rating', 'cast'}]
+    # 반환: 입력 순서대로 (genre, subgenre, desc, thumbnail, age_rating, cast)
+    batch_size = batch_size or GEMINI_BATCH_SIZE
+    results = [None] * len(items)
+
+    for start in range(0, len(items), batch_size):
+        chunk = items[start:start + batch_size]
+        try:
+            parsed_by_id = _request_gemini_batch(chunk, allowed_subgenres_by_genre)
+        except Exception as e:
+            print(f"[Gemini 배치 오류] {len(chunk)}건 → 단건 요청으로 재시도: {e}")
+            parsed_by_id = {}
+
+        for offset, item in enumerate(chunk):
+            merged = _accept_batch_item(item, parsed_by_id.get(offset), allowed_subgenres_by_genre)
+            if merged is None:
+                # ✅ 누락/검증 실패 항목만 단건 요청
+                merged = fill_missing_metadata_with_gemini(*_single_args(item), allowed_subgenres_by_genre)
+            results[start + offset] = merged
+
+    return results
+
+def _accept_batch_item(item, parsed, allowed_subgenres_by_genre):
+    if parsed is None:
+        return None
+    merged = _merge_gemini_item(item, parsed)
+    return merged if _is_valid_batch_result(item, merged, allowed_subgenres_by_genre) else None
+
+def _single_args(item):
+    return (
+        item['program_name'], item.get('original_genre'), item.get('desc'), item.get('subgenre'),
+        item.get('thumbnail'), item.get('age_rating'), item.get('cast')
+    )
+
+async def fill_missing_metadata_with_gemini_batch_async(items, allowed_subgenres_by_genre, batch_size=None):
+    # ✅ fill_missing_metadata_with_gemini_batch 의 asyncio 버전 (배치 요청끼리는 동시에)
+    batch_size = batch_size or GEMINI_BATCH_SIZE
+
+    async def fill_chunk(chunk):
+        try:
+            parsed_by_id = await _request_gemini_batch_async(chunk, allowed_subgenres_by_genre)
+        except Exception as e:
+            print(f"[Gemini 배치 오류] {len(chunk)}건 → 단건 요청으로 재시도: {e}")
+            parsed_by_id = {}
+
+        async def fill_item(offset, item):
+            merged = _accept_batch_item(item, parsed_by_id.get(offset), allowed_subgenres_by_genre)
+            if merged is None:
+                merged = await fill_missing_metadata_with_gemini_async(*_single_args(item), allowed_subgenres_by_genre)
+            return merged
+
+        return await asyncio.gather(*(fill_item(offset, item) for offset, item in enumerate(chunk)))
+
+    chunks = [items[start:start + batch_size] for start in range(0, len(items), batch_size)]
+    chunk_results = await asyncio.gather(*(fill_chunk(chunk) for chunk in chunks))
+    return [merged for chunk in chunk_results for merged in chunk]
 
 def translate_cast_to_korean(cast_english):
+    # ✅ 기존 호출부 호환 — 쉼표로 구분된 출연진 문자열을 translate_names_to_korean 한 번으로 번역
+    # (번역되지 않은 이름은 원문 그대로, 순서 유지)
     if not cast_english or not isinstance(cast_english, str):
         return ''
-
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-    model = genai.GenerativeModel(model_name="gemini-2.5-flash")
-
-    cast_list = [name.strip() for name in cast_english.split(',') if name.strip()]
-    if not cast_list:
+    names = [name.strip() for name in cast_english.split(',') if name.strip()]
+    if not names:
         return ''
+    translated = translate_names_to_korean(names)
+    return ', '.join(translated.get(name, name) for name in names)
 
-    cast_bullet = '\n'.join(f"- {name}" for name in cast_list)
+NAME_RESPONSE_SCHEMA = {
+    'type': 'array',
+    'items': {
+        'type': 'object',
+        'properties': {'name': {'type': 'string'}, 'korean': {'type': 'string'}},
+        'required': ['name', 'korean'],
+    },
+}
 
+def _build_names_prompt(names):
     prompt = f"""
-다음 외국어로 된 이름들을 한국어 이름으로 자연스럽게 번역해서 쉼표로 구분된 한 줄로 출력해줘.
-- 반드시 원본과 순서를 맞춰서 번역하고, 번역 불가하면 생략하지 말고 그대로 출력해.
-- 줄바꿈 없이, '홍길동, 김철수' 형식으로만 출력해.
-- 말투나 설명 없이 번역 결과만 출력해.
+다음 외국어로 된 인물 이름들을 한국어 표기로 자연스럽게 번역해줘.
+- 각 항목은 name(원문 그대로)과 korean(한국어 표기)으로 구성된 JSON 배열로만 출력해.
+- 번역 불가하면 korean 에 원문을 그대로 넣어.
 
-외국어 이름 목록:
-{cast_bullet}
+{json.dumps(names, ensure_ascii=False)}
 """
+    return prompt
 
-    try:
-        response = model.generate_content(prompt)
+def _names_generation_config():
+    return genai.GenerationConfig(
+        response_mime_type="application/json",
+        response_schema=NAME_RESPONSE_SCHEMA,
+    )
 
-        # ✅ 응답 구조 방어
-        translated = getattr(response, "text", "").strip()
-        if not translated:
-            print(f"[⚠️ Gemini 응답 없음] cast: {cast_english}")
-            return cast_english
+def translate_names_to_korean(names):
+    # ✅ 인물명 목록을 한 번에 번역 → {원문 이름: 한글 이름} (번역 실패한 이름은 제외)
+    # GEMINI_NAME_BATCH_SIZE 보다 많으면 나눠서 요청
+    names = [name for name in names if name]
+    if len(names) > GEMINI_NAME_BATCH_SIZE:
+        translated = {}
+        for start in range(0, len(names), GEMINI_NAME_BATCH_SIZE):
+            translated.update(translate_names_to_korean(names[start:start + GEMINI_NAME_BATCH_SIZE]))
+        return translated
+    if not names:
+        return {}
 
-        # ✅ 쉼표 형식 보정
-        translated = re.sub(r'\s*,\s*', ', ', translated)  # ' ,', ' , ', ',  ' → ', '
-        translated = re.sub(r'\s+', ' ', translated)       # 이중 공백 제거
-        translated = translated.strip().strip(',')
+    try:
+        response = call_with_retry(
+            'gemini', get_model().generate_content, _build_names_prompt(names),
+            generation_config=_names_generation_config()
+        )
+        parsed = json.loads(response.text)
+    except Exception as e:
+        print(f"[Gemini 번역 오류 - names] {len(names)}명: {e}")
+        return {}
+    return _parse_names_response(parsed, names)
 
-        return translated
+async def translate_names_to_korean_async(names):
+    names = [name for name in names if name]
+    if len(names) > GEMINI_NAME_BATCH_SIZE:
+        chunks = await asyncio.gather(*(
+            translate_names_to_korean_async(names[start:start + GEMINI_NAME_BATCH_SIZE])
+            for start in range(0, len(names), GEMINI_NAME_BATCH_SIZE)
+        ))
+        return {name: korean for chunk in chunks for name, korean in chunk.items()}
+    if not names:
+        return {}
 
+    try:
+        response = await call_with_retry_async(
+            'gemini', _generate_content_async, _build_names_prompt(names),
+            generation_config=_names_generation_config()
+        )
+        parsed = json.loads(response.text)
     except Exception as e:
-        print(f"[Gemini 번역 오류 - cast] {cast_english}: {e}")
-        return cast_english
\ No newline at end of file
+        print(f"[Gemini 번역 오류 - names] {len(names)}명: {e}")
+        return {}
+    return _parse_names_response(parsed, names)
+
+def _parse_names_response(parsed, names):
+    requested = set(names)
+    translated = {}
+    for entry in parsed:
+        if not isinstance(entry, dict):
+            continue
+        name = (entry.get('name') or '').strip()
+        korean = (entry.get('korean') or '').strip()
+        if name in requested and korean:
+            translated[name] = korean
+    return translated
+
@@ -0,0 +1,439 @@
+import io
+import os
+import csv
+import json
+import codecs
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+import pandas as pd
+
+from lib.utils.keyword_matcher import KeywordMatcher
+
+CACHE_COLUMNS = ['title', 'genre', 'subgenre', 'description', 'thumbnail', 'age_rating', 'cast']
+# 'cast' 는 SQL 예약어이므로 컬럼명은 항상 따옴표로 감쌈
+SQL_COLUMNS = ', '.join(f'"{col}"' for col in CACHE_COLUMNS)
+# IndexedMetadataCache 가 메모리에 유지하는 전체 레코드 수
+METADATA_CACHE_LRU_SIZE = int(os.getenv("METADATA_CACHE_LRU_SIZE", 512))
+# SqliteMetadataCache.save() 가 metadata_cache.csv 도 최신으로 유지할지
+# (기본 1 — csv/indexed 백엔드와 CSV 를 읽는 벤치마크가 같은 내용을 보도록, 바뀐 실행에서만 내보냄)
+METADATA_CACHE_EXPORT_CSV = os.getenv("METADATA_CACHE_EXPORT_CSV", "1") == "1"
+
+base_dir = os.path.dirname(os.path.abspath(__file__))
+exceptions_path = os.path.join(base_dir, '..', 'config', 'metadata_exceptions.json')
+
+with open(exceptions_path, 'r', encoding='utf-8') as f:
+    metadata_exceptions = json.load(f)
+
+
+# ✅ 예외 키워드 전체를 하나의 매처로 (metadata_exceptions 순서 → 키워드 순서가 우선순위)
+exception_matcher = KeywordMatcher(
+    (keyword.lower(), entry)
+    for entry in metadata_exceptions
+    for keyword in entry['title_keywords']
+)
+
+
+def match_exception(title):
+    return exception_matcher.first(title.strip().lower())
+
+
+def apply_metadata_exception(record):
+    # ✅ metadata_exceptions.json 에 등록된 프로그램은 수동 메타데이터로 덮어씀 (cast 제외)
+    matched = match_exception(record['title'])
+    if not matched:
+        return record
+    record = dict(record)
+    for col in ['genre', 'subgenre', 'description', 'thumbnail', 'age_rating']:
+        record[col] = matched[col]
+    return record
+
+
+# ✅ title → record(dict) 해시 인덱스 기반 메타데이터 캐시
+# - 로딩 시 한 번만 인덱스를 만들고, 조회는 O(1)
+# - 여러 채널 스레드에서 동시에 조회/갱신 가능
+class MetadataCache:
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self._records = {}
+        self.load()
+
+    def load(self):
+        records = {}
+        if os.path.exists(self.path):
+            df = pd.read_csv(self.path)
+            for record in df.to_dict('records'):
+                # 기존 DataFrame 조회(iloc[0])와 같이 먼저 나온 행을 우선
+                records.setdefault(record['title'], record)
+        with self._lock:
+            self._records = records
+
+    @classmethod
+    def from_frame(cls, df, path=None):
+        cache = cls.__new__(cls)
+        cache.path = path
+        cache._lock = Lock()
+        cache._records = {}
+        for record in df.to_dict('records'):
+            cache._records.setdefault(record['title'], record)
+        return cache
+
+    def get(self, title):
+        return self._records.get(title)
+
+    def __contains__(self, title):
+        return title in self._records
+
+    def __len__(self):
+        return len(self._records)
+
+    def update(self, records):
+        # 같은 title 은 새 값으로 덮어씀 (drop_duplicates(keep='last') 와 동일)
+        with self._lock:
+            before_count = len(self._records)
+            for record in records:
+                self._records[record['title']] = {col: record.get(col) for col in CACHE_COLUMNS}
+            return len(self._records) - before_count
+
+    def upsert(self, record):
+        return self.update([record])
+
+    def to_frame(self):
+        with self._lock:
+            rows = list(self._records.values())
+        return pd.DataFrame(rows, columns=CACHE_COLUMNS)
+
+    def save(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.to_frame().to_csv(path, index=False, encoding='utf-8-sig')
+
+    def close(self):
+        pass
+
+
+# ✅ 메모리에는 title 인덱스만 두는 CSV 메타데이터 캐시
+# - 로딩 시 CSV 를 한 번 훑어 title → 행 번호, 행 번호 → 파일 내 (offset, length) 만 기록
+# - genre/subgenre/age_rating 은 범주 코드(array)로 보관 → 전체 레코드 없이 get_brief() 로 조회
+# - description/cast/thumbnail 이 포함된 전체 레코드는 get() 시 파일에서 읽고, 최근 lru_size 개만 메모리에 유지
+# - 실행 중 갱신분은 overlay 에만 두었다가 save() 에서 원본과 합쳐 한 번에 기록
+# MetadataCache 와 같은 인터페이스 (빈 값은 pd.read_csv 처럼 NaN)
+class IndexedMetadataCache:
+
+    BRIEF_COLUMNS = ['genre', 'subgenre', 'age_rating']
+
+    def __init__(self, path, lru_size=METADATA_CACHE_LRU_SIZE):
+        self.path = path
+        self.lru_size = lru_size
+        self._lock = Lock()
+        self._file = None
+        self.load()
+
+    def load(self):
+        index = {}
+        offsets, lengths = array('q'), array('l')
+        categories = {col: {} for col in self.BRIEF_COLUMNS}
+        codes = {col: array('I') for col in self.BRIEF_COLUMNS}
+        columns = CACHE_COLUMNS
+
+        if os.path.exists(self.path):
+            for number, (offset, raw) in enumerate(_iter_csv_records(self.path)):
+                values = _parse_csv_record(raw)
+                if number == 0:
+                    columns = values
+                    continue
+                record = dict(zip(columns, values))
+                if record.get('title', '') == '' or record['title'] in index:
+                    # 기존 DataFrame 조회(iloc[0])와 같이 먼저 나온 행을 우선
+                    continue
+                index[record['title']] = len(offsets)
+                offsets.append(offset)
+                lengths.append(len(raw))
+                for col in self.BRIEF_COLUMNS:
+                    values_map = categories[col]
+                    codes[col].append(values_map.setdefault(record.get(col, ''), len(values_map)))
+
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = open(self.path, 'rb') if os.path.exists(self.path) else None
+            self._columns = columns
+            self._index = index
+            self._offsets = offsets
+            self._lengths = lengths
+            self._categories = {col: list(values_map) for col, values_map in categories.items()}
+            self._codes = codes
+            self._overlay = {}  # 실행 중 update 된 title → record
+            self._lru = OrderedDict()
+            self.hits = 0
+            self.misses = 0
+
+    def _read_record(self, row):
+        # 호출 측에서 _lock 을 잡은 상태로 호출
+        self._file.seek(self._offsets[row])
+        values = _parse_csv_record(self._file.read(self._lengths[row]))
+        record = dict(zip(self._columns, values))
+        return {col: _na(record.get(col, '')) for col in CACHE_COLUMNS}
+
+    def get(self, title):
+        with self._lock:
+            record = self._overlay.get(title)
+            if record is not None:
+                return record
+            record = self._lru.get(title)
+            if record is not None:
+                self._lru.move_to_end(title)
+                self.hits += 1
+                return record
+            row = self._index.get(title)
+            if row is None:
+                return None
+            self.misses += 1
+            record = self._read_record(row)
+            self._lru[title] = record
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+            return record
+
+    def get_brief(self, title):
+        # 파일을 읽지 않고 title/genre/subgenre/age_rating 만 조회
+        with self._lock:
+            record = self._overlay.get(title)
+            if record is not None:
+                return {col: record.get(col) for col in ['title'] + self.BRIEF_COLUMNS}
+            row = self._index.get(title)
+            if row is None:
+                return None
+            brief = {'title': title}
+            for col in self.BRIEF_COLUMNS:
+                brief[col] = _na(self._categories[col][self._codes[col][row]])
+            return brief
+
+    def __contains__(self, title):
+        return title in self._overlay or title in self._index
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index) + sum(title not in self._index for title in self._overlay)
+
+    def update(self, records):
+        # 같은 title 은 새 값으로 덮어씀 (MetadataCache.update 와 동일)
+        with self._lock:
+            added = 0
+            for record in records:
+                title = record['title']
+                if title not in self._index and title not in self._overlay:
+                    added += 1
+                self._overlay[title] = {col: record.get(col) for col in CACHE_COLUMNS}
+                self._lru.pop(title, None)
+            return added
+
+    def upsert(self, record):
+        return self.update([record])
+
+    def iter_records(self):
+        # 원본 순서 (갱신된 title 은 제자리에서 새 값) → 새 title 순
+        with self._lock:
+            titles = list(self._index)
+            overlay = dict(self._overlay)
+        for title in titles:
+            record = overlay.get(title)
+            if record is None:
+                with self._lock:
+                    record = self._read_record(self._index[title])
+            yield record
+        for title, record in overlay.items():
+            if title not in self._index:
+                yield record
+
+    def to_frame(self):
+        return pd.DataFrame(list(self.iter_records()), columns=CACHE_COLUMNS)
+
+    def save(self, path=None):
+        # ✅ 원본을 레코드 단위로 흘려 쓰고 (전체를 메모리에 올리지 않음) 임시 파일 → os.replace 후 인덱스 재생성
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(CACHE_COLUMNS)
+            for record in self.iter_records():
+                writer.writerow(['' if _is_na(record.get(col)) else record.get(col) for col in CACHE_COLUMNS])
+        os.replace(tmp_path, path)
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            self.load()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _iter_csv_records(path):
+    # (offset, raw bytes) — 따옴표 안의 줄바꿈은 같은 레코드 (따옴표 개수가 짝수가 될 때까지 이어 붙임)
+    with open(path, 'rb') as f:
+        offset = len(codecs.BOM_UTF8) if f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0
+        f.seek(offset)
+        start, parts, quotes = offset, [], 0
+        for line in f:
+            parts.append(line)
+            quotes += line.count(b'"')
+            offset += len(line)
+            if quotes % 2 == 0:
+                yield start, b''.join(parts)
+                start, parts, quotes = offset, [], 0
+        if parts:
+            yield start, b''.join(parts)
+
+
+def _parse_csv_record(raw):
+    text = raw.decode('utf-8').rstrip('\r\n')
+    return next(csv.reader(io.StringIO(text, newline='')), [])
+
+
+def _na(value):
+    return np.nan if value == '' else value
+
+
+def _is_na(value):
+    return value is None or (isinstance(value, float) and value != value)
+
+
+# ✅ SQLite(WAL) 기반 메타데이터 캐시
+# - 메타데이터 수집 결과를 title 단위로 즉시 upsert → 실행 중 중단돼도 보존
+# - 스레드별 커넥션 + busy_timeout 으로 여러 스레드/프로세스가 동시에 읽고 씀
+# - save() 는 이번 실행에서 캐시가 바뀌었거나 CSV 가 없을 때만 기존 metadata_cache.csv 형식으로 내보내기
+class SqliteMetadataCache:
+
+    def __init__(self, db_path, csv_path=None, timeout=30, export_csv=METADATA_CACHE_EXPORT_CSV):
+        self.db_path = db_path
+        self.path = csv_path
+        self.timeout = timeout
+        self.export_csv = export_csv
+        self._changed = False  # 이번 실행에서 update/upsert 가 있었는지 (CSV 내보내기 판단)
+        self._local = threading.local()
+        self._conns = []  # 스레드별 연결 (close() 에서 일괄 종료)
+        self._conns_lock = Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadata_cache (
+                title TEXT PRIMARY KEY,
+                genre TEXT, subgenre TEXT, description TEXT,
+                thumbnail TEXT, age_rating TEXT, "cast" TEXT,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 최초 실행 시 기존 CSV 캐시를 그대로 이관
+        if csv_path and os.path.exists(csv_path) and len(self) == 0:
+            self.import_csv(csv_path)
+            self._changed = False  # CSV 와 같은 내용이므로 다시 내보낼 필요 없음
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 연결은 만든 스레드만 사용, close() 만 다른 스레드에서 호출하므로 check_same_thread=False
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def import_csv(self, csv_path):
+        df = pd.read_csv(csv_path)
+        df = df.drop_duplicates(subset=['title'], keep='first')
+        records = df.astype(object).where(df.notna(), None).to_dict('records')
+        self.update(records, overwrite=False)
+        print(f"[캐시 이관] {csv_path} → {self.db_path} ({len(records)}개)")
+
+    def get(self, title):
+        row = self._conn().execute(
+            f"SELECT {SQL_COLUMNS} FROM metadata_cache WHERE title = ?", (title,)
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+    def __contains__(self, title):
+        return self.get(title) is not None
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+
+    def update(self, records, overwrite=True):
+        if overwrite:
+            conflict = (
+                "ON CONFLICT(title) DO UPDATE SET genre=excluded.genre, subgenre=excluded.subgenre, "
+                "description=excluded.description, thumbnail=excluded.thumbnail, "
+                "age_rating=excluded.age_rating, \"cast\"=excluded.\"cast\", updated_at=CURRENT_TIMESTAMP"
+            )
+        else:
+            conflict = "ON CONFLICT(title) DO NOTHING"
+        rows = [tuple(record.get(col) for col in CACHE_COLUMNS) for record in records]
+        titles = {row[0] for row in rows}
+        conn = self._conn()
+        # BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡아 신규 개수를 정확히 셈
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = sum(
+                conn.execute("SELECT 1 FROM metadata_cache WHERE title = ?", (title,)).fetchone() is not None
+                for title in titles
+            )
+            conn.executemany(
+                f"INSERT INTO metadata_cache ({SQL_COLUMNS}) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?) {conflict}", rows
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        added = len(titles) - existing
+        if overwrite or added:
+            self._changed = True
+        return added
+
+    def upsert(self, record):
+        return self.update([record])
+
+    def to_frame(self):
+        return pd.read_sql_query(
+            f"SELECT {SQL_COLUMNS} FROM metadata_cache ORDER BY rowid", self._conn()
+        )
+
+    def save(self, path=None):
+        # ✅ 행은 upsert 시점에 이미 DB 에 있음 → CSV 는 바뀐 실행에서만 전체 내보내기 (임시 파일 → os.replace)
+        path = path or self.path
+        if not path:
+            return
+        if not self.export_csv:
+            print(f"[캐시 CSV 내보내기 생략] METADATA_CACHE_EXPORT_CSV=0 → {path} 는 {self.db_path} 와 달라질 수 있음")
+            return
+        if not self._changed and os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.to_frame().to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        os.replace(tmp_path, path)
+        self._changed = False
+        print(f"[캐시 CSV 내보내기] {self.db_path} → {path}")
+
+    def close(self):
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
@@ -1,18 +1,40 @@
 import re
+import asyncio
 from lib.utils.text_cleaning import clean_name
-from lib.metadata.tmdb import get_program_info_from_tmdb
-from lib.metadata.naver import get_info_from_web_search, get_cast_list_from_naver
-from lib.metadata.gemini import fill_missing_metadata_with_gemini, translate_cast_to_korean
-from lib.config.genre_config import desc_keywords, allowed_subgenres_by_genre, genre_map
+from lib.utils.keyword_matcher import KeywordMatcher
+from lib.utils import metrics
+from lib.metadata.tmdb import get_program_info_from_tmdb, get_program_info_from_tmdb_async
+from lib.metadata.naver import (
+    get_info_from_web_search, get_cast_list_from_naver,
+    get_info_from_web_search_async, get_cast_list_from_naver_async
+)
+from lib.metadata.gemini import (
+    fill_missing_metadata_with_gemini_batch, translate_names_to_korean,
+    fill_missing_metadata_with_gemini_batch_async, translate_names_to_korean_async
+)
+from lib.metadata.name_cache import name_cache
+from concurrent.futures import ThreadPoolExecutor
+from lib.config.genre_config import desc_keywords, allowed_subgenres_by_genre
+
+# ✅ 설명 키워드 매처 (import 시 한 번만 생성, desc_keywords 순회 순서 = 우선순위)
+# desc_keywords 는 {장르: {서브장르: [키워드]}} 구조이고, 기존 순회는 바깥 key 와 안쪽 key 를 비교했으므로 그대로 유지
+desc_keyword_matcher = KeywordMatcher(
+    (keyword.lower().strip(), subgenre)
+    for subgenre, keywords in desc_keywords.items()
+    for keyword in keywords
+)
+
+# validate_and_fix_subgenre 3차 fallback 키워드 (키즈 → 교육 → 정보 순)
+fallback_keyword_matcher = KeywordMatcher(
+    [(k, 'kids') for k in ['키즈', '어린이', '유아', '동요', 'TV만화', '아동']]
+    + [(k, 'edu') for k in ['교육', '학습', '영어', '수학', '학교', '과학']]
+    + [(k, 'info') for k in ['정보', '생활', '교양', '인문학', '문화', '지식']]
+)
 
 def guess_subgenre_by_desc(desc):
     desc_clean = re.sub(r'[^\w\s]', ' ', desc).lower()
     desc_clean = re.sub(r'\s+', ' ', desc_clean).strip()
-    for subgenre, keywords in desc_keywords.items():
-        for keyword in keywords:
-            if keyword.lower().strip() in desc_clean:
-                return subgenre
-    return ''
+    return desc_keyword_matcher.first(desc_clean, '')
 
 def clean_subgenre_by_genre(original_genre, subgenre):
     if subgenre == '코미디':
@@ -43,21 +65,19 @@ def validate_and_fix_subgenre(original_genre, subgenre, desc, genre_text):
 
     # ✅ 3차: 키워드 기반 fallback
     text = f"{desc or ''} {genre_text or ''}"
-    keywords_kids = ['키즈', '어린이', '유아', '동요', 'TV만화', '아동']
-    keywords_edu = ['교육', '학습', '영어', '수학', '학교', '과학']
-    keywords_info = ['정보', '생활', '교양', '인문학', '문화', '지식']
+    matched = fallback_keyword_matcher.first(text)
 
-    if any(k in text for k in keywords_kids):
+    if matched == 'kids':
         return '키즈' if original_genre == '애니' else ''
-    elif any(k in text for k in keywords_edu):
+    elif matched == 'edu':
         return '교육예능' if original_genre == '예능' else ''
-    elif any(k in text for k in keywords_info):
+    elif matched == 'info':
         return '교양' if original_genre == '예능' else ''
 
     return ''
 
-def get_program_metadata(program_name, driver, original_genre, channel):
-    name = clean_name(program_name)
+def preset_program_metadata(name, program_name, original_genre):
+    # 외부 수집 없이 결정되는 프로그램 (예외 테이블 / 스포츠) → 최종 결과 튜플, 아니면 None
 
     # 예외 처리 테이블
     program_exceptions = {
@@ -75,24 +95,14 @@ def get_program_metadata(program_name, driver, original_genre, channel):
     if name in program_exceptions:
         meta = program_exceptions[name]
         genre = meta.get('genre', original_genre)
-        return genre, meta['subgenre'], meta['desc'], meta['thumbnail'], meta['age_rating'], meta['cast'], name
+        return (genre, meta['subgenre'], meta['desc'], meta['thumbnail'], meta['age_rating'], meta['cast'], name)
 
     # 스포츠 예외
     if original_genre == '스포츠':
-        return '스포츠', '스포츠', program_name, '', '전체 이용가', '정보 없음', program_name
-    
-    # ✅ TMDb 정보 가져오기 (오류 출력 추가)
-    try:
-        desc, thumbnail, subgenre, age_rating, cast = get_program_info_from_tmdb(name, original_genre, channel)
-    except Exception as e:
-        print(f"[TMDb 오류] 프로그램명: '{program_name}' → {e}")
-        desc, thumbnail, subgenre, age_rating, cast = '', '', '', '', '정보 없음'
-
-    # NAVER 보완
-    genre_text, web_thumb = get_info_from_web_search(driver, name)
-    if not thumbnail:
-        thumbnail = web_thumb
+        return ('스포츠', '스포츠', program_name, '', '전체 이용가', '정보 없음', program_name)
+    return None
 
+def refine_genre_by_web(original_genre, subgenre, genre_text):
     # 애니 장르 정제
     if genre_text == '애니':
         original_genre = '애니'
@@ -116,30 +126,117 @@ def get_program_metadata(program_name, driver, original_genre, channel):
         if subgenre in forbidden:
             subgenre = ''
 
-    # 출연진 처리
-    if cast and all(ord(c) < 128 for c in cast):
-        cast = translate_cast_to_korean(cast)
-    if not cast or cast == '정보 없음':
-        cast_from_naver = get_cast_list_from_naver(driver, program_name)
-        if cast_from_naver:
-            cast = cast_from_naver
+    return original_genre, subgenre
 
+def build_partial_state(program_name, original_genre, subgenre, desc, thumbnail, age_rating, cast, genre_text):
     # 1차 클린징
     subgenre = clean_subgenre_by_genre(original_genre, subgenre)
 
     # 2차 이상치 제거 및 보정
     subgenre = validate_and_fix_subgenre(original_genre, subgenre, desc, genre_text)
 
-    # Gemini로 보완
-    if not original_genre or not desc or not subgenre or not thumbnail or not age_rating or not cast:
-        genre_out, subgenre, desc, thumbnail, age_rating, cast = fill_missing_metadata_with_gemini(
-            program_name, original_genre, desc, subgenre, thumbnail, age_rating, cast, allowed_subgenres_by_genre
-        )
-        original_genre = genre_out
-       
-        # ✅ 보완 후 재검증
-        subgenre = validate_and_fix_subgenre(original_genre, subgenre, desc, genre_text)
-        
+    return {
+        'program_name': program_name,
+        'original_genre': original_genre,
+        'desc': desc,
+        'subgenre': subgenre,
+        'thumbnail': thumbnail,
+        'age_rating': age_rating,
+        'cast': cast,
+        'genre_text': genre_text,
+    }
+
+def collect_program_metadata(program_name, driver, original_genre, channel):
+    # ✅ Gemini 보완 직전까지 수집 (TMDb → Naver → 출연진)
+    # 반환: ('done', 최종 결과 튜플) 또는 ('partial', 중간 상태 dict)
+    name = clean_name(program_name)
+
+    preset = preset_program_metadata(name, program_name, original_genre)
+    if preset is not None:
+        metrics.count('metadata_titles_total', result='preset')
+        return 'done', preset
+    
+    # ✅ TMDb 정보 가져오기 (오류 출력 추가)
+    try:
+        desc, thumbnail, subgenre, age_rating, cast = get_program_info_from_tmdb(name, original_genre, channel)
+    except Exception as e:
+        print(f"[TMDb 오류] 프로그램명: '{program_name}' → {e}")
+        desc, thumbnail, subgenre, age_rating, cast = '', '', '', '', '정보 없음'
+
+    # NAVER 보완
+    genre_text, web_thumb = get_info_from_web_search(driver, name)
+    if not thumbnail:
+        thumbnail = web_thumb
+
+    original_genre, subgenre = refine_genre_by_web(original_genre, subgenre, genre_text)
+
+    # 출연진 처리 (영문 출연진의 한글 번역은 배치 단위로 translate_collected_casts 에서)
+    if not cast or cast == '정보 없음':
+        cast_from_naver = get_cast_list_from_naver(driver, program_name)
+        if cast_from_naver:
+            cast = cast_from_naver
+
+    metrics.count('metadata_titles_total', result='collected')
+    return 'partial', build_partial_state(
+        program_name, original_genre, subgenre, desc, thumbnail, age_rating, cast, genre_text
+    )
+
+async def collect_program_metadata_async(session, program_name, original_genre, channel):
+    # ✅ collect_program_metadata 의 asyncio 버전 — 서로 독립인 TMDb / Naver 장르 검색을 동시에
+    name = clean_name(program_name)
+
+    preset = preset_program_metadata(name, program_name, original_genre)
+    if preset is not None:
+        metrics.count('metadata_titles_total', result='preset')
+        return 'done', preset
+
+    async def tmdb_info():
+        try:
+            return await get_program_info_from_tmdb_async(session, name, original_genre, channel)
+        except Exception as e:
+            print(f"[TMDb 오류] 프로그램명: '{program_name}' → {e}")
+            return '', '', '', '', '정보 없음'
+
+    tmdb_result, (genre_text, web_thumb) = await asyncio.gather(
+        tmdb_info(), get_info_from_web_search_async(session, name)
+    )
+    desc, thumbnail, subgenre, age_rating, cast = tmdb_result
+    if not thumbnail:
+        thumbnail = web_thumb
+
+    original_genre, subgenre = refine_genre_by_web(original_genre, subgenre, genre_text)
+
+    # 출연진 처리 (영문 출연진의 한글 번역은 배치 단위로 translate_collected_casts_async 에서)
+    if not cast or cast == '정보 없음':
+        cast_from_naver = await get_cast_list_from_naver_async(session, program_name)
+        if cast_from_naver:
+            cast = cast_from_naver
+
+    metrics.count('metadata_titles_total', result='collected')
+    return 'partial', build_partial_state(
+        program_name, original_genre, subgenre, desc, thumbnail, age_rating, cast, genre_text
+    )
+
+def needs_gemini(state):
+    return not all(state[key] for key in ['original_genre', 'desc', 'subgenre', 'thumbnail', 'age_rating', 'cast'])
+
+def apply_gemini_result(state, gemini_result):
+    genre_out, subgenre, desc, thumbnail, age_rating, cast = gemini_result
+    state = dict(state, original_genre=genre_out, desc=desc, thumbnail=thumbnail, age_rating=age_rating, cast=cast)
+
+    # ✅ 보완 후 재검증
+    state['subgenre'] = validate_and_fix_subgenre(genre_out, subgenre, desc, state['genre_text'])
+    return state
+
+def finalize_program_metadata(state):
+    program_name = state['program_name']
+    original_genre = state['original_genre']
+    subgenre = state['subgenre']
+    desc = state['desc']
+    thumbnail = state['thumbnail']
+    age_rating = state['age_rating']
+    cast = state['cast']
+
     # 설명 및 연령 정리
     desc = re.sub(r'\s+', ' ', desc or '').strip()
     age_rating = age_rating.strip().upper() if age_rating else '전체 이용가'
@@ -156,4 +253,151 @@ def get_program_metadata(program_name, driver, original_genre, channel):
     if original_genre == '교육':
         original_genre, subgenre = '예능', '교육예능'
 
-    return original_genre, subgenre, desc, thumbnail, age_rating, cast, program_name
\ No newline at end of file
+    return original_genre, subgenre, desc, thumbnail, age_rating, cast, program_name
+
+def is_foreign_cast(cast):
+    return bool(cast) and all(ord(c) < 128 for c in cast)
+
+def split_cast(cast):
+    return [name.strip() for name in cast.split(',') if name.strip()]
+
+def foreign_cast_states(collected):
+    # 출연진이 영문(TMDb 원문)인 중간 상태들 + 그 이름들 (중복 제거, 순서 유지)
+    states = [state for status, state in collected if status == 'partial' and is_foreign_cast(state['cast'])]
+    names = list(dict.fromkeys(name for state in states for name in split_cast(state['cast'])))
+    return states, names
+
+def apply_cast_translations(states, found):
+    for state in states:
+        state['cast'] = ', '.join(found.get(name, name) for name in split_cast(state['cast']))
+
+def translate_collected_casts(collected):
+    # ✅ 배치 전체의 영문 출연진을 이름 단위로 모아 사전 조회 → 처음 보는 이름만 Gemini 한 번에 번역
+    states, names = foreign_cast_states(collected)
+    if not states:
+        return
+    found, missing = name_cache.split(names)
+    if missing:
+        translated = translate_names_to_korean(missing)
+        name_cache.update(translated)
+        found.update(translated)
+    apply_cast_translations(states, found)
+
+# 번역 요청 중인 인물명 → asyncio.Future (동시에 보강 중인 배치끼리 같은 이름을 중복 요청하지 않도록)
+_pending_names = {}
+
+async def translate_collected_casts_async(collected):
+    states, names = foreign_cast_states(collected)
+    if not states:
+        return
+
+    found, missing = name_cache.split(names)
+    waiting = {name: _pending_names[name] for name in missing if name in _pending_names}
+    requested = [name for name in missing if name not in waiting]
+    if requested:
+        loop = asyncio.get_running_loop()
+        futures = {name: loop.create_future() for name in requested}
+        _pending_names.update(futures)
+        try:
+            translated = await translate_names_to_korean_async(requested)
+            name_cache.update(translated)
+            found.update(translated)
+        finally:
+            for name, future in futures.items():
+                _pending_names.pop(name, None)
+                future.set_result(found.get(name))
+
+    for name, future in waiting.items():
+        korean = await future
+        if korean:
+            found[name] = korean
+    apply_cast_translations(states, found)
+
+def get_program_metadata(program_name, driver, original_genre, channel):
+    # ✅ 기존 단건 호출부 호환 — 배치 경로에 한 제목만 넘김 (수집 실패는 예외)
+    result = get_program_metadata_batch([(program_name, original_genre, channel)], driver=driver)[0]
+    if result is None:
+        raise RuntimeError(f"'{program_name}' 메타데이터 수집 실패")
+    return result
+
+async def get_program_metadata_async(session, program_name, original_genre, channel):
+    # ✅ get_program_metadata 의 asyncio 버전 (session: aiohttp.ClientSession)
+    result = (await get_program_metadata_batch_async(session, [(program_name, original_genre, channel)]))[0]
+    if result is None:
+        raise RuntimeError(f"'{program_name}' 메타데이터 수집 실패")
+    return result
+
+def get_program_metadata_batch(programs, driver=None, max_workers=4, batch_size=None):
+    # ✅ programs: [(program_name, original_genre, channel)] → 입력 순서대로 finalize_program_metadata 결과 (실패는 None)
+    # TMDb/Naver 수집은 병렬, Gemini 보완은 모아서 배치 요청
+    def collect(program):
+        program_name, original_genre, channel = program
+        try:
+            with metrics.timer('stage_seconds', stage='metadata_collect'):
+                return collect_program_metadata(program_name, driver, original_genre, channel)
+        except Exception as e:
+            print(f"[메타데이터 수집 오류] '{program_name}' → {e}")
+            metrics.count('metadata_titles_total', result='error')
+            return 'error', None
+
+    if driver is not None:
+        max_workers = 1  # 하나의 드라이버를 여러 스레드가 함께 쓰지 않도록
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        collected = list(executor.map(collect, programs))
+
+    translate_collected_casts(collected)
+    pending = gemini_pending(collected)
+    if pending:
+        metrics.count('metadata_gemini_fill_total', len(pending), mode='batch')
+        with metrics.timer('stage_seconds', stage='gemini_fill'):
+            gemini_results = fill_missing_metadata_with_gemini_batch(
+                [collected[idx][1] for idx in pending], allowed_subgenres_by_genre, batch_size=batch_size
+            )
+        apply_gemini_results(collected, pending, gemini_results)
+
+    return finalize_collected(collected)
+
+async def get_program_metadata_batch_async(session, programs, batch_size=None):
+    # ✅ get_program_metadata_batch 의 asyncio 버전 — 모든 제목의 수집을 한 이벤트 루프에서 동시에
+    # (소스별 동시성/QPS 는 call_with_retry_async 의 세마포어/토큰 버킷이 제한)
+    async def collect(program):
+        program_name, original_genre, channel = program
+        try:
+            with metrics.timer('stage_seconds', stage='metadata_collect'):
+                return await collect_program_metadata_async(session, program_name, original_genre, channel)
+        except Exception as e:
+            print(f"[메타데이터 수집 오류] '{program_name}' → {e}")
+            metrics.count('metadata_titles_total', result='error')
+            return 'error', None
+
+    collected = list(await asyncio.gather(*(collect(program) for program in programs)))
+
+    await translate_collected_casts_async(collected)
+    pending = gemini_pending(collected)
+    if pending:
+        metrics.count('metadata_gemini_fill_total', len(pending), mode='batch')
+        with metrics.timer('stage_seconds', stage='gemini_fill'):
+            gemini_results = await fill_missing_metadata_with_gemini_batch_async(
+                [collected[idx][1] for idx in pending], allowed_subgenres_by_genre, batch_size=batch_size
+            )
+        apply_gemini_results(collected, pending, gemini_results)
+
+    return finalize_collected(collected)
+
+def gemini_pending(collected):
+    return [idx for idx, (status, state) in enumerate(collected) if status == 'partial' and needs_gemini(state)]
+
+def apply_gemini_results(collected, pending, gemini_results):
+    for idx, gemini_result in zip(pending, gemini_results):
+        collected[idx] = ('partial', apply_gemini_result(collected[idx][1], gemini_result))
+
+def finalize_collected(collected):
+    results = []
+    for status, result in collected:
+        if status == 'done':
+            results.append(result)
+        elif status == 'partial':
+            results.append(finalize_program_metadata(result))
+        else:
+            results.append(None)
+    return results
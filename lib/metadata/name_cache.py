@@ -0,0 +1,55 @@
+import os
+import json
+from threading import Lock
+
+
+# ✅ 인물명(영문) → 한글 이름 사전 (실행 간 유지되는 JSON 파일)
+class NameCache:
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = Lock()
+        self._names = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._names = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[이름 캐시 로딩 오류] {path} → {e}")
+
+    def split(self, names):
+        # (캐시에 있는 {name: korean}, 캐시에 없는 name 목록)
+        found, missing = {}, []
+        with self._lock:
+            for name in names:
+                if name in self._names:
+                    found[name] = self._names[name]
+                    self.hits += 1
+                elif name not in missing:
+                    missing.append(name)
+                    self.misses += 1
+        return found, missing
+
+    def update(self, translated):
+        if not translated:
+            return
+        with self._lock:
+            self._names.update(translated)
+            self._save()
+
+    def _save(self):
+        # 호출 측에서 _lock 을 잡은 상태로 호출 (임시 파일 → os.replace 로 원자적 저장)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._names, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._names)
+
+
+# 다른 실행 중 생성 파일과 같이 ./ifitv_crawler/cache 아래 (metadata_cache.csv 와 같은 위치)
+name_cache = NameCache(os.getenv("CAST_NAME_CACHE_PATH", "./ifitv_crawler/cache/cast_name_cache.json"))
@@ -1,54 +1,222 @@
-import time
-import re
-from urllib.parse import quote
+import os
+import asyncio
+import aiohttp
+import requests
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlencode
 from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from lib.utils.text_cleaning import clean_name
+from lib.utils.rate_limit import call_with_retry, call_with_retry_async
+
+NAVER_SEARCH_URL = os.getenv("NAVER_SEARCH_URL", "https://search.naver.com/search.naver")
+NAVER_TIMEOUT = float(os.getenv("NAVER_TIMEOUT", "10"))
+# ✅ 1 이면 HTTP 로 먼저 조회하고, 실패 시에만 Selenium 드라이버 사용
+NAVER_USE_HTTP = os.getenv("NAVER_USE_HTTP", "1") == "1"
+# 검색어별 파싱 결과 캐시 크기 (sync lru_cache / async 캐시 공통)
+NAVER_SEARCH_CACHE_SIZE = int(os.getenv("NAVER_SEARCH_CACHE_SIZE", 4096))
+
+GENRE_SELECTOR = "div.sub_title span"
+THUMBNAIL_SELECTOR = (
+    '#main_pack div[class*="_broadcast_button_scroller"] div.cm_content_wrap._broadcast_normal_total '
+    '> div:nth-child(1) div.detail_info a img'
+)
+CAST_PRIMARY_SELECTOR = (
+    '#main_pack > div.sc_new._kgs_broadcast.cs_common_module._broadcast_button_scroller.case_normal.color_13 '
+    '> div.cm_content_wrap._broadcast_normal_total > div > div.list_image_info._content > ul > li > div > div > span > a'
+)
+CAST_BACKUP_SELECTOR = '#main_pack div.cm_content_wrap._broadcast_normal_total ul li div div strong a'
+
+_session = requests.Session()
+_session.headers.update({
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/124.0 Safari/537.36'
+    ),
+    'Accept-Language': 'ko-KR,ko;q=0.9',
+})
+_adapter = HTTPAdapter(pool_connections=2, pool_maxsize=16)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+# ✅ Crawler 가 소유한 DriverPool (driver 인자가 None 이면 여기서 빌려 씀)
+_driver_pool = None
+
+def set_driver_pool(pool):
+    global _driver_pool
+    _driver_pool = pool
+
+def clear_driver_pool(pool):
+    # 다른 실행이 그 사이에 등록한 풀은 그대로 둠
+    global _driver_pool
+    if _driver_pool is pool:
+        _driver_pool = None
+
+def _wait_page_ready(driver):
+    WebDriverWait(driver, NAVER_TIMEOUT, poll_frequency=0.1).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+@contextmanager
+def _borrow_driver(driver):
+    if driver is not None:
+        yield driver
+        return
+    if _driver_pool is None:
+        raise RuntimeError("네이버 검색용 드라이버가 없습니다 (set_driver_pool 필요)")
+    with _driver_pool.session(warm=False) as (pooled_driver, _):
+        yield pooled_driver
+
+def parse_cast(soup):
+    cast_tags = soup.select(CAST_PRIMARY_SELECTOR)
+    cast_list = [tag.get_text(strip=True) for tag in cast_tags[:5]]
+
+    if not cast_list:
+        cast_tags = soup.select(CAST_BACKUP_SELECTOR)
+        cast_list = [tag.get_text(strip=True) for tag in cast_tags[:5]]
+
+    return ', '.join(cast_list) if cast_list else ''
+
+def parse_naver_search(html):
+    # ✅ 검색 결과 페이지 한 장에서 장르 / 썸네일 / 출연진 추출
+    soup = BeautifulSoup(html, 'html.parser')
+
+    genre_tag = soup.select_one(GENRE_SELECTOR)
+    genre = genre_tag.get_text(strip=True) if genre_tag else ''
+
+    thumb_tag = soup.select_one(THUMBNAIL_SELECTOR)
+    thumbnail = thumb_tag.get('src', '') if thumb_tag else ''
+
+    return genre, thumbnail, parse_cast(soup)
+
+def search_url(query):
+    # Selenium 경로도 HTTP 경로와 같은 NAVER_SEARCH_URL 사용
+    return f"{NAVER_SEARCH_URL}?{urlencode({'query': query})}"
+
+def fetch_naver_search_html(query):
+    def fetch():
+        res = _session.get(NAVER_SEARCH_URL, params={'query': query}, timeout=NAVER_TIMEOUT)
+        res.raise_for_status()
+        return res.text
+
+    return call_with_retry('naver', fetch)
+
+@lru_cache(maxsize=NAVER_SEARCH_CACHE_SIZE)
+def search_naver(query):
+    # ✅ 정제된 검색어 단위로 파싱 결과 캐시 (예외는 캐시되지 않음)
+    return parse_naver_search(fetch_naver_search_html(query))
+
+# search_naver_async 의 검색어별 결과 (최근 NAVER_SEARCH_CACHE_SIZE 개만 유지, 예외는 저장하지 않음)
+# 엔진의 이벤트 루프 스레드에서만 접근하므로 잠금 없음
+_async_search_results = OrderedDict()
+
+async def search_naver_async(session, query):
+    if query in _async_search_results:
+        _async_search_results.move_to_end(query)
+        return _async_search_results[query]
+
+    async def fetch():
+        async with session.get(
+            NAVER_SEARCH_URL, params={'query': query}, headers=dict(_session.headers),
+            timeout=aiohttp.ClientTimeout(total=NAVER_TIMEOUT)
+        ) as res:
+            res.raise_for_status()
+            return await res.text()
+
+    html = await call_with_retry_async('naver', fetch)
+    # BeautifulSoup 파싱은 CPU 작업이라 이벤트 루프 밖에서
+    result = _async_search_results[query] = await asyncio.to_thread(parse_naver_search, html)
+    while len(_async_search_results) > NAVER_SEARCH_CACHE_SIZE:
+        _async_search_results.popitem(last=False)
+    return result
+
+def _selenium_info_search(driver, query):
+    with _borrow_driver(driver) as driver:
+        call_with_retry('naver', driver.get, search_url(query))
+        _wait_page_ready(driver)
+
+        try:
+            genre = driver.find_element(By.CSS_SELECTOR, GENRE_SELECTOR).text.strip()
+        except:
+            genre = ''
+
+        try:
+            thumbnail = driver.find_element(By.CSS_SELECTOR, THUMBNAIL_SELECTOR).get_attribute("src")
+        except:
+            thumbnail = ''
+
+    return genre, thumbnail
+
+def _selenium_cast_search(driver, query):
+    with _borrow_driver(driver) as driver:
+        call_with_retry('naver', driver.get, search_url(query))
+        _wait_page_ready(driver)
+        page_source = driver.page_source
+
+    soup = BeautifulSoup(page_source, 'html.parser')
+    return parse_cast(soup)
 
 def get_info_from_web_search(driver, name):
     cleaned = clean_name(name)
     query = f"{cleaned} 정보"
-    driver.get(f"https://search.naver.com/search.naver?query={quote(query)}")
-    time.sleep(1.5)
 
-    try:
-        genre = driver.find_element(By.CSS_SELECTOR, "div.sub_title span").text.strip()
-    except:
-        genre = ''
+    if NAVER_USE_HTTP:
+        try:
+            genre, thumbnail, _ = search_naver(query)
+            return genre, thumbnail
+        except Exception as e:
+            print(f"[네이버 HTTP 오류] {query} → {e} (Selenium 으로 재시도)")
 
-    try:
-        thumbnail = driver.find_element(
-            By.CSS_SELECTOR,
-            '#main_pack div[class*="_broadcast_button_scroller"] div.cm_content_wrap._broadcast_normal_total > div:nth-child(1) div.detail_info a img'
-        ).get_attribute("src")
-    except:
-        thumbnail = ''
+    return _selenium_info_search(driver, query)
 
-    return genre, thumbnail
+async def get_info_from_web_search_async(session, name):
+    # ✅ HTTP 는 이벤트 루프에서, Selenium fallback 은 별도 스레드에서 (풀의 드라이버 사용)
+    query = f"{clean_name(name)} 정보"
+    if NAVER_USE_HTTP:
+        try:
+            genre, thumbnail, _ = await search_naver_async(session, query)
+            return genre, thumbnail
+        except Exception as e:
+            print(f"[네이버 HTTP 오류] {query} → {e} (Selenium 으로 재시도)")
+    return await asyncio.to_thread(_selenium_info_search, None, query)
 
 def get_cast_list_from_naver(driver, program_title):
     try:
         cleaned = clean_name(program_title)
-        query = f"{cleaned} 출연진"
-        url = f"https://search.naver.com/search.naver?query={quote(query)}"
-        driver.get(url)
-        time.sleep(1.5)
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        primary_selector = (
-            '#main_pack > div.sc_new._kgs_broadcast.cs_common_module._broadcast_button_scroller.case_normal.color_13 '
-            '> div.cm_content_wrap._broadcast_normal_total > div > div.list_image_info._content > ul > li > div > div > span > a'
-        )
-        cast_tags = soup.select(primary_selector)
-        cast_list = [tag.get_text(strip=True) for tag in cast_tags[:5]]
 
-        if not cast_list:
-            backup_selector = '#main_pack div.cm_content_wrap._broadcast_normal_total ul li div div strong a'
-            cast_tags = soup.select(backup_selector)
-            cast_list = [tag.get_text(strip=True) for tag in cast_tags[:5]]
+        if NAVER_USE_HTTP:
+            try:
+                # '정보' 페이지(이미 캐시됨)에 출연진이 있으면 추가 요청 없이 사용
+                _, _, cast = search_naver(f"{cleaned} 정보")
+                if not cast:
+                    _, _, cast = search_naver(f"{cleaned} 출연진")
+                return cast
+            except Exception as e:
+                print(f"[네이버 HTTP 오류] {cleaned} 출연진 → {e} (Selenium 으로 재시도)")
+
+        return _selenium_cast_search(driver, f"{cleaned} 출연진")
+
+    except Exception as e:
+        print(f"[네이버 출연진 오류] {program_title}: {e}")
+        return ''
+
+async def get_cast_list_from_naver_async(session, program_title):
+    try:
+        cleaned = clean_name(program_title)
+        if NAVER_USE_HTTP:
+            try:
+                _, _, cast = await search_naver_async(session, f"{cleaned} 정보")
+                if not cast:
+                    _, _, cast = await search_naver_async(session, f"{cleaned} 출연진")
+                return cast
+            except Exception as e:
+                print(f"[네이버 HTTP 오류] {cleaned} 출연진 → {e} (Selenium 으로 재시도)")
 
-        return ', '.join(cast_list) if cast_list else ''
+        return await asyncio.to_thread(_selenium_cast_search, None, f"{cleaned} 출연진")
 
     except Exception as e:
         print(f"[네이버 출연진 오류] {program_title}: {e}")
@@ -1,98 +1,310 @@
 import os
 import re
+import json
+import time
+import asyncio
+import hashlib
+import aiohttp
 import requests
+from threading import Lock, get_ident
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
 from lib.config.genre_config import tmdb_genre_map, genre_name_to_kor
+from lib.utils.rate_limit import call_with_retry, call_with_retry_async
+from lib.utils import metrics
 
 from dotenv import load_dotenv
 load_dotenv()
 
+TMDB_API_BASE = os.getenv("TMDB_API_BASE", "https://api.themoviedb.org/3")
+TMDB_TIMEOUT = float(os.getenv("TMDB_TIMEOUT", "10"))
+# tv / movie 검색을 동시에 보낼지 여부 (검색 1회 낭비 대신 RTT 1회 절약)
+TMDB_CONCURRENT_SEARCH = os.getenv("TMDB_CONCURRENT_SEARCH", "1") == "1"
+
+# ✅ keep-alive 커넥션을 재사용하는 공용 세션
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32)
+_session.mount('https://', _adapter)
+_session.mount('http://', _adapter)
+
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='tmdb-search')
+
+
+# ✅ TMDb 응답 디스크 캐시
+# - key: 엔드포인트 + 정규화된 파라미터 (api_key 제외)
+# - 엔드포인트 종류별 TTL, 최대 개수 초과 시 오래된 파일부터 삭제
+# - 적중/미스/삭제 수는 실행 리포트(metrics)의 response_cache_total{cache="tmdb"} 로 보고
+class TmdbResponseCache:
+
+    def __init__(self, cache_dir, ttls=None, max_entries=20000):
+        self.cache_dir = cache_dir
+        self.ttls = ttls or {'search': 24 * 3600, 'detail': 7 * 24 * 3600}
+        self.max_entries = max_entries
+        self.enabled = True
+        self._lock = Lock()
+        self._count = 0
+        if os.path.isdir(cache_dir):
+            self._count = sum(1 for name in os.listdir(cache_dir) if name.endswith('.json'))
+
+    def _key(self, path, params):
+        normalized = sorted((k, str(v)) for k, v in params.items() if k != 'api_key')
+        raw = json.dumps([path, normalized], ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _ttl(self, path):
+        return self.ttls['search'] if path.startswith('/search') else self.ttls['detail']
+
+    def _file(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, path, params):
+        if not self.enabled:
+            return None
+        file_path = self._file(self._key(path, params))
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if time.time() - entry['ts'] <= self._ttl(path):
+                metrics.count('response_cache_total', cache='tmdb', result='hit')
+                return entry['data']
+        except (OSError, ValueError, KeyError):
+            pass
+        metrics.count('response_cache_total', cache='tmdb', result='miss')
+        return None
+
+    def put(self, path, params, data):
+        if not self.enabled:
+            return
+        file_path = self._file(self._key(path, params))
+        is_new = not os.path.exists(file_path)
+        tmp_path = f"{file_path}.{os.getpid()}.{get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'ts': time.time(), 'path': path, 'data': data}, f, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            print(f"[TMDb 캐시 저장 오류] {path} → {e}")
+            return
+        with self._lock:
+            if is_new:
+                self._count += 1
+            need_evict = self._count > self.max_entries
+        if need_evict:
+            self._evict()
+
+    def _evict(self):
+        # 오래된 파일부터 최대 개수의 90% 까지 정리
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    full = os.path.join(self.cache_dir, name)
+                    try:
+                        entries.append((os.path.getmtime(full), full))
+                    except OSError:
+                        continue
+            entries.sort()
+            target = int(self.max_entries * 0.9)
+            removed = 0
+            for _, full in entries[:max(0, len(entries) - target)]:
+                try:
+                    os.remove(full)
+                    removed += 1
+                except OSError:
+                    pass
+            self._count = len(entries) - removed
+        metrics.count('response_cache_total', removed, cache='tmdb', result='evicted')
+
+
+response_cache = TmdbResponseCache(
+    os.getenv("TMDB_CACHE_DIR", "./ifitv_crawler/cache/tmdb_http"),
+    ttls={
+        'search': int(os.getenv("TMDB_CACHE_TTL_SEARCH", 24 * 3600)),
+        'detail': int(os.getenv("TMDB_CACHE_TTL_DETAIL", 7 * 24 * 3600)),
+    },
+    max_entries=int(os.getenv("TMDB_CACHE_MAX_ENTRIES", 20000)),
+)
+
 def clean_title_for_tmdb(title):
     title = re.sub(r'[\(\)\[\]〈〉“”"\':\-\|·,~!@#\$%\^&\*\+=]+', ' ', title)
     title = re.sub(r'\s+', ' ', title)
     return title.strip()
 
-def get_program_info_from_tmdb(title, original_genre, channel=None):
-    api_key = os.getenv("TMDB_API_KEY")
-    image_base_url = "https://image.tmdb.org/t/p/w500"
+def _tmdb_get(path, params):
+    cached = response_cache.get(path, params)
+    if cached is not None:
+        return cached
+
+    def fetch():
+        res = _session.get(
+            f"{TMDB_API_BASE}{path}",
+            params=_tmdb_params(params),
+            timeout=TMDB_TIMEOUT
+        )
+        res.raise_for_status()
+        return res.json()
+
+    data = call_with_retry('tmdb', fetch)
+    response_cache.put(path, params, data)
+    return data
+
+def _tmdb_params(params):
+    return {"api_key": os.getenv("TMDB_API_KEY"), **params}
+
+async def _tmdb_get_async(session, path, params):
+    cached = response_cache.get(path, params)
+    if cached is not None:
+        return cached
+
+    async def fetch():
+        # aiohttp 는 None 값 파라미터를 허용하지 않음
+        query = {k: v for k, v in _tmdb_params(params).items() if v is not None}
+        async with session.get(
+            f"{TMDB_API_BASE}{path}", params=query, timeout=aiohttp.ClientTimeout(total=TMDB_TIMEOUT)
+        ) as res:
+            res.raise_for_status()
+            return await res.json()
+
+    data = await call_with_retry_async('tmdb', fetch)
+    response_cache.put(path, params, data)
+    return data
+
+def _search_params(title):
+    return {"query": title, "language": "ko-KR"}
+
+def _detail_params(content_type):
+    # ✅ 상세 + 출연진 + 등급을 append_to_response 로 한 번에 조회
+    rating_key = "content_ratings" if content_type == "tv" else "release_dates"
+    return {"language": "ko-KR", "append_to_response": f"credits,{rating_key}"}
+
+def search_tmdb(content_type, title):
+    return _tmdb_get(f"/search/{content_type}", _search_params(title)).get("results", [])
+
+def get_tmdb_detail(content_type, content_id):
+    return _tmdb_get(f"/{content_type}/{content_id}", _detail_params(content_type))
+
+async def search_tmdb_async(session, content_type, title):
+    data = await _tmdb_get_async(session, f"/search/{content_type}", _search_params(title))
+    return data.get("results", [])
 
+async def get_tmdb_detail_async(session, content_type, content_id):
+    return await _tmdb_get_async(session, f"/{content_type}/{content_id}", _detail_params(content_type))
+
+def _search_endpoints(original_genre):
     if original_genre in ["드라마", "예능", "보도"]:
-        endpoints = [("tv", "name"), ("movie", "title")]
-    else:
-        endpoints = [("movie", "title"), ("tv", "name")]
+        return [("tv", "name"), ("movie", "title")]
+    return [("movie", "title"), ("tv", "name")]
+
+def _pick_search_result(title, results):
+    return results[1] if title == '인간극장' and len(results) > 1 else results[0]
+
+def parse_tmdb_detail(content_type, detail):
+    # 상세 응답 → (desc, thumbnail, subgenre, age_rating, cast)
+    image_base_url = "https://image.tmdb.org/t/p/w500"
 
-    cleaned_title = clean_title_for_tmdb(title)
+    desc = detail.get("overview", "")
+    poster_path = detail.get("poster_path")
+    thumbnail = image_base_url + poster_path if poster_path else ''
+
+    genre_data = detail.get("genres", [])
+    genre_ids = [g.get("id") for g in genre_data if g.get("id") is not None]
+    subgenres = list({tmdb_genre_map.get(gid) for gid in genre_ids if tmdb_genre_map.get(gid)})
+
+    credits = detail.get("credits") or {}
+    cast_list = [c["name"] for c in credits.get("cast", [])[:5]]
+    cast = ', '.join(cast_list)
+
+    age_rating = ''
+    try:
+        if content_type == "tv":
+            rating_json = detail.get("content_ratings") or {}
+            for entry in rating_json.get("results", []):
+                if entry.get("iso_3166_1") == "KR":
+                    age_rating = entry.get("rating", "")
+                    break
+        else:
+            rating_json = detail.get("release_dates") or {}
+            for entry in rating_json.get("results", []):
+                if entry.get("iso_3166_1") == "KR":
+                    for release in entry.get("release_dates", []):
+                        if release.get("certification"):
+                            age_rating = release["certification"]
+                            break
+    except:
+        age_rating = ''
+
+    if not subgenres:
+        fallback_names = [genre_name_to_kor.get(g.get("name"), '') for g in genre_data]
+        subgenres = [name for name in fallback_names if name]
+
+    subgenre = ', '.join(subgenres).strip()
+
+    return desc, thumbnail, subgenre, age_rating, cast
+
+def get_program_info_from_tmdb(title, original_genre, channel=None):
+    endpoints = _search_endpoints(original_genre)
+
+    # 우선순위는 그대로 두고, 두 검색 요청만 미리 동시에 보냄
+    search_futures = {}
+    if TMDB_CONCURRENT_SEARCH:
+        search_futures = {
+            content_type: _search_executor.submit(search_tmdb, content_type, title)
+            for content_type, _ in endpoints
+        }
 
     for content_type, title_key in endpoints:
         try:
-            search_url = f"https://api.themoviedb.org/3/search/{content_type}"
-            params = {"api_key": api_key, "query": title, "language": "ko-KR"}
-            search_res = requests.get(search_url, params=params)
-            search_res.raise_for_status()
-            results = search_res.json().get("results", [])
+            if content_type in search_futures:
+                results = search_futures[content_type].result()
+            else:
+                results = search_tmdb(content_type, title)
 
             if not results:
                 continue
 
-            item = results[1] if title == '인간극장' and len(results) > 1 else results[0]
-            content_id = item["id"]
-
-            detail_url = f"https://api.themoviedb.org/3/{content_type}/{content_id}"
-            detail_res = requests.get(detail_url, params={"api_key": api_key, "language": "ko-KR"})
-            detail_res.raise_for_status()
-            detail = detail_res.json()
-
-            desc = detail.get("overview", "")
-            poster_path = detail.get("poster_path")
-            thumbnail = image_base_url + poster_path if poster_path else ''
-
-            genre_data = detail.get("genres", [])
-            genre_ids = [g.get("id") for g in genre_data if g.get("id") is not None]
-            subgenres = list({tmdb_genre_map.get(gid) for gid in genre_ids if tmdb_genre_map.get(gid)})
-
-            credits_url = f"https://api.themoviedb.org/3/{content_type}/{content_id}/credits"
-            credits_res = requests.get(credits_url, params={"api_key": api_key})
-            credits = credits_res.json()
-            cast_list = [c["name"] for c in credits.get("cast", [])[:5]]
-            cast = ', '.join(cast_list)
-
-            age_rating = ''
-            try:
-                if content_type == "tv":
-                    rating_url = f"https://api.themoviedb.org/3/tv/{content_id}/content_ratings"
-                else:
-                    rating_url = f"https://api.themoviedb.org/3/movie/{content_id}/release_dates"
-
-                rating_res = requests.get(rating_url, params={"api_key": api_key})
-                rating_res.raise_for_status()
-                rating_json = rating_res.json()
-
-                if content_type == "tv":
-                    for entry in rating_json.get("results", []):
-                        if entry.get("iso_3166_1") == "KR":
-                            age_rating = entry.get("rating", "")
-                            break
-                else:
-                    for entry in rating_json.get("results", []):
-                        if entry.get("iso_3166_1") == "KR":
-                            for release in entry.get("release_dates", []):
-                                if release.get("certification"):
-                                    age_rating = release["certification"]
-                                    break
-            except:
-                age_rating = ''
+            item = _pick_search_result(title, results)
+            detail = get_tmdb_detail(content_type, item["id"])
+            return parse_tmdb_detail(content_type, detail)
 
-            if not subgenres:
-                fallback_names = [genre_name_to_kor.get(g.get("name"), '') for g in genre_data]
-                subgenres = [name for name in fallback_names if name]
+        except Exception as e:
+            print(f"[TMDb 오류 - {content_type.upper()}] '{title}' (채널: {channel}, 장르: {original_genre}) → {e}")
+            continue
+
+
+    return '', '', '', '', ''
+
+async def get_program_info_from_tmdb_async(session, title, original_genre, channel=None):
+    # ✅ get_program_info_from_tmdb 의 asyncio 버전 (검색 우선순위 동일, tv/movie 검색은 동시에)
+    endpoints = _search_endpoints(original_genre)
+    search_tasks = {}
+    if TMDB_CONCURRENT_SEARCH:
+        search_tasks = {
+            content_type: asyncio.ensure_future(search_tmdb_async(session, content_type, title))
+            for content_type, _ in endpoints
+        }
 
-            subgenre = ', '.join(subgenres).strip()
+    for task in search_tasks.values():
+        # 우선순위 결과로 먼저 끝나 기다리지 않게 된 검색의 예외는 여기서 소비 (응답은 캐시에 남음)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
 
-            return desc, thumbnail, subgenre, age_rating, cast
+    for content_type, title_key in endpoints:
+        try:
+            if content_type in search_tasks:
+                results = await search_tasks[content_type]
+            else:
+                results = await search_tmdb_async(session, content_type, title)
+
+            if not results:
+                continue
+
+            item = _pick_search_result(title, results)
+            detail = await get_tmdb_detail_async(session, content_type, item["id"])
+            return parse_tmdb_detail(content_type, detail)
 
         except Exception as e:
             print(f"[TMDb 오류 - {content_type.upper()}] '{title}' (채널: {channel}, 장르: {original_genre}) → {e}")
             continue
 
-
     return '', '', '', '', ''
@@ -0,0 +1,128 @@
+from contextlib import contextmanager
+from threading import Lock, Semaphore
+
+from lib.utils import metrics
+
+
+class PooledDriver:
+
+    def __init__(self, driver, wait):
+        self.driver = driver
+        self.wait = wait
+        self.uses = 0
+        self.warm = False
+
+
+# ✅ Chrome 드라이버 풀
+# - size 만큼만 동시에 드라이버를 빌려줌 (bounded)
+# - warm=True 로 빌리면 warmup 이 끝난(편성표 페이지까지 이동한) 세션을 반환
+# - max_uses 회 사용했거나 오류가 난 드라이버는 폐기 후 새로 생성
+class DriverPool:
+
+    def __init__(self, factory, size=5, max_uses=20, warmup=None, is_warm=None):
+        self.factory = factory      # () -> (driver, wait)
+        self.size = size
+        self.max_uses = max_uses
+        self.warmup = warmup        # (driver, wait) -> None
+        self.is_warm = is_warm      # (driver) -> bool
+        self._slots = Semaphore(size)
+        self._lock = Lock()
+        self._idle = []
+        self._closed = False
+        self.created_count = 0
+        self.recycled_count = 0
+
+    @contextmanager
+    def session(self, warm=True):
+        self._slots.acquire()
+        pooled = None
+        try:
+            pooled = self._checkout(warm)
+            yield pooled.driver, pooled.wait
+        except Exception:
+            # ✅ 사용 중 오류가 난 드라이버는 상태를 신뢰할 수 없으므로 폐기
+            if pooled is not None:
+                self._discard(pooled)
+                pooled = None
+            raise
+        finally:
+            if pooled is not None:
+                self._checkin(pooled)
+            self._slots.release()
+
+    def _checkout(self, warm):
+        pooled = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("DriverPool 이 이미 종료되었습니다")
+            if self._idle:
+                # 요청한 상태(warm/cold)와 같은 드라이버를 우선 사용
+                matched = [p for p in self._idle if p.warm == warm]
+                pooled = matched[-1] if matched else self._idle[-1]
+                self._idle.remove(pooled)
+
+        if pooled is not None and not self._is_healthy(pooled):
+            print("[드라이버 풀] 응답 없는 드라이버 폐기 후 재생성")
+            self._discard(pooled)
+            pooled = None
+
+        if pooled is None:
+            with metrics.timer('stage_seconds', stage='driver_start'):
+                driver, wait = self.factory()
+            pooled = PooledDriver(driver, wait)
+            with self._lock:
+                self.created_count += 1
+            metrics.count('drivers_total', event='created')
+
+        if warm:
+            if not pooled.warm and self.warmup is not None:
+                try:
+                    self.warmup(pooled.driver, pooled.wait)
+                except Exception:
+                    self._discard(pooled)
+                    raise
+            pooled.warm = True
+        else:
+            # 빌려간 쪽에서 다른 페이지로 이동하므로 더 이상 warm 상태가 아님
+            pooled.warm = False
+
+        pooled.uses += 1
+        return pooled
+
+    def _checkin(self, pooled):
+        with self._lock:
+            if not self._closed and pooled.uses < self.max_uses:
+                self._idle.append(pooled)
+                return
+        self._discard(pooled)
+
+    def _is_healthy(self, pooled):
+        try:
+            pooled.driver.execute_script("return document.readyState")
+        except Exception:
+            return False
+        if pooled.warm and self.is_warm is not None:
+            try:
+                pooled.warm = bool(self.is_warm(pooled.driver))
+            except Exception:
+                pooled.warm = False
+        return True
+
+    def _discard(self, pooled):
+        with self._lock:
+            self.recycled_count += 1
+        metrics.count('drivers_total', event='recycled')
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            try:
+                pooled.driver.quit()
+            except Exception:
+                pass
@@ -0,0 +1,32 @@
+# ✅ 우선순위가 있는 키워드 목록을 한 번만 정리해 두고 재사용하는 매처 (부분 문자열 포함 여부 기준)
+# - keywords: (keyword, value) 를 우선순위 순서대로 → 먼저 나온 키워드가 높은 우선순위
+# - first(text): 텍스트에 포함된 키워드 중 우선순위가 가장 높은 키워드의 value
+#   (= 키워드 목록을 순서대로 돌며 `keyword in text` 로 처음 찾은 결과와 동일)
+# - 키워드 정리(lower/strip, 중첩 dict 펼치기)는 생성 시 한 번만 → 호출마다 반복하지 않음
+# - 실제 목록은 수십 개 이하라 C 로 도는 `in` 순회가 가장 빠름
+#   (Aho-Corasick 오토마톤은 설명 100~150개, 제목 40개 이상에서야 앞섬 — benchmarks/bench_keyword_matcher.py)
+class KeywordMatcher:
+
+    def __init__(self, keywords):
+        self.values = []
+        self._keywords = []
+        for keyword, value in keywords:
+            self._keywords.append(keyword)
+            self.values.append(value)
+
+    def first_priority(self, text):
+        # 포함된 키워드 중 가장 높은 우선순위(인덱스), 없으면 None
+        for keyword in self._keywords:
+            if keyword in text:
+                return self._keywords.index(keyword)  # 중복 키워드는 첫 위치가 우선순위
+        return None
+
+    def first(self, text, default=None):
+        priority = self.first_priority(text)
+        return default if priority is None else self.values[priority]
+
+    def matches(self, text):
+        return self.first_priority(text) is not None
+
+    def __len__(self):
+        return len(self.values)
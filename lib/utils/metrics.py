@@ -0,0 +1,255 @@
+import os
+import json
+import time
+import bisect
+from contextlib import contextmanager
+from threading import Lock
+
+# ✅ 실행 리포트 위치 — JSON 은 실행마다 한 파일, Prometheus textfile 은 실행마다 덮어씀
+# textfile 기본값은 {METRICS_DIR}/ifitv_crawler.prom
+# (node_exporter --collector.textfile.directory 가 보는 위치로 지정하려면 CRAWLER_METRICS_TEXTFILE)
+METRICS_DIR = os.getenv("CRAWLER_METRICS_DIR", "./ifitv_crawler/metrics")
+METRICS_TEXTFILE = os.getenv("CRAWLER_METRICS_TEXTFILE")
+METRIC_PREFIX = 'ifitv_crawler'
+
+# 지연 히스토그램 버킷(초) — API 호출(수십 ms)부터 드라이버 기동/페이지 이동(수 초)까지
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_HELP = {
+    'stage_seconds': '단계별 소요 시간 (드라이버 기동, 페이지 이동, 파싱, 보강, 저장)',
+    'source_request_seconds': '외부 소스 요청 1회(시도) 소요 시간',
+    'source_wait_seconds': '외부 소스 동시성/QPS 제한 대기 시간',
+    'source_requests_total': '외부 소스 요청 시도 수 (outcome=ok|retry|error)',
+    'metadata_cache_lookups_total': '제목별 메타데이터 조회 결과 (hit|miss|reused|shared)',
+    'metadata_titles_total': '외부 수집한 제목 수 (result=preset|collected|error)',
+    'metadata_gemini_fill_total': 'Gemini 보완이 필요했던 제목 수',
+    'schedule_rows_total': '수집한 편성표 행 수',
+    'schedule_fallback_total': '편성표 primary 소스 실패로 fallback 수집한 채널(날짜) 수',
+    'response_cache_total': '응답 디스크 캐시 조회/정리 수 (result=hit|miss|evicted)',
+    'drivers_total': '드라이버 생성/폐기 수 (event=created|recycled)',
+    'output_rows_total': '날짜별 저장 행 수',
+    'max_workers': '채널 병렬 처리 워커 수 (설정값)',
+    'run_duration_seconds': '실행 전체 소요 시간',
+    'run_success': '실행 성공 여부 (1/0)',
+    'run_timestamp_seconds': '실행 종료 시각 (unix time)',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸 = +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        # 버킷 안에서 선형 보간한 근사값 (+Inf 버킷은 관측 최대값까지)
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[idx - 1] if idx > 0 else 0.0
+                upper = self.buckets[idx] if idx < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'max': round(self.max, 6),
+        }
+
+
+# ✅ 실행 하나의 카운터 / 지연 히스토그램 / 게이지 (스레드·asyncio 양쪽에서 호출)
+# 라벨은 stage, source 처럼 값 종류가 적은 것만 사용 (채널·제목 단위 라벨 금지)
+class RunMetrics:
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started_at = time.time()
+        self.counters = {}    # (name, labels) → 값
+        self.histograms = {}  # (name, labels) → Histogram
+        self.gauges = {}      # (name, labels) → 값
+        self._lock = Lock()
+
+    def count(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def gauge(self, name, value, **labels):
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def histogram(self, name, **labels):
+        with self._lock:
+            return self.histograms.get((name, _label_key(labels)))
+
+    def report(self, info=None):
+        # JSON 실행 리포트 (info: 실행 설정 / 상태 등)
+        def entries(items, value):
+            return [
+                {'name': name, 'labels': dict(labels), **value(item)}
+                for (name, labels), item in sorted(items.items())
+            ]
+
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                'finished_at': time.time(),
+                **(info or {}),
+                'counters': entries(self.counters, lambda v: {'value': v}),
+                'gauges': entries(self.gauges, lambda v: {'value': v}),
+                'histograms': entries(self.histograms, lambda h: h.summary()),
+            }
+
+    def prometheus_text(self):
+        # Prometheus text exposition format (textfile collector 용)
+        lines = []
+        with self._lock:
+            families = {}
+            for kind, items in [('counter', self.counters), ('gauge', self.gauges), ('histogram', self.histograms)]:
+                for (name, labels), item in items.items():
+                    families.setdefault((name, kind), []).append((labels, item))
+
+            for (name, kind), series in sorted(families.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                if name in METRIC_HELP:
+                    lines.append(f"# HELP {metric} {METRIC_HELP[name]}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for labels, item in sorted(series, key=lambda entry: entry[0]):
+                    if kind != 'histogram':
+                        lines.append(f"{metric}{_format_labels(labels)} {_format_value(item)}")
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(list(item.buckets) + ['+Inf'], item.counts):
+                        cumulative += bucket_count
+                        le = bound if bound == '+Inf' else _format_value(bound)
+                        lines.append(f"{metric}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {_format_value(item.sum)}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {item.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_reports(self, info=None, root=METRICS_DIR, textfile=METRICS_TEXTFILE):
+        # ✅ run_<시작시각>.json + Prometheus textfile (둘 다 임시 파일 → os.replace 로 원자적 교체)
+        os.makedirs(root, exist_ok=True)
+        json_path = os.path.join(root, f"run_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started_at))}.json")
+        _write_text_atomic(json_path, json.dumps(self.report(info), ensure_ascii=False, indent=1))
+        textfile = textfile or os.path.join(root, 'ifitv_crawler.prom')
+        os.makedirs(os.path.dirname(textfile) or '.', exist_ok=True)
+        _write_text_atomic(textfile, self.prometheus_text())
+        return json_path, textfile
+
+    def print_summary(self):
+        # 외부 소스별 요청 수 / 오류 / 지연 요약
+        with self._lock:
+            sources = sorted({dict(labels)['source'] for name, labels in self.histograms if name == 'source_request_seconds'})
+        if not sources:
+            return
+        print("[소스별 지연] source: 요청 / 재시도 / 실패, p50 / p95 / 최대 (초), 제한 대기 합계")
+        for source in sources:
+            latency = self.histogram('source_request_seconds', source=source).summary()
+            wait = self.histogram('source_wait_seconds', source=source)
+            with self._lock:
+                outcomes = {
+                    dict(labels)['outcome']: value for (name, labels), value in self.counters.items()
+                    if name == 'source_requests_total' and dict(labels)['source'] == source
+                }
+            print(
+                f"  - {source}: {sum(outcomes.values())} / {outcomes.get('retry', 0)} / {outcomes.get('error', 0)}, "
+                f"{latency['p50']:.2f} / {latency['p95']:.2f} / {latency['max']:.2f}, "
+                f"{wait.sum if wait is not None else 0.0:.1f}초"
+            )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for key, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def _write_text_atomic(path, text):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ✅ 계측 훅 — metadata_manager / 소스 모듈 / 드라이버 풀은 아래 함수로만 보고하고,
+# 실제 기록은 등록된 훅(count/observe 메서드를 가진 객체, 예: 실행 중인 RunMetrics)이 담당
+# 훅이 없으면 아무것도 하지 않으므로 모듈을 단독으로 쓸 때도 그대로 동작
+_hooks = ()
+_hooks_lock = Lock()
+
+
+def add_hook(hook):
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+
+
+def remove_hook(hook):
+    global _hooks
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def count(name, value=1, **labels):
+    for hook in _hooks:
+        hook.count(name, value, **labels)
+
+
+def observe(name, seconds, **labels):
+    for hook in _hooks:
+        hook.observe(name, seconds, **labels)
+
+
+@contextmanager
+def timer(name, **labels):
+    # with timer('stage_seconds', stage='parse'): ... → 예외가 나도 소요 시간 기록
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
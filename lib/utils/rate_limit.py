@@ -0,0 +1,235 @@
+import os
+import re
+import time
+import random
+import asyncio
+import weakref
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from threading import Lock, BoundedSemaphore
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from lib.utils import metrics
+
+# ✅ 소스별 기본 한도 (환경변수 <SOURCE>_QPS / <SOURCE>_CONCURRENCY / <SOURCE>_RETRIES 로 조정)
+DEFAULT_LIMITS = {
+    'tmdb': {'qps': 20.0, 'concurrency': 8, 'retries': 3},
+    'naver': {'qps': 2.0, 'concurrency': 3, 'retries': 2},
+    'gemini': {'qps': 1.0, 'concurrency': 4, 'retries': 4},
+}
+
+# 재시도 대기 상한(초) — 지수 백오프와 서버가 준 Retry-After 모두 이 값을 넘지 않음
+MAX_BACKOFF = float(os.getenv("RATE_LIMIT_MAX_BACKOFF", 30))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    'ConnectionError', 'Timeout', 'ConnectTimeout', 'ReadTimeout',
+    'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded', 'InternalServerError',
+    'TooManyRequests', 'TimeoutException',
+    # aiohttp / asyncio
+    'TimeoutError', 'ClientConnectionError', 'ClientConnectorError', 'ClientOSError',
+    'ServerDisconnectedError', 'ServerTimeoutError',
+}
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    def _take(self):
+        # 토큰을 가져가면 0, 부족하면 기다려야 할 시간(초) 반환
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        # 스레드 경로와 같은 버킷을 공유 → 소스별 QPS 는 sync/async 합산 기준
+        while True:
+            wait = self._take()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class SourceLimiter:
+
+    def __init__(self, name, qps, concurrency, retries):
+        self.name = name
+        self.bucket = TokenBucket(qps)
+        self.semaphore = BoundedSemaphore(concurrency)
+        self.concurrency = concurrency
+        self.retries = retries
+        self.calls = 0
+        self.retried = 0
+        self._lock = Lock()
+
+    @contextmanager
+    def slot(self):
+        start = time.perf_counter()
+        with self.semaphore:
+            self.bucket.acquire()
+            metrics.observe('source_wait_seconds', time.perf_counter() - start, source=self.name)
+            self.count_call()
+            yield
+
+    def count_call(self):
+        with self._lock:
+            self.calls += 1
+
+
+_limiters = {}
+_limiters_lock = Lock()
+# asyncio.Semaphore 는 이벤트 루프에 묶이므로 루프별로 따로 생성
+_async_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_limiter(source):
+    with _limiters_lock:
+        limiter = _limiters.get(source)
+        if limiter is None:
+            defaults = DEFAULT_LIMITS.get(source, {'qps': 5.0, 'concurrency': 4, 'retries': 2})
+            prefix = source.upper()
+            limiter = SourceLimiter(
+                source,
+                qps=float(os.getenv(f"{prefix}_QPS", defaults['qps'])),
+                concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", defaults['concurrency'])),
+                retries=int(os.getenv(f"{prefix}_RETRIES", defaults['retries'])),
+            )
+            _limiters[source] = limiter
+        return limiter
+
+
+def get_async_semaphore(source):
+    loop = asyncio.get_running_loop()
+    with _limiters_lock:
+        per_loop = _async_semaphores.setdefault(loop, {})
+    semaphore = per_loop.get(source)
+    if semaphore is None:
+        semaphore = per_loop[source] = asyncio.Semaphore(get_limiter(source).concurrency)
+    return semaphore
+
+
+def _status_code(exc):
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(exc, 'code', None)
+    if status is None:
+        status = getattr(exc, 'status', None)  # aiohttp.ClientResponseError
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc):
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(exc).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(exc, max_delay=MAX_BACKOFF):
+    # ✅ Retry-After 헤더(초 또는 HTTP-date) 또는 Gemini 오류 메시지의 'retry in Ns' 를 존중
+    # (비정상적으로 큰 값에 워커가 묶이지 않도록 max_delay 로 제한)
+    delay = _server_retry_after(exc)
+    if delay is None:
+        return None
+    return min(delay, max_delay)
+
+
+def _server_retry_after(exc):
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or getattr(exc, 'headers', None) or {}
+    value = headers.get('Retry-After') if hasattr(headers, 'get') else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    match = re.search(r'retry in ([\d.]+)\s*s', str(exc), flags=re.IGNORECASE)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=MAX_BACKOFF):
+    # 지수 백오프 + jitter (0.5 ~ 1.0 배)
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _retry_delay(source, limiter, attempt, exc):
+    # 재시도하지 않을 오류면 None, 재시도하면 대기 시간(초)
+    if attempt >= limiter.retries or not is_retryable(exc):
+        metrics.count('source_requests_total', source=source, outcome='error')
+        return None
+    metrics.count('source_requests_total', source=source, outcome='retry')
+    delay = retry_after_seconds(exc)
+    if delay is None:
+        delay = backoff_delay(attempt)
+    with limiter._lock:
+        limiter.retried += 1
+    print(f"[재시도 - {source}] {attempt + 1}/{limiter.retries}회, {delay:.1f}초 후 → {exc}")
+    return delay
+
+
+def call_with_retry(source, fn, *args, **kwargs):
+    # ✅ 소스별 QPS/동시성 제한 안에서 fn 실행, 일시적 오류는 백오프 후 재시도
+    limiter = get_limiter(source)
+    attempt = 0
+    while True:
+        try:
+            with limiter.slot(), metrics.timer('source_request_seconds', source=source):
+                result = fn(*args, **kwargs)
+            metrics.count('source_requests_total', source=source, outcome='ok')
+            return result
+        except Exception as e:
+            delay = _retry_delay(source, limiter, attempt, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+
+
+async def call_with_retry_async(source, fn, *args, **kwargs):
+    # ✅ call_with_retry 의 asyncio 버전 (fn 은 코루틴 함수)
+    limiter = get_limiter(source)
+    semaphore = get_async_semaphore(source)
+    attempt = 0
+    while True:
+        try:
+            start = time.perf_counter()
+            async with semaphore:
+                await limiter.bucket.acquire_async()
+                metrics.observe('source_wait_seconds', time.perf_counter() - start, source=source)
+                limiter.count_call()
+                with metrics.timer('source_request_seconds', source=source):
+                    result = await fn(*args, **kwargs)
+            metrics.count('source_requests_total', source=source, outcome='ok')
+            return result
+        except Exception as e:
+            delay = _retry_delay(source, limiter, attempt, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,89 @@
+import pandas as pd
+
+from lib.utils.text_cleaning import split_episodes
+
+# ✅ 편성표 행 [channel, airtime, title, genre] 를 채널 전체에 대해 한 번에 정리
+# - airtime 은 한 번만 초 단위로 파싱 → 채널 내 다음 슬롯과의 차이(자정 넘김 보정)로 러닝타임 계산
+#   (형식이 깨진 시각('05:00' 등)의 행은 로그를 남기고 제외 → 한 채널의 잘못된 행이 실행 전체를 중단시키지 않음,
+#    제외된 행의 앞 슬롯 러닝타임은 다음 정상 슬롯까지로 계산)
+# - 같은 시각에 연속으로 나온 행은 개수와 상관없이 한 슬롯으로 병합 (제목은 첫 행, 장르는 이어 붙임)
+#   러닝타임은 병합 후 슬롯 기준 → 병합 슬롯도 다음 슬롯까지의 실제 시간
+# - 마지막 슬롯은 다음 날 첫 슬롯 시각이 있으면 그 차이, 없으면 DEFAULT_LAST_RUNTIME 분
+
+SCHEDULE_COLUMNS = ['channel', 'airtime', 'title', 'genre']
+PROGRAM_COLUMNS = ['channel', 'airtime', 'title', 'genre', 'runtime', 'episode']
+DEFAULT_LAST_RUNTIME = 60
+DAY_SECONDS = 24 * 60 * 60
+
+
+def schedule_frame(rows):
+    return pd.DataFrame([row[:4] for row in rows], columns=SCHEDULE_COLUMNS)
+
+
+def airtime_seconds(airtimes):
+    # 'HH:MM:SS' → 자정 기준 초 (결측이나 형식 오류는 NaN)
+    return pd.to_timedelta(airtimes, errors='coerce').dt.total_seconds()
+
+
+def drop_invalid_airtimes(frame):
+    valid = pd.to_timedelta(frame['airtime'], errors='coerce').notna()
+    if valid.all():
+        return frame
+    for channel, airtime, title in frame.loc[~valid, ['channel', 'airtime', 'title']].itertuples(index=False):
+        print(f"[편성표 시각 오류] {channel} '{airtime}' {title} → 행 제외")
+    return frame[valid].reset_index(drop=True)
+
+
+def merge_same_airtime(frame):
+    # 채널이 바뀌거나 시각이 바뀌는 행에서 새 슬롯 시작
+    new_slot = (frame['channel'] != frame['channel'].shift()) | (frame['airtime'] != frame['airtime'].shift())
+    if new_slot.all():
+        return frame.reset_index(drop=True)
+    slot = new_slot.cumsum()
+    merged = frame.groupby(slot, sort=False).agg({
+        'channel': 'first',
+        'airtime': 'first',
+        'title': 'first',
+        'genre': lambda genres: ''.join(genre for genre in genres if isinstance(genre, str)),
+    })
+    return merged.reset_index(drop=True)
+
+
+def calculate_runtimes(frame, next_day_first=None):
+    # ✅ 채널 내 다음 슬롯까지의 분 (next_day_first: {channel: 다음 날 첫 슬롯 'HH:MM:SS'})
+    seconds = airtime_seconds(frame['airtime'])
+    next_seconds = seconds.groupby(frame['channel'], sort=False).shift(-1)
+    delta = next_seconds - seconds
+    delta = delta.where(~(delta < 0), delta + DAY_SECONDS)
+
+    if next_day_first:
+        is_last = next_seconds.isna()
+        first_seconds = airtime_seconds(frame['channel'].map(next_day_first))
+        tail = (first_seconds - seconds) % DAY_SECONDS
+        delta = delta.where(~is_last, tail.where(tail > 0))
+
+    return (delta // 60).fillna(DEFAULT_LAST_RUNTIME).astype(int)
+
+
+def prepare_schedule_frame(rows, next_day_first=None):
+    # rows: 여러 채널의 편성표 행 (채널 내 방송 순서) → PROGRAM_COLUMNS DataFrame
+    frame = merge_same_airtime(drop_invalid_airtimes(schedule_frame(rows)))
+    frame['runtime'] = calculate_runtimes(frame, next_day_first)
+    split = split_episodes(frame['title'])
+    frame['title'] = split['title']
+    frame['episode'] = split['episode']
+    return frame[PROGRAM_COLUMNS]
+
+
+def first_airtimes(rows):
+    # 채널별 첫 슬롯 시각 → 전날 편성표의 마지막 러닝타임 계산용
+    first = {}
+    for row in rows:
+        first.setdefault(row[0], row[1])
+    return first
+
+
+def frame_to_programs(frame):
+    # → ([(channel, airtime, title, genre, runtime)], [episode]) (Crawler.fetch_metadata_many 입력 형식)
+    programs = list(frame[['channel', 'airtime', 'title', 'genre', 'runtime']].itertuples(index=False, name=None))
+    return programs, frame['episode'].tolist()
@@ -0,0 +1,35 @@
+from concurrent.futures import Future
+from threading import Lock
+
+
+# ✅ 같은 key 에 대한 작업을 한 번만 실행 (single-flight)
+# - claim() 을 처음 호출한 쪽(leader)만 작업하고, 이후 호출은 같은 future 로 결과를 기다려 재사용
+# - 실패한 key 는 기록을 지워서 다음 claim 이 다시 시도할 수 있게 함
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}
+        self.leader_count = 0
+        self.shared_count = 0
+
+    def claim(self, key):
+        # (future, leader 여부) 반환 — leader 는 반드시 resolve/fail 호출
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared_count += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.leader_count += 1
+            return future, True
+
+    def resolve(self, key, future, result):
+        future.set_result(result)
+
+    def fail(self, key, future, exc):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        future.set_exception(exc)
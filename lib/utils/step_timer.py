@@ -0,0 +1,53 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+from lib.utils import metrics
+
+
+# ✅ 채널별 / 단계별 소요 시간 기록 (편성표 이동 구간 프로파일링)
+class StepTimer:
+
+    def __init__(self):
+        self._lock = Lock()
+        self.timings = defaultdict(lambda: defaultdict(float))
+
+    @contextmanager
+    def step(self, channel, step):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(channel, step, time.perf_counter() - start)
+
+    def record(self, channel, step, seconds):
+        with self._lock:
+            self.timings[channel][step] += seconds
+        # 실행 리포트에는 채널 구분 없이 단계별 분포로
+        metrics.observe('stage_seconds', seconds, stage=step)
+
+    def summary(self):
+        # step → {'count', 'total', 'mean', 'max'}
+        per_step = defaultdict(list)
+        with self._lock:
+            for steps in self.timings.values():
+                for step, seconds in steps.items():
+                    per_step[step].append(seconds)
+        return {
+            step: {
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+                'max': max(values),
+            }
+            for step, values in per_step.items()
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("[단계별 소요 시간] step: 평균 / 최대 / 합계 (초)")
+        for step, stat in sorted(summary.items(), key=lambda item: -item[1]['total']):
+            print(f"  - {step}: {stat['mean']:.2f} / {stat['max']:.2f} / {stat['total']:.2f} ({stat['count']}건)")
@@ -1,4 +1,27 @@
 import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# ✅ clean_name 에서 쓰는 정규식은 모듈 로딩 시 한 번만 컴파일
+_PAREN = re.compile(r'\([^)]*\)')
+_BRACKET = re.compile(r'\[[^]]*\]')
+_ANGLE_KR = re.compile(r'〈.*?〉')
+_ANGLE = re.compile(r'\<.*?\>')
+_BROADCAST_WORDS = re.compile(
+    r'\b(수목드라마|월화드라마|일일드라마|주말드라마|재방송|특별판|스페셜|본방송|본|재|특집|종영|마지막회|최종화|HD|SD|NEW|다시보기)\b',
+    flags=re.IGNORECASE
+)
+_PART = re.compile(r'\d+부')
+_PUNCT = re.compile(r'[“”"\':\-|·,~!@#$%^&*+=]+')
+_SPACES = re.compile(r'\s+')
+_KO_EN = re.compile(r'([가-힣])\s+([A-Za-z])')
+_EN_KO = re.compile(r'([A-Za-z])\s+([가-힣])')
+
+EPISODE_PATTERN = re.compile(r'(\d{1,4}회)')
+
+CLEAN_CACHE_SIZE = 65536
 
 def clean_program_name_for_url(name):
     name = re.sub(r'\<.*?\>', '', name)
@@ -16,20 +39,46 @@ def clean_text(text):
     text = re.sub(r',\s*,', ',', text)
     return text
 
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
 def clean_name(text):
-    text = re.sub(r'\([^)]*\)', '', text)
-    text = re.sub(r'\[[^]]*\]', '', text)
-    text = re.sub(r'〈.*?〉', '', text)
-    text = re.sub(r'\<.*?\>', '', text)
+    # 같은 제목이 크롤러 / 메타데이터 / 네이버 검색에서 반복 정제되므로 결과를 메모
+    text = _PAREN.sub('', text)
+    text = _BRACKET.sub('', text)
+    text = _ANGLE_KR.sub('', text)
+    text = _ANGLE.sub('', text)
 
-    text = re.sub(r'\b(수목드라마|월화드라마|일일드라마|주말드라마|재방송|특별판|스페셜|본방송|본|재|특집|종영|마지막회|최종화|HD|SD|NEW|다시보기)\b', '', text, flags=re.IGNORECASE)
-    text = re.sub(r'\d+부', '', text)
+    text = _BROADCAST_WORDS.sub('', text)
+    text = _PART.sub('', text)
 
-    text = re.sub(r'[“”"\':\-|·,~!@#$%^&*+=]+', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
+    text = _PUNCT.sub(' ', text)
+    text = _SPACES.sub(' ', text)
 
-    text = re.sub(r'([가-힣])\s+([A-Za-z])', r'\1\2', text)
-    text = re.sub(r'([A-Za-z])\s+([가-힣])', r'\1\2', text)
+    text = _KO_EN.sub(r'\1\2', text)
+    text = _EN_KO.sub(r'\1\2', text)
 
     text = text.strip("()[]〈〉 ")
     return text.strip()
+
+@lru_cache(maxsize=CLEAN_CACHE_SIZE)
+def split_episode(raw_title):
+    # ✅ 편성표 제목 → (정제된 제목, 회차) — 회차('12회')를 떼어낸 뒤 clean_name
+    match = EPISODE_PATTERN.search(raw_title)
+    episode = match.group(1) if match else ''
+    return clean_name(raw_title.replace(episode, '').strip()), episode
+
+def clean_names(titles):
+    # ✅ Series 단위 정제 — 고유 제목만 한 번씩 정제해서 원래 위치로 펼침
+    titles = pd.Series(titles)
+    codes, uniques = pd.factorize(titles)
+    # 결측값(code -1)은 마지막에 붙인 '' 로 매핑
+    cleaned = np.array([clean_name(title) for title in uniques] + [''], dtype=object)
+    return pd.Series(cleaned.take(codes), index=titles.index, name=titles.name)
+
+def split_episodes(titles):
+    # ✅ Series 단위 회차 분리 → DataFrame(title, episode), 입력 index 유지
+    titles = pd.Series(titles)
+    codes, uniques = pd.factorize(titles)
+    split = [split_episode(title) for title in uniques] + [('', '')]
+    cleaned = np.array([title for title, _ in split], dtype=object)
+    episodes = np.array([episode for _, episode in split], dtype=object)
+    return pd.DataFrame({'title': cleaned.take(codes), 'episode': episodes.take(codes)}, index=titles.index)
@@ -0,0 +1,95 @@
+import os
+import re
+import json
+import shutil
+from threading import Lock
+
+CHECKPOINT_DIR = os.getenv("CRAWLER_CHECKPOINT_DIR", "./ifitv_crawler/checkpoints")
+
+
+def _json_default(value):
+    # numpy 스칼라(runtime 등) → 파이썬 값
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def _write_json_atomic(path, data):
+    # 임시 파일에 쓰고 fsync 후 os.replace → 중간에 죽어도 이전 파일 또는 완성된 파일만 남음
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=_json_default)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# ✅ 실행 중간 결과를 작업이 끝날 때마다 디스크에 기록 → 중단 후 resume 실행 시 남은 작업만 수행
+# - {root}/{date}/channels/{채널}.json : 날짜별로 저장 완료된 채널의 최종 행
+# - {root}/titles.jsonl               : 외부 수집이 끝난 제목별 메타데이터 (한 줄씩 append + fsync)
+# 전체 결과/캐시 저장이 끝나면 clear() 로 정리, resume 이 아닌 실행은 시작 시 이전 기록을 지움
+class RunCheckpoint:
+
+    def __init__(self, dates, root=CHECKPOINT_DIR, resume=False):
+        self.root = root
+        self.dates = dates  # {day_offset: 'YYYY-MM-DD'}
+        self.titles_path = os.path.join(root, 'titles.jsonl')
+        self._lock = Lock()
+
+        if not resume:
+            self.clear()
+        for date_str in dates.values():
+            os.makedirs(self.channel_dir(date_str), exist_ok=True)
+
+    def channel_dir(self, date_str):
+        return os.path.join(self.root, date_str, 'channels')
+
+    def channel_path(self, day_offset, channel):
+        safe_name = re.sub(r'[\\/:*?"<>|\s]+', '_', channel).strip('_')
+        return os.path.join(self.channel_dir(self.dates[day_offset]), f"{safe_name}.json")
+
+    def save_channel(self, day_offset, channel, rows):
+        _write_json_atomic(self.channel_path(day_offset, channel), {'channel': channel, 'rows': [list(row) for row in rows]})
+
+    def load_channels(self):
+        # → {day_offset: {channel: rows}} (깨진 파일은 건너뛰고 다시 수집)
+        finished = {}
+        for day_offset, date_str in self.dates.items():
+            channels = finished.setdefault(day_offset, {})
+            directory = self.channel_dir(date_str)
+            for name in sorted(os.listdir(directory)):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    channels[data['channel']] = data['rows']
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"[체크포인트 로딩 오류] {path} → {e}")
+        return finished
+
+    def save_title(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=_json_default)
+        with self._lock:
+            with open(self.titles_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load_titles(self):
+        # 마지막 줄이 쓰다 만 상태일 수 있으므로 파싱 실패한 줄은 무시
+        records = []
+        if not os.path.exists(self.titles_path):
+            return records
+        with open(self.titles_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def clear(self):
+        if os.path.exists(self.titles_path):
+            os.remove(self.titles_path)
+        for date_str in self.dates.values():
+            shutil.rmtree(os.path.join(self.root, date_str), ignore_errors=True)
@@ -2,6 +2,7 @@ import os
 import re
 import time
 import traceback
+from itertools import groupby
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -14,15 +15,61 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 
-from bs4 import BeautifulSoup
-from lib.config.genre_config import genre_map
-from lib.metadata.metadata_manager import get_program_metadata
+from lib.metadata.metadata_manager import get_program_metadata_batch
+from lib.metadata.async_engine import AsyncMetadataEngine
+from lib.metadata.metadata_cache import MetadataCache, IndexedMetadataCache, SqliteMetadataCache, apply_metadata_exception
 from lib.utils.text_cleaning import clean_name
+from lib.utils.driver_pool import DriverPool
+from lib.utils.single_flight import SingleFlight
+from lib.utils.step_timer import StepTimer
+from lib.utils import metrics
+from lib.utils.metrics import RunMetrics
+from lib.utils.rate_limit import DEFAULT_LIMITS, get_limiter
+from lib.utils.schedule_frame import prepare_schedule_frame, frame_to_programs, first_airtimes
+from lib.metadata import naver
+from modules.schedule_source import (
+    parse_schedule_html, HttpScheduleSource, SeleniumScheduleSource, FallbackScheduleSource
+)
+from modules.pipeline import SchedulePipeline
+from modules.schedule_diff import PreviousSchedule
+from modules.checkpoint import RunCheckpoint
+from modules.program_output import write_daily_parquet, write_parquet_atomic, last_program_id, daily_parquet_path
+
+CHANNEL_GUIDE_URL = os.getenv('LGU_CHANNEL_GUIDE_URL', 'https://www.lguplus.com/iptv/channel-guide')
+
+# ✅ 각 대기 조건의 최대 대기 시간(초) — Crawler(wait_timeouts={...}) 로 조정
+DEFAULT_WAIT_TIMEOUTS = {
+    'page_load': 15,
+    'menu': 10,
+    'dropdown': 10,
+    'table': 10,
+    'date_tab': 10,
+}
+
+CHANNEL_LIST = [
+    '투니버스[324]', '어린이TV[322]',
+
+    'KBS1[9]', 'KBS2[7]', 'MBC[11]', 'SBS[5]', 'EBS1[14]',
+
+    'JTBC[15]', 'TV조선[19]', 'tvN[3]', 'ENA[72]',
+
+    'OCN[44]', '스크린[46]', '캐치온1[52]',
+
+    '드라마큐브[71]', 'ENA DRAMA[73]', 'MBC드라마넷[35]',
+]
 
 def get_last_program_id_by_yesterday():
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
     filename = f'./data_crawling_tmdb_gemini/{yesterday}_실시간_방영_프로그램_리스트.csv'
     if not os.path.exists(filename):
+        # parquet 만 저장한 경우 어제 날짜 파티션의 program_id 컬럼만 확인
+        try:
+            last_id = last_program_id(yesterday)
+        except Exception as e:
+            print(f"[ID 이어붙이기 오류] 어제 parquet 읽기 실패: {e}")
+            last_id = None
+        if last_id is not None:
+            return last_id
         print(f"[ID 초기화] 어제 파일 없음 → 오늘은 program_id 1부터 시작")
         return 0
     try:
@@ -35,12 +82,53 @@ def get_last_program_id_by_yesterday():
 # options.add_argument('--headless')
 class Crawler:
 
-    def __init__(self, max_workers=5, target_day_offset=0):
+    def __init__(self, max_workers=5, target_day_offset=0, driver_max_uses=20,
+                 channel_list=None, single_session=False, schedule_source='selenium',
+                 cache_backend='sqlite', wait_timeouts=None, pipeline=False,
+                 enrich_workers=8, enrich_batch_size=20, metadata_engine='thread', incremental=False,
+                 resume=False, output_format='csv'):
         self.max_workers = max_workers
         self.target_day_offset = target_day_offset  # ✅ 기준 날짜 offset
+        self.day_offsets = [target_day_offset]  # ✅ run() 에서 수집하는 날짜들
+        self.channel_list = channel_list or CHANNEL_LIST
+        self.single_session = single_session  # ✅ True 면 한 세션에서 모든 채널 순회
+        self.schedule_source = self.build_schedule_source(schedule_source)
+        self.cache_backend = cache_backend  # ✅ 'sqlite' (즉시 upsert), 'csv' (전체 메모리) 또는 'indexed' (title 인덱스 + LRU)
         self.cache_lock = Lock()
+        self.cache_added_count = 0
+        self.metadata_flight = SingleFlight()  # ✅ 제목별 메타데이터 수집 중복 제거
+        self.wait_timeouts = {**DEFAULT_WAIT_TIMEOUTS, **(wait_timeouts or {})}
+        self.step_timer = StepTimer()  # ✅ 채널별 이동 단계 소요 시간
+        self.pipeline = pipeline  # ✅ True 면 수집 → 보강 → 저장 단계 파이프라인 (브라우저/API 동시성 분리)
+        self.enrich_workers = enrich_workers
+        self.enrich_batch_size = enrich_batch_size
+        # ✅ 'thread' → 스레드 풀 수집, 'async' → asyncio 엔진(이벤트 루프 하나에서 동시 수집)
+        self.metadata_engine = metadata_engine
+        self.async_engine = AsyncMetadataEngine() if metadata_engine == 'async' else None
+        self.incremental = incremental  # ✅ True 면 같은 날짜 기존 결과와 비교해 바뀐 슬롯만 보강
+        self.previous_schedule = None
+        self.resume = resume  # ✅ True 면 같은 날짜의 체크포인트에서 완료된 채널/제목을 이어받아 남은 작업만 수행
+        self.checkpoint = None
+        # ✅ 결과 파일 형식: 'csv' (기존), 'parquet' (날짜 파티션 + 타입 있는 컬럼), 'both'
+        if output_format not in ('csv', 'parquet', 'both'):
+            raise ValueError(f"지원하지 않는 output_format: {output_format}")
+        self.output_format = output_format
+        self.metadata_cache = None
+        self.metrics = None  # ✅ run() 중 단계/소스별 카운터·지연 히스토그램 (RunMetrics)
         os.makedirs('./data_crawling_tmdb_gemini', exist_ok=True)
 
+        # ✅ 채널 크롤링과 네이버 검색이 함께 쓰는 드라이버 풀 (crawl() 마다 새로 만들고 종료 시 정리)
+        self.driver_max_uses = driver_max_uses
+        self.driver_pool = self.build_driver_pool()
+
+    def build_driver_pool(self):
+        return DriverPool(
+            self.setup_driver,
+            size=self.max_workers,
+            max_uses=self.driver_max_uses,
+            warmup=self.open_channel_guide,
+            is_warm=self.is_channel_guide,
+        )
 
     def setup_driver(self):
         options = Options()
@@ -51,67 +139,180 @@ class Crawler:
         wait = WebDriverWait(driver, 13)
         return driver, wait
 
-    def calculate_runtime(self, programs):
-        new_list = []
-        for i in range(len(programs)):
-            current_time = datetime.strptime(programs[i][1], "%H:%M:%S")
-            if i < len(programs) - 1:
-                next_time = datetime.strptime(programs[i + 1][1], "%H:%M:%S")
-                if next_time < current_time:
-                    next_time += timedelta(days=1)
-                runtime = int((next_time - current_time).total_seconds() / 60)
-            else:
-                runtime = 60
-            new_list.append(programs[i] + [runtime])
-        return new_list
-    
-    def load_metadata_cache(self):
-        path = './cache/metadata_cache.csv'
-        if os.path.exists(path):
-            return pd.read_csv(path)
-        else:
-            return pd.DataFrame(columns=[
-                'title', 'genre', 'subgenre', 'description', 'thumbnail', 'age_rating', 'cast'
-            ])
+    def build_schedule_source(self, schedule_source):
+        # ✅ 'selenium' → 기존 경로, 'http' → HTTP 우선 + 실패 채널만 Selenium 으로 재수집
+        if schedule_source is None or schedule_source == 'selenium':
+            return None
+        if schedule_source == 'http':
+            return FallbackScheduleSource(
+                HttpScheduleSource(max_workers=self.max_workers * 2),
+                SeleniumScheduleSource(self),
+            )
+        return schedule_source
+
+    def wait_for(self, driver, timeout_key, condition):
+        return WebDriverWait(driver, self.wait_timeouts[timeout_key], poll_frequency=0.1).until(condition)
+
+    def wait_page_ready(self, driver):
+        self.wait_for(driver, 'page_load', lambda d: d.execute_script("return document.readyState") == "complete")
+
+    def open_channel_guide(self, driver, wait):
+        # ✅ 편성표 페이지 진입 + '채널 편성표 안내' → '전체채널' 까지 이동 (풀 warmup)
+        table_btn_xpath = '//a[contains(text(), "채널 편성표 안내")]'
+        all_channel_btn_xpath = '//a[contains(text(), "전체채널")]'
+
+        with self.step_timer.step('(warmup)', 'page_load'):
+            driver.get(CHANNEL_GUIDE_URL)
+            self.wait_page_ready(driver)
+            driver.execute_script("document.body.style.zoom='50%'")
+
+        with self.step_timer.step('(warmup)', 'menu'):
+            self.wait_for(driver, 'menu', EC.element_to_be_clickable((By.XPATH, table_btn_xpath))).click()
+            self.wait_for(driver, 'menu', EC.element_to_be_clickable((By.XPATH, all_channel_btn_xpath))).click()
+            # 채널 드롭다운 버튼이 나타나면 '전체채널' 화면 준비 완료
+            self.wait_for(driver, 'dropdown', EC.element_to_be_clickable((By.CSS_SELECTOR, "a.c-btn-outline-2-s.open")))
+
+    def is_channel_guide(self, driver):
+        return driver.current_url.startswith(CHANNEL_GUIDE_URL)
+
+    def load_metadata_cache(self, path='./cache/metadata_cache.csv'):
+        if self.cache_backend == 'sqlite':
+            # 같은 위치의 .db 사용, 최초 실행 시 CSV 내용을 이관
+            db_path = os.path.splitext(path)[0] + '.db'
+            return SqliteMetadataCache(db_path, csv_path=path)
+        if self.cache_backend == 'indexed':
+            # 전체 레코드는 필요할 때만 파일에서 읽음 → 캐시가 커져도 메모리 사용량 일정
+            return IndexedMetadataCache(path)
+        return MetadataCache(path)
     
-    def fetch_metadata(self, driver, channel, airtime, title, genre, runtime, metadata_cache_df):
+    def store_metadata(self, title, metadata, metadata_cache):
+        genre_out, subgenre, desc, thumbnail, age_rating, cast = metadata
+
+        # ✅ 캐시 즉시 upsert → 다른 채널 스레드/프로세스에서도 바로 재사용
+        new_row = {
+            'title': title,
+            'genre': genre_out,
+            'subgenre': subgenre,
+            'description': desc,
+            'thumbnail': thumbnail,
+            'age_rating': age_rating,
+            'cast': cast
+        }
+        record = apply_metadata_exception(new_row)
+        added = metadata_cache.upsert(record)
+        with self.cache_lock:
+            self.cache_added_count += added
+        if self.checkpoint is not None:
+            # 캐시와 같은 보정된 레코드를 기록 → resume 시 예외 보정이 빠진 값이 캐시에 들어가지 않음
+            self.checkpoint.save_title(record)
+        return metadata
+
+    def fetch_metadata_many(self, programs, metadata_cache, day_offset=None):
+        # ✅ programs: [(channel, airtime, title, genre, runtime)] → 행 [channel, airtime, title, genre, subgenre, runtime, ...] 리스트 (순서 유지, 실패는 None)
+        # 캐시 미스 제목만 모아 get_program_metadata_batch 로 한 번에 수집 (Gemini 배치)
+        resolved, waiting, leaders = self.claim_metadata(programs, metadata_cache, day_offset)
+        if leaders:
+            self.enrich_leaders(leaders, metadata_cache)
+        return self.collect_metadata_rows(programs, resolved, waiting)
+
+    def claim_metadata(self, programs, metadata_cache, day_offset=None):
+        # 캐시 적중 → resolved, 수집 대기 → waiting(future), 이 호출이 수집해야 할 제목 → leaders
+        if day_offset is None:
+            day_offset = self.target_day_offset
+        resolved = {}
+        waiting = {}
+        leaders = []
         try:
-            # ✅ 1. 캐시 조회
-            cached = metadata_cache_df[metadata_cache_df['title'] == title]
-            if not cached.empty:
-                row = cached.iloc[0]
-                return [
-                    channel, airtime, title,
-                    row['genre'], row['subgenre'], runtime,
-                    row['description'], row['thumbnail'],
-                    row['age_rating'], row['cast']
-                ]
-    
-            # ✅ 2. 캐시에 없다면 외부 메타데이터 수집
-            genre_out, subgenre, desc, thumbnail, age_rating, cast, _ = get_program_metadata(title, driver, genre, channel)
-    
-            # ✅ 3. 캐시 업데이트 (동시성 고려)
-            new_row = {
-                'title': title,
-                'genre': genre_out,
-                'subgenre': subgenre,
-                'description': desc,
-                'thumbnail': thumbnail,
-                'age_rating': age_rating,
-                'cast': cast
-            }
-    
-            # ✅ 4. 결과 반환
-            return [
+            self.claim_programs(programs, metadata_cache, day_offset, resolved, waiting, leaders)
+        except Exception as e:
+            # 중간에 실패하면 이미 claim 한 제목을 실패 처리 → 같은 제목을 기다리는 채널이 멈추지 않음
+            self.fail_leaders(leaders, e)
+            raise
+        return resolved, waiting, leaders
+
+    def claim_programs(self, programs, metadata_cache, day_offset, resolved, waiting, leaders):
+        for channel, airtime, title, genre, runtime in programs:
+            previous = None
+            if self.previous_schedule is not None:
+                previous = self.previous_schedule.lookup(day_offset, channel, airtime, title)
+            if title in resolved or title in waiting:
+                continue
+            if previous is not None:
+                # 이전 결과와 같은 슬롯 → 저장된 메타데이터 그대로 사용
+                resolved[title] = previous
+                metrics.count('metadata_cache_lookups_total', result='reused')
+                continue
+            row = metadata_cache.get(title)
+            if row is not None:
+                resolved[title] = (
+                    row['genre'], row['subgenre'], row['description'],
+                    row['thumbnail'], row['age_rating'], row['cast']
+                )
+                metrics.count('metadata_cache_lookups_total', result='hit')
+                continue
+            key = clean_name(title)
+            future, leader = self.metadata_flight.claim(key)
+            if leader:
+                leaders.append((key, future, title, genre, channel))
+            # miss → 이 호출이 수집, shared → 다른 채널이 수집 중인 결과를 기다림
+            metrics.count('metadata_cache_lookups_total', result='miss' if leader else 'shared')
+            waiting[title] = future
+
+    def fail_leaders(self, leaders, exc):
+        # 아직 완료되지 않은 leader future 를 모두 실패 처리 (leader 만 완료하므로 done() 확인으로 충분)
+        for key, future, _, _, _ in leaders:
+            if not future.done():
+                self.metadata_flight.fail(key, future, exc)
+
+    def enrich_leaders(self, leaders, metadata_cache):
+        # ✅ leaders: [(key, future, title, genre, channel)] → 배치 수집 후 future 완료/실패 처리
+        # 어떤 경로로 끝나든 claim 한 future 는 모두 완료/실패 상태가 됨 (finally)
+        try:
+            self.enrich_leader_batch(leaders, metadata_cache)
+        finally:
+            self.fail_leaders(leaders, RuntimeError("메타데이터 수집이 완료되지 않음"))
+
+    def enrich_leader_batch(self, leaders, metadata_cache):
+        programs = [(title, genre, channel) for _, _, title, genre, channel in leaders]
+        try:
+            with metrics.timer('stage_seconds', stage='enrich'):
+                if self.async_engine is not None:
+                    batch_results = self.async_engine.get_program_metadata_batch(programs)
+                else:
+                    batch_results = get_program_metadata_batch(programs)
+        except Exception as e:
+            print(f"[메타데이터 배치 오류] {len(leaders)}건 → {e}")
+            batch_results = [None] * len(leaders)
+
+        for (key, future, title, _, _), result in zip(leaders, batch_results):
+            try:
+                if result is None:
+                    raise RuntimeError(f"'{title}' 메타데이터 수집 실패")
+                metadata = self.store_metadata(title, result[:6], metadata_cache)
+                self.metadata_flight.resolve(key, future, metadata)
+            except Exception as e:
+                self.metadata_flight.fail(key, future, e)
+
+    def collect_metadata_rows(self, programs, resolved, waiting):
+        for title, future in waiting.items():
+            try:
+                resolved[title] = future.result()
+            except Exception as e:
+                print(f"[메타데이터 오류] '{title}' → {e}")
+
+        results = []
+        for channel, airtime, title, genre, runtime in programs:
+            metadata = resolved.get(title)
+            if metadata is None:
+                results.append(None)
+                continue
+            genre_out, subgenre, desc, thumbnail, age_rating, cast = metadata
+            results.append([
                 channel, airtime, title,
                 genre_out, subgenre, runtime,
                 desc, thumbnail, age_rating, cast
-            ]
-    
-        except Exception as e:
-            print(f"[TMDb 메타데이터 오류] '{title}' (채널: {channel}, 시간: {airtime}) → {e}")
-            traceback.print_exc()
-            return None
+            ])
+        return results
 
 
 
@@ -121,13 +322,11 @@ class Crawler:
         for i in range(1, times + 1):
             try:
                 driver.execute_script("window.scrollTo(0, 0);")
-                time.sleep(0.3)
     
                 # ✅ _uid_233 버튼을 직접 찾기
-                left_btn = driver.find_element(By.ID, "_uid_233")
+                left_btn = self.wait_for(driver, 'menu', EC.presence_of_element_located((By.ID, "_uid_233")))
     
                 driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", left_btn)
-                time.sleep(0.3)
     
                 # ✅ 가리는 요소 제거
                 driver.execute_script("""
@@ -137,37 +336,47 @@ class Crawler:
                     if (header) header.style.zIndex = '0';
                 """)
     
-                # ✅ 클릭 강행
+                # ✅ 클릭 강행 후 편성표 재렌더링까지 대기
+                old_row = self.first_schedule_row(driver)
                 driver.execute_script("arguments[0].click();", left_btn)
+                self.wait_rows_ready(driver, old_row)
                 print(f"✅ {i}번째 `<` 버튼 (#_uid_233) 클릭 완료")
-                time.sleep(1.2)
     
             except Exception as e:
                 print(f"❌ {i}번째 `<` 버튼 (#_uid_233) 클릭 중 오류:", e)
-                time.sleep(1)
 
 
-    def crawl_all_channels(self, channel_list, metadata_cache_df):
-        all_data = []
+    def crawl_all_channels(self, channel_list, metadata_cache, day_offsets=None):
+        day_offsets = day_offsets or self.day_offsets
+        data_by_day = {day_offset: [] for day_offset in day_offsets}
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             futures = {
-                executor.submit(self.process_channel_with_cache, ch, metadata_cache_df): ch
+                executor.submit(self.process_channel_with_cache, ch, metadata_cache, day_offsets): (ch, None)
                 for ch in channel_list
             }
-            for future in as_completed(futures):
-                channel = futures[future]
-                try:
-                    result = future.result()
-                    if result:
-                        all_data.extend(result)
-                except Exception as e:
-                    print(f"[❌ 병렬 실행 오류] {channel} → {e}")
-                    traceback.print_exc()
-        return all_data
+            self.collect_channel_results(futures, data_by_day)
+        return data_by_day
+
+    def collect_channel_results(self, futures, data_by_day):
+        # futures: future → (channel, day_offset) — day_offset 이 None 이면 결과가 {day_offset: rows}
+        for future in as_completed(futures):
+            channel, day_offset = futures[future]
+            try:
+                result = future.result()
+                if day_offset is not None:
+                    result = {day_offset: result}
+                for day, rows in (result or {}).items():
+                    data_by_day.setdefault(day, []).extend(rows or [])
+            except Exception as e:
+                print(f"[❌ 병렬 실행 오류] {channel} → {e}")
+                traceback.print_exc()
 
 
-    def save_final_program_data(self, all_data, filename):
-        last_id = get_last_program_id_by_yesterday()
+    def save_final_program_data(self, all_data, filename, last_id=None, date_str=None):
+        # last_id: 여러 날짜를 한 번에 저장할 때 앞 날짜의 마지막 program_id (없으면 어제 파일 기준)
+        # date_str: parquet 날짜 파티션 (없으면 target_day_offset 날짜)
+        if last_id is None:
+            last_id = get_last_program_id_by_yesterday()
         df = pd.DataFrame(all_data, columns=[
             'channel', 'airtime', 'title', 'episode', 'genre', 'subgenre',
             'runtime', 'description', 'thumbnail', 'age_rating', 'cast'
@@ -177,224 +386,434 @@ class Crawler:
         df['subgenre'] = df['subgenre'].apply(lambda x: x.replace('"', '') if isinstance(x, str) else x)
         df = df.sort_values(by=['channel', 'airtime']).reset_index(drop=True)
         df.insert(0, 'program_id', df.index + 1 + last_id)
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
-        print(f"[저장 완료] → {filename}")
+        date_str = date_str or self.date_str(self.target_day_offset)
+        with metrics.timer('stage_seconds', stage='write_daily'):
+            if self.output_format in ('csv', 'both'):
+                df.to_csv(filename, index=False, encoding='utf-8-sig')
+                print(f"[저장 완료] → {filename}")
+            if self.output_format in ('parquet', 'both'):
+                path = write_daily_parquet(df, date_str)
+                print(f"[저장 완료] → {path}")
+        metrics.count('output_rows_total', len(df), date=date_str)
         return df
 
 
 
-    def update_metadata_cache(self, all_data, metadata_cache_df, cache_path):
-        # ✅ 예외 메타데이터 로딩
-        with open('./lib/config/metadata_exceptions.json', 'r', encoding='utf-8') as f:
-            metadata_exceptions = json.load(f)
+    def update_metadata_cache(self, metadata_cache, cache_path):
+        # ✅ 외부 수집한 제목은 store_metadata 에서 이미 upsert 됨 → 여기서는 백엔드별 영속화만
+        # (csv/indexed: CSV 파일 갱신, sqlite: DB 에 이미 반영, METADATA_CACHE_EXPORT_CSV=1 일 때만 CSV 내보내기)
+        with metrics.timer('stage_seconds', stage='cache_save'):
+            metadata_cache.save(cache_path)
+        print(f"[캐시 갱신 완료] 신규 추가: {self.cache_added_count}개 ({self.cache_backend})")
 
-        def match_exception(title):
-            title_lower = title.strip().lower()
-            for entry in metadata_exceptions:
-                for keyword in entry['title_keywords']:
-                    if keyword.lower() in title_lower:
-                        return entry
-            return None
 
-        new_rows = []
-        for row in all_data:
-            title = row[2]
-            matched = match_exception(title)
-
-            if matched:
-                genre = matched['genre']
-                subgenre = matched['subgenre']
-                description = matched['description']
-                thumbnail = matched['thumbnail']
-                age_rating = matched['age_rating']
-            else:
-                genre = row[4]
-                subgenre = row[5]
-                description = row[7]
-                thumbnail = row[8]
-                age_rating = row[9]
-
-            new_rows.append({
-                'title': title,
-                'genre': genre,
-                'subgenre': subgenre,
-                'description': description,
-                'thumbnail': thumbnail,
-                'age_rating': age_rating,
-                'cast': row[10]
-            })
-
-        new_cache_df = pd.DataFrame(new_rows)
-        before_count = len(metadata_cache_df)
-
-        combined = pd.concat([metadata_cache_df, new_cache_df], ignore_index=True)
-        combined = combined.drop_duplicates(subset=['title'], keep='last')
-
-        after_count = len(combined)
-        added_count = after_count - before_count
-
-        combined.to_csv(cache_path, index=False, encoding='utf-8-sig')
-        print(f"[캐시 갱신 완료] → {cache_path} (신규 추가: {added_count}개)")
-
-
-    def process_channel_with_cache(self, channel, metadata_cache_df):
-        driver, wait = self.setup_driver()
-        url = 'https://www.lguplus.com/iptv/channel-guide'
-        table_btn_xpath = '//a[contains(text(), "채널 편성표 안내")]'
-        all_channel_btn_xpath = '//a[contains(text(), "전체채널")]'
-    
-        try:
-            driver.get(url)
-            driver.execute_script("document.body.style.zoom='50%'")
-            time.sleep(1)
-    
-            wait.until(EC.element_to_be_clickable((By.XPATH, table_btn_xpath))).click()
-            time.sleep(1)
-            wait.until(EC.element_to_be_clickable((By.XPATH, all_channel_btn_xpath))).click()
-            time.sleep(2)
-            wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a.c-btn-outline-2-s.open"))).click()
-            time.sleep(1.5)
-    
+    def select_channel(self, driver, wait, channel):
+        # ✅ warm 세션은 이미 '전체채널' 화면이므로 드롭다운 → 채널 선택부터 진행
+        with self.step_timer.step(channel, 'channel_select'):
+            old_row = self.first_schedule_row(driver)
+            self.wait_for(driver, 'dropdown', EC.element_to_be_clickable((By.CSS_SELECTOR, "a.c-btn-outline-2-s.open"))).click()
+
             channel_xpath = f'//a[contains(text(), "{channel}")]'
-            wait.until(EC.element_to_be_clickable((By.XPATH, channel_xpath))).click()
-            time.sleep(2)
-            
-    
-            # 날짜 탭 클릭
+            self.wait_for(driver, 'dropdown', EC.element_to_be_clickable((By.XPATH, channel_xpath))).click()
+
+        with self.step_timer.step(channel, 'table_render'):
+            self.wait_rows_ready(driver, old_row)
+
+    def date_label(self, day_offset):
+        target_date = datetime.now() + timedelta(days=day_offset)
+        month_day = f"{target_date.month}월 {target_date.day}일"
+        day_of_week = ['(월)', '(화)', '(수)', '(목)', '(금)', '(토)', '(일)'][target_date.weekday()]
+        return f"{month_day} {day_of_week}"
+
+    def is_date_tab_active(self, driver, date_xpath):
+        # 탭 자신 또는 부모 요소의 aria-selected / on·active·selected 클래스로 선택 상태 판단
+        try:
+            tab = driver.find_element(By.XPATH, date_xpath)
+            for element in (tab, tab.find_element(By.XPATH, '..')):
+                if element.get_attribute('aria-selected') == 'true':
+                    return True
+                if re.search(r'\b(on|active|selected)\b', element.get_attribute('class') or ''):
+                    return True
+        except Exception:
+            return False
+        return False
+
+    def select_date_tab(self, driver, channel, day_offset):
+        # 날짜 탭 클릭
+        date_xpath = f'//a[contains(text(), "{self.date_label(day_offset)}")]'
+        with self.step_timer.step(channel, 'date_tab'):
             for attempt in range(2):
                 try:
-                    target_date = datetime.now() + timedelta(days=self.target_day_offset)
-                    month_day = f"{target_date.month}월 {target_date.day}일"
-                    day_of_week = ['(월)', '(화)', '(수)', '(목)', '(금)', '(토)', '(일)'][target_date.weekday()]
-                    date_label = f"{month_day} {day_of_week}"
-
-                    
-                    date_btn = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.XPATH, f'//a[contains(text(), "{date_label}")]'))
-                    )
+                    if self.is_date_tab_active(driver, date_xpath):
+                        # 이미 선택된 날짜면 클릭/재렌더링 대기 생략
+                        break
+
+                    old_row = self.first_schedule_row(driver)
+                    date_btn = self.wait_for(driver, 'date_tab', EC.element_to_be_clickable((By.XPATH, date_xpath)))
                     driver.execute_script("arguments[0].click();", date_btn)
+
+                    # ✅ 탭 활성화 또는 이전 편성표 소멸 → 새 행 렌더링까지 대기
+                    self.wait_for(driver, 'date_tab', lambda d: (
+                        self.is_date_tab_active(d, date_xpath)
+                        or (EC.staleness_of(old_row)(d) if old_row is not None else self.first_schedule_row(d) is not None)
+                    ))
+                    self.wait_rows_ready(driver, old_row)
                     print(f"✅ 날짜 버튼 클릭 완료 - {channel}")
-                    time.sleep(1)
                     break
                 except Exception as e:
                     print(f"❌ {attempt+1}번째 날짜 버튼 클릭 실패", e)
-                    time.sleep(2)
-    
-            soup = BeautifulSoup(driver.page_source, 'html.parser')
-            program_soup_list = soup.select('tr.point')
-    
-            temp_list = []
-            for item in program_soup_list:
+
+    def parse_schedule_rows(self, page_source, channel):
+        with self.step_timer.step(channel, 'parse'):
+            return parse_schedule_html(page_source, channel)
+
+    def wait_rows_ready(self, driver, old_row):
+        # ✅ 이전 편성표의 첫 행이 사라지고(재렌더링) 새 tr.point 행이 나타날 때까지 대기
+        try:
+            if old_row is not None:
+                self.wait_for(driver, 'table', EC.staleness_of(old_row))
+            self.wait_for(driver, 'table', EC.presence_of_element_located((By.CSS_SELECTOR, 'tr.point')))
+            return True
+        except Exception:
+            return False
+
+    def first_schedule_row(self, driver):
+        rows = driver.find_elements(By.CSS_SELECTOR, 'tr.point')
+        return rows[0] if rows else None
+
+    def scrape_channel_schedule(self, driver, wait, channel, day_offset=None):
+        if day_offset is None:
+            day_offset = self.target_day_offset
+        self.select_channel(driver, wait, channel)
+        self.select_date_tab(driver, channel, day_offset)
+        return self.parse_schedule_rows(driver.page_source, channel)
+
+    def scrape_channel_days(self, driver, wait, channel, day_offsets):
+        # ✅ 채널은 한 번만 선택하고 날짜 탭만 차례로 눌러 {day_offset: rows} 수집
+        self.select_channel(driver, wait, channel)
+        schedules = {}
+        for day_offset in day_offsets:
+            self.select_date_tab(driver, channel, day_offset)
+            schedules[day_offset] = self.parse_schedule_rows(driver.page_source, channel)
+        return schedules
+
+    def iter_channel_schedules(self, channel_list, day_offsets=None):
+        # ✅ 한 세션에서 편성표 페이지를 한 번만 열고, 채널/날짜 선택만 바꿔가며 순회
+        if day_offsets is None:
+            day_offsets = self.day_offsets
+
+        with self.driver_pool.session(warm=True) as (driver, wait):
+            for channel in channel_list:
                 try:
-                    tds = item.select('td')
-                    time_text = tds[0].text.strip()
-                    name_parts = tds[1].text.split('\n')
-                    raw_name = name_parts[1].strip() if len(name_parts) > 1 else tds[1].text.strip()
-                    if raw_name in ["방송 시간이 아닙니다", "방송시간이 아닙니다.", "방송시간이 아닙니다"]:
-                        continue
-                    genre = genre_map.get(tds[2].text.strip(), tds[2].text.strip())
-                    temp_list.append([channel, time_text, raw_name, genre])
+                    self.select_channel(driver, wait, channel)
                 except Exception as e:
-                    print(f"[파싱 오류] {e}")
+                    print(f"[채널 선택 오류] {channel} → {e}")
                     continue
-    
-            temp_list = self.calculate_runtime(temp_list)
-    
-            merged_programs = []
-            skip_next = False
-            for i in range(len(temp_list)):
-                if skip_next:
-                    skip_next = False
-                    continue
-                if i < len(temp_list) - 1 and temp_list[i][1] == temp_list[i + 1][1]:
-                    merged = temp_list[i][:]
-                    merged[3] = temp_list[i][3] + temp_list[i + 1][3]
-                    merged_programs.append(merged)
-                    skip_next = True
-                else:
-                    merged_programs.append(temp_list[i])
-                    
-            episode_list = []
-            for item in merged_programs:
-                raw_title = item[2]
-                match = re.search(r'(\d{1,4}회)', raw_title)
-                episode = match.group(1) if match else ''
-                clean_title = clean_name(raw_title.replace(episode, '').strip())
-                item[2] = clean_title
-                episode_list.append(episode)
-
-
-            final_list = []
-            
-            for idx, (channel, airtime, title, genre, runtime) in enumerate(merged_programs):
-                result = self.fetch_metadata(driver, channel, airtime, title, genre, runtime, metadata_cache_df)
-                if result:
-                    result.insert(3, episode_list[idx])  # ✅ 3번째 위치(episode 자리)에 회차 삽입
-                    final_list.append(result)
 
-    
-            safe_name = re.sub(r'\s*(\[[^]]*\])', '', channel).strip()
-            df = pd.DataFrame(final_list, columns=[
-                'channel', 'airtime', 'title', 'episode', 'genre', 'subgenre',
-                'runtime', 'description', 'thumbnail', 'age_rating', 'cast'
-            ])
-            
-            df['subgenre'] = df['subgenre'].apply(lambda x: x.replace('"', '') if isinstance(x, str) else x)
-            df = df.sort_values(by='airtime')
-            df.to_csv(f'./data_crawling_tmdb_gemini/{safe_name}_program_list.csv', index=False, encoding='utf-8-sig')
-    
-            print(f"[완료] {channel} → 저장 완료")
+                for day_offset in day_offsets:
+                    self.select_date_tab(driver, channel, day_offset)
+                    yield channel, day_offset, self.parse_schedule_rows(driver.page_source, channel)
+
+
+    def prepare_channel_programs(self, temp_list, next_day_first=None):
+        # ✅ 편성표 행 → 러닝타임 계산 / 같은 시각 행 병합 / 회차 분리 + 제목 정제 (vectorized)
+        return frame_to_programs(prepare_schedule_frame(temp_list, next_day_first))
+
+    def prepare_schedules(self, schedules, next_day_first=None):
+        # ✅ {channel: 편성표 행} 전체를 하나의 frame 으로 한 번에 정리 → {channel: (programs, episodes)}
+        rows = [row for channel in schedules for row in schedules[channel]]
+        frame = prepare_schedule_frame(rows, next_day_first)
+        prepared = {channel: ([], []) for channel in schedules}
+        for channel, channel_frame in frame.groupby('channel', sort=False):
+            prepared[channel] = frame_to_programs(channel_frame)
+        return prepared
+
+    def assemble_channel_rows(self, results, episode_list):
+        final_list = []
+        for idx, result in enumerate(results):
+            if result:
+                result.insert(3, episode_list[idx])  # ✅ 3번째 위치(episode 자리)에 회차 삽입
+                final_list.append(result)
+        return final_list
+
+    def write_channel_programs(self, channel, final_list, day_offset=None):
+        if not final_list:
+            # 메타데이터 보강까지 모두 실패한 빈 결과 → 기존 채널 파일과 체크포인트를 그대로 둠
+            print(f"[채널 건너뜀] {channel} 저장할 행 없음 → 저장/체크포인트 생략")
+            return
+        safe_name = re.sub(r'\s*(\[[^]]*\])', '', channel).strip()
+        if len(self.day_offsets) > 1 and day_offset is not None:
+            # 여러 날짜 수집 시 채널 파일도 날짜별로
+            safe_name = f"{safe_name}_{self.date_str(day_offset)}"
+        df = pd.DataFrame(final_list, columns=[
+            'channel', 'airtime', 'title', 'episode', 'genre', 'subgenre',
+            'runtime', 'description', 'thumbnail', 'age_rating', 'cast'
+        ])
+
+        df['subgenre'] = df['subgenre'].apply(lambda x: x.replace('"', '') if isinstance(x, str) else x)
+        df = df.sort_values(by='airtime')
+        with metrics.timer('stage_seconds', stage='write_channel'):
+            if self.output_format in ('csv', 'both'):
+                df.to_csv(f'./data_crawling_tmdb_gemini/{safe_name}_program_list.csv', index=False, encoding='utf-8-sig')
+            if self.output_format in ('parquet', 'both'):
+                write_parquet_atomic(df, f'./data_crawling_tmdb_gemini/{safe_name}_program_list.parquet')
+
+        # ✅ 채널 완료 기록 (resume 시 이 채널은 다시 수집하지 않고 행만 재사용)
+        # 저장이 끝난 뒤에만 기록 → 저장 중 예외가 나면 체크포인트 없이 호출자로 전파되어 다음 실행에서 다시 수집
+        if self.checkpoint is not None:
+            self.checkpoint.save_channel(self.target_day_offset if day_offset is None else day_offset, channel, final_list)
+        print(f"[완료] {channel} → 저장 완료" + (f" (D+{day_offset})" if len(self.day_offsets) > 1 else ''))
+
+    def build_channel_programs(self, channel, temp_list, metadata_cache, day_offset=None, next_day_first=None):
+        try:
+            programs, episode_list = self.prepare_channel_programs(temp_list, next_day_first)
+        except Exception as e:
+            print(f"[채널 오류] {channel} 처리 중 오류:\n{traceback.format_exc()}")
+            return []
+        return self.build_prepared_channel_programs(channel, programs, episode_list, metadata_cache, day_offset)
+
+    def build_channel_days(self, channel, schedules, metadata_cache):
+        # ✅ {day_offset: rows} → {day_offset: final_list} (마지막 슬롯은 다음 날 첫 슬롯 기준 러닝타임)
+        results = {}
+        for day_offset, temp_list in schedules.items():
+            next_rows = schedules.get(day_offset + 1)
+            next_day_first = first_airtimes(next_rows) if next_rows else None
+            results[day_offset] = self.build_channel_programs(
+                channel, temp_list, metadata_cache, day_offset, next_day_first
+            )
+        return results
+
+    def build_prepared_channel_programs(self, channel, programs, episode_list, metadata_cache, day_offset=None):
+        if not programs:
+            # 편성표 수집 실패(또는 빈 편성표) → 기존 채널 파일을 빈 파일로 덮어쓰지 않음
+            print(f"[채널 건너뜀] {channel} 편성표 없음 → 저장 생략")
+            return []
+        try:
+            # ✅ 캐시 미스 제목은 모아서 배치 수집 (네이버 검색은 풀에서 드라이버를 빌려 사용)
+            results = self.fetch_metadata_many(programs, metadata_cache, day_offset)
+            final_list = self.assemble_channel_rows(results, episode_list)
+
+            self.write_channel_programs(channel, final_list, day_offset)
             return final_list
-    
+
         except Exception as e:
             print(f"[채널 오류] {channel} 처리 중 오류:\n{traceback.format_exc()}")
             return []
-    
-        finally:
-            driver.quit()
+
+
+    def process_channel_with_cache(self, channel, metadata_cache, day_offsets=None):
+        day_offsets = day_offsets or self.day_offsets
+        try:
+            # ✅ 편성표 수집 동안만 드라이버를 점유하고, 메타데이터 보강은 풀에서 따로 빌려 씀
+            with self.driver_pool.session(warm=True) as (driver, wait):
+                schedules = self.scrape_channel_days(driver, wait, channel, day_offsets)
+        except Exception as e:
+            print(f"[채널 오류] {channel} 처리 중 오류:\n{traceback.format_exc()}")
+            return {}
+
+        return self.build_channel_days(channel, schedules, metadata_cache)
+
+
+    def crawl_channels_single_session(self, channel_list, metadata_cache, day_offsets=None):
+        # ✅ 스크래핑은 한 세션이 순차 진행, 수집된 채널부터 바로 메타데이터 보강 시작
+        day_offsets = day_offsets or self.day_offsets
+        data_by_day = {day_offset: [] for day_offset in day_offsets}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            channel_days = groupby(self.iter_channel_schedules(channel_list, day_offsets), key=lambda item: item[0])
+            for channel, items in channel_days:
+                schedules = {day_offset: temp_list for _, day_offset, temp_list in items}
+                print(f"[편성표 수집] {channel} → {sum(len(rows) for rows in schedules.values())}개 ({len(schedules)}일)")
+                future = executor.submit(self.build_channel_days, channel, schedules, metadata_cache)
+                futures[future] = (channel, None)
+
+            self.collect_channel_results(futures, data_by_day)
+        return data_by_day
+
+
+    def crawl_with_schedule_source(self, channel_list, metadata_cache, day_offsets=None):
+        # ✅ 편성표는 ScheduleSource 로 날짜별 일괄 수집 후, 채널/날짜별 메타데이터 보강만 병렬 처리
+        day_offsets = day_offsets or self.day_offsets
+        schedules_by_day = {
+            day_offset: self.schedule_source.fetch_many(channel_list, day_offset)
+            for day_offset in day_offsets
+        }
+
+        data_by_day = {day_offset: [] for day_offset in day_offsets}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for day_offset, schedules in schedules_by_day.items():
+                next_schedules = schedules_by_day.get(day_offset + 1)
+                next_day_first = None
+                if next_schedules:
+                    next_day_first = first_airtimes([row for rows in next_schedules.values() for row in rows])
+                prepared = self.prepare_schedules({ch: schedules.get(ch, []) for ch in channel_list}, next_day_first)
+                for ch in channel_list:
+                    future = executor.submit(
+                        self.build_prepared_channel_programs, ch, *prepared[ch], metadata_cache, day_offset
+                    )
+                    futures[future] = (ch, day_offset)
+
+            self.collect_channel_results(futures, data_by_day)
+        return data_by_day
 
             
-    def run(self):
+    def date_str(self, day_offset):
+        return (datetime.now() + timedelta(days=day_offset)).strftime('%Y-%m-%d')
+
+    def daily_filename(self, day_offset):
+        return f'./ifitv_crawler/data_crawling_tmdb_gemini/{self.date_str(day_offset)}_실시간_방영_프로그램_리스트.csv'
+
+    def run(self, day_offsets=None):
+        # ✅ 실행 계측: 이 실행 동안 단계/소스 훅을 RunMetrics 로 모으고, 끝나면(실패해도) 리포트 저장
+        self.metrics = RunMetrics()
+        metrics.add_hook(self.metrics)
+        status = 'failed'
+        try:
+            status = self.crawl(day_offsets)
+        finally:
+            if self.metadata_cache is not None:
+                # 캐시 파일 핸들 / 스레드별 DB 연결 정리
+                self.metadata_cache.close()
+                self.metadata_cache = None
+            metrics.remove_hook(self.metrics)
+            self.write_metrics_report(status)
+
+    def write_metrics_report(self, status):
+        # JSON 실행 리포트(설정 + 카운터 + 지연 분포) 와 Prometheus textfile
+        run_metrics = self.metrics
+        run_metrics.gauge('run_duration_seconds', time.time() - run_metrics.started_at)
+        run_metrics.gauge('run_success', status == 'ok')
+        run_metrics.gauge('run_timestamp_seconds', time.time())
+        run_metrics.gauge('max_workers', self.max_workers)
+        info = {
+            'status': status,
+            'dates': [self.date_str(day_offset) for day_offset in self.day_offsets],
+            'config': {
+                'max_workers': self.max_workers,
+                'channels': len(self.channel_list),
+                'mode': 'pipeline' if self.pipeline else 'schedule_source' if self.schedule_source is not None
+                        else 'single_session' if self.single_session else 'default',
+                'metadata_engine': self.metadata_engine,
+                'cache_backend': self.cache_backend,
+                'output_format': self.output_format,
+                'incremental': self.incremental,
+                'resume': self.resume,
+                'enrich_workers': self.enrich_workers,
+                'enrich_batch_size': self.enrich_batch_size,
+                'source_limits': {
+                    source: {'qps': limiter.bucket.rate, 'concurrency': limiter.concurrency, 'retries': limiter.retries}
+                    for source, limiter in ((source, get_limiter(source)) for source in DEFAULT_LIMITS)
+                },
+            },
+            'drivers': {'created': self.driver_pool.created_count, 'recycled': self.driver_pool.recycled_count},
+            'metadata_flight': {'leaders': self.metadata_flight.leader_count, 'shared': self.metadata_flight.shared_count},
+        }
+        run_metrics.print_summary()
+        try:
+            json_path, textfile = run_metrics.write_reports(info)
+            print(f"[실행 리포트] → {json_path}, {textfile}")
+        except Exception as e:
+            print(f"[실행 리포트 저장 오류] {e}")
+
+    def crawl(self, day_offsets=None):
+        # ✅ day_offsets: 수집할 날짜 offset 목록 (예: range(0, 7)) — 없으면 target_day_offset 하루
+        # 반환: 'ok' 또는 'no_data' (실행 리포트의 status)
         start_time = time.time()
         print("[크롤링 시작]")
-    
-        # run() 내 날짜 설정
-        target_date = datetime.now() + timedelta(days=self.target_day_offset)
-        target_date_str = target_date.strftime('%Y-%m-%d')
-        filename = f'./ifitv_crawler/data_crawling_tmdb_gemini/{target_date_str}_실시간_방영_프로그램_리스트.csv'
+        self.metadata_flight = SingleFlight()
+
+        # run() 내 날짜 설정 (날짜별 일일 CSV 1개씩)
+        self.day_offsets = sorted(set(day_offsets)) if day_offsets is not None else [self.target_day_offset]
+        filenames = {day_offset: self.daily_filename(day_offset) for day_offset in self.day_offsets}
 
         cache_path = './ifitv_crawler/cache/metadata_cache.csv'
     
-        channel_list = [
-            '투니버스[324]', '어린이TV[322]',
-            
-            'KBS1[9]', 'KBS2[7]', 'MBC[11]', 'SBS[5]', 'EBS1[14]',
-            
-            'JTBC[15]', 'TV조선[19]', 'tvN[3]', 'ENA[72]',
-            
-            'OCN[44]', '스크린[46]', '캐치온1[52]',
-            
-            '드라마큐브[71]', 'ENA DRAMA[73]', 'MBC드라마넷[35]',
-        ]
-    
-        # ✅ 캐시 로딩
-        metadata_cache_df = pd.read_csv(cache_path) if os.path.exists(cache_path) else pd.DataFrame(columns=[
-            'title', 'genre', 'subgenre', 'description',
-            'thumbnail', 'age_rating', 'cast'
-        ])
-    
-        # ✅ 채널 병렬 처리
-        all_data = self.crawl_all_channels(channel_list, metadata_cache_df)
+        channel_list = self.channel_list
     
+        # ✅ 캐시 로딩 (title 인덱스는 여기서 한 번만 생성, 모든 날짜가 공유)
+        metadata_cache = self.metadata_cache = self.load_metadata_cache(cache_path)
+
+        # ✅ 증분 모드: 같은 날짜 기존 결과를 슬롯 단위로 로딩
+        if self.incremental:
+            previous_paths = filenames
+            if self.output_format == 'parquet':
+                # CSV 를 쓰지 않는 실행은 같은 날짜 parquet 파티션과 비교
+                previous_paths = {day_offset: daily_parquet_path(self.date_str(day_offset)) for day_offset in self.day_offsets}
+            self.previous_schedule = PreviousSchedule(previous_paths)
+        else:
+            self.previous_schedule = None
+
+        # ✅ 체크포인트: resume 이면 완료된 제목은 캐시로, 모든 날짜가 완료된 채널은 수집 대상에서 제외
+        self.checkpoint = RunCheckpoint({day_offset: self.date_str(day_offset) for day_offset in self.day_offsets}, resume=self.resume)
+        finished = {}
+        if self.resume:
+            self.cache_added_count += metadata_cache.update(self.checkpoint.load_titles())
+            finished = self.checkpoint.load_channels()
+            done_channels = [
+                ch for ch in channel_list
+                if all(ch in finished[day_offset] for day_offset in self.day_offsets)
+            ]
+            channel_list = [ch for ch in channel_list if ch not in done_channels]
+            print(f"[체크포인트 재개] 완료 채널 {len(done_channels)}개 재사용, 남은 채널 {len(channel_list)}개")
+            finished = {
+                day_offset: [row for ch in done_channels for row in finished[day_offset][ch]]
+                for day_offset in self.day_offsets
+            }
+
+        # ✅ 채널 병렬 처리 (이번 실행용 드라이버 풀 → 네이버 검색에도 이번 실행 동안만 등록, 종료 시 일괄 정리)
+        # 이전 실행에서 닫힌 풀은 다시 쓸 수 없으므로 같은 Crawler 로 run() 을 반복해도 매번 새로 생성
+        self.driver_pool = self.build_driver_pool()
+        naver.set_driver_pool(self.driver_pool)
+        data_by_day = {}
+        try:
+            if not channel_list:
+                pass
+            elif self.pipeline:
+                data_by_day = SchedulePipeline(
+                    self, metadata_cache,
+                    enrich_workers=self.enrich_workers,
+                    enrich_batch_size=self.enrich_batch_size,
+                ).run(channel_list, self.day_offsets)
+            elif self.schedule_source is not None:
+                data_by_day = self.crawl_with_schedule_source(channel_list, metadata_cache, self.day_offsets)
+            elif self.single_session:
+                data_by_day = self.crawl_channels_single_session(channel_list, metadata_cache, self.day_offsets)
+            else:
+                data_by_day = self.crawl_all_channels(channel_list, metadata_cache, self.day_offsets)
+        finally:
+            naver.clear_driver_pool(self.driver_pool)
+            self.driver_pool.close()
+            if self.async_engine is not None:
+                self.async_engine.close()
+
+        for day_offset, rows in finished.items():
+            data_by_day.setdefault(day_offset, []).extend(rows)
+
+        all_data = [row for day_offset in self.day_offsets for row in data_by_day.get(day_offset, [])]
         if not all_data:
             print("[경고] 수집된 데이터 없음")
-            return
+            return 'no_data'
+
+        # ✅ 결과 저장 (날짜별 파일, program_id 는 앞 날짜에 이어서 부여)
+        last_id = None
+        for day_offset in self.day_offsets:
+            rows = data_by_day.get(day_offset)
+            if not rows:
+                print(f"[경고] D+{day_offset} 수집된 데이터 없음")
+                continue
+            df = self.save_final_program_data(rows, filenames[day_offset], last_id, self.date_str(day_offset))
+            last_id = int(df['program_id'].max())
     
-        # ✅ 결과 저장
-        df = self.save_final_program_data(all_data, filename)
-    
-        # ✅ 캐시 저장
-        self.update_metadata_cache(all_data, metadata_cache_df, cache_path)
+        # ✅ 캐시 저장 (결과/캐시가 모두 저장되면 체크포인트 정리)
+        self.update_metadata_cache(metadata_cache, cache_path)
+        self.checkpoint.clear()
     
+        self.step_timer.print_summary()
+        if self.previous_schedule is not None:
+            self.previous_schedule.print_summary()
+        print(f"[메타데이터 중복 제거] 외부 수집 {self.metadata_flight.leader_count}건, 재사용 {self.metadata_flight.shared_count}건")
+
         elapsed = time.time() - start_time
-        print(f"[전체 완료] 크롤링 종료 (총 소요: {int(elapsed // 60)}분 {int(elapsed % 60)}초)")
+        print(f"[전체 완료] 크롤링 종료 ({len(self.day_offsets)}일, 총 소요: {int(elapsed // 60)}분 {int(elapsed % 60)}초)")
+        return 'ok'
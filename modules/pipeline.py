@@ -0,0 +1,149 @@
+import time
+import queue
+import traceback
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from modules.schedule_source import SeleniumScheduleSource
+from lib.utils.schedule_frame import first_airtimes
+
+# 큐 종료 신호
+_STOP = object()
+
+
+# ✅ 편성표 수집 → 메타데이터 보강 → 저장 3단계 파이프라인
+# - scrape: 브라우저(또는 ScheduleSource) 동시성 = scrape_workers, 채널 행을 정리해 다음 단계로 넘김
+# - enrich: 캐시 미스 제목만 title_queue 로 받아 enrich_workers 개 스레드가 배치 수집 (I/O 동시성)
+# - write: 채널별로 제목 future 가 채워지면 행을 조립해 채널 CSV 저장, 전체 결과는 run() 반환값 ({day_offset: rows})
+# 여러 날짜는 채널 세션 하나에서 날짜 탭만 바꿔 수집 (source.fetch_days), 보강은 날짜와 무관하게 제목 단위로 공유
+# 브라우저는 편성표 수집 동안만 점유되므로 캐시 미스가 많은 채널이 다른 채널을 막지 않음
+class SchedulePipeline:
+
+    def __init__(self, crawler, metadata_cache, scrape_workers=None, enrich_workers=8,
+                 enrich_batch_size=20, batch_linger=0.3):
+        self.crawler = crawler
+        self.metadata_cache = metadata_cache
+        self.scrape_workers = scrape_workers or crawler.max_workers
+        self.enrich_workers = enrich_workers
+        self.enrich_batch_size = enrich_batch_size
+        self.batch_linger = batch_linger  # 배치를 채우기 위해 추가 제목을 기다리는 최대 시간(초)
+        self.source = crawler.schedule_source or SeleniumScheduleSource(crawler)
+
+        self.title_queue = queue.Queue()
+        self.write_queue = queue.Queue()
+        self._lock = Lock()
+        self.stats = {'channels': 0, 'titles': 0, 'batches': 0, 'scrape': 0.0, 'enrich': 0.0, 'write': 0.0}
+
+    def _add_stat(self, key, value):
+        with self._lock:
+            self.stats[key] += value
+
+    def scrape_channel(self, channel, day_offsets):
+        start = time.perf_counter()
+        schedules = self.source.fetch_days(channel, day_offsets)
+        self._add_stat('scrape', time.perf_counter() - start)
+
+        for day_offset, temp_list in schedules.items():
+            next_rows = schedules.get(day_offset + 1)
+            next_day_first = first_airtimes(next_rows) if next_rows else None
+            programs, episode_list = self.crawler.prepare_channel_programs(temp_list, next_day_first)
+
+            resolved, waiting, leaders = self.crawler.claim_metadata(programs, self.metadata_cache, day_offset)
+            for leader in leaders:
+                self.title_queue.put(leader)
+            self._add_stat('titles', len(leaders))
+            print(f"[편성표 수집] {channel} D+{day_offset} → {len(programs)}개 (신규 제목 {len(leaders)}개)")
+
+            self.write_queue.put((channel, day_offset, programs, episode_list, resolved, waiting))
+
+    def next_batch(self):
+        # 첫 제목은 블로킹으로 기다리고, 이후 batch_linger 동안 배치 크기까지 채움
+        item = self.title_queue.get()
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.batch_linger
+        while len(batch) < self.enrich_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self.title_queue.get(timeout=remaining) if remaining > 0 else self.title_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def enrich_worker(self):
+        while True:
+            batch, stop = self.next_batch()
+            if batch:
+                start = time.perf_counter()
+                try:
+                    self.crawler.enrich_leaders(batch, self.metadata_cache)
+                except Exception as e:
+                    # enrich_leaders 안에서 future 는 이미 모두 완료/실패 처리됨 → 워커만 계속 진행
+                    print(f"[메타데이터 배치 오류] {len(batch)}건 → {e}")
+                self._add_stat('batches', 1)
+                self._add_stat('enrich', time.perf_counter() - start)
+            if stop:
+                return
+
+    def writer(self, data_by_day):
+        while True:
+            job = self.write_queue.get()
+            if job is _STOP:
+                return
+            channel, day_offset, programs, episode_list, resolved, waiting = job
+            if not programs:
+                print(f"[채널 건너뜀] {channel} 편성표 없음 → 저장 생략")
+                continue
+            try:
+                results = self.crawler.collect_metadata_rows(programs, resolved, waiting)
+                start = time.perf_counter()
+                final_list = self.crawler.assemble_channel_rows(results, episode_list)
+                self.crawler.write_channel_programs(channel, final_list, day_offset)
+                data_by_day.setdefault(day_offset, []).extend(final_list)
+                self._add_stat('channels', 1)
+                self._add_stat('write', time.perf_counter() - start)
+            except Exception:
+                print(f"[채널 오류] {channel} 저장 중 오류:\n{traceback.format_exc()}")
+
+    def run(self, channel_list, day_offsets=None):
+        day_offsets = day_offsets or self.crawler.day_offsets
+
+        data_by_day = {day_offset: [] for day_offset in day_offsets}
+        enrichers = [
+            Thread(target=self.enrich_worker, name=f'enrich-{i}', daemon=True)
+            for i in range(self.enrich_workers)
+        ]
+        writer = Thread(target=self.writer, args=(data_by_day,), name='writer', daemon=True)
+        for thread in enrichers:
+            thread.start()
+        writer.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.scrape_workers, thread_name_prefix='scrape') as executor:
+                futures = {executor.submit(self.scrape_channel, ch, day_offsets): ch for ch in channel_list}
+                for future in as_completed(futures):
+                    channel = futures[future]
+                    try:
+                        future.result()
+                    except Exception:
+                        print(f"[채널 오류] {channel} 처리 중 오류:\n{traceback.format_exc()}")
+        finally:
+            # 모든 제목이 큐에 들어간 뒤 종료 신호 → 남은 제목까지 처리하고 종료
+            for _ in enrichers:
+                self.title_queue.put(_STOP)
+            self.write_queue.put(_STOP)
+            for thread in enrichers:
+                thread.join()
+            writer.join()
+
+        print(
+            f"[파이프라인] 채널 {self.stats['channels']}개, 신규 제목 {self.stats['titles']}개 "
+            f"(배치 {self.stats['batches']}회) / 수집 {self.stats['scrape']:.1f}초, "
+            f"보강 {self.stats['enrich']:.1f}초, 저장 {self.stats['write']:.1f}초 (스레드 누적)"
+        )
+        return data_by_day
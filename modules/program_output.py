@@ -0,0 +1,89 @@
+import os
+
+import pandas as pd
+
+PARQUET_DIR = os.getenv("PROGRAM_PARQUET_DIR", "./ifitv_crawler/data_parquet")
+
+# ✅ 반복되는 짧은 값 → category (parquet dictionary 인코딩), airtime → time 타입
+CATEGORY_COLUMNS = ['channel', 'genre', 'subgenre', 'age_rating']
+
+
+def _require_pyarrow():
+    # parquet 출력/로딩에만 필요 (CSV 전용 실행은 설치 없이 동작)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise RuntimeError("parquet 출력에는 pyarrow 가 필요합니다 (pip install pyarrow)")
+
+
+def to_columnar(df):
+    # CSV 용 DataFrame → 타입이 있는 컬럼 (원본은 그대로 둠)
+    df = df.copy()
+    df['airtime'] = pd.to_datetime(df['airtime'], format='%H:%M:%S', errors='coerce').dt.time
+    df['runtime'] = pd.to_numeric(df['runtime'], errors='coerce').astype('Int32')
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def daily_parquet_path(date_str, root=PARQUET_DIR):
+    # 날짜 파티션 (hive 스타일 date=YYYY-MM-DD) 하나에 하루치 파일 하나
+    return os.path.join(root, f"date={date_str}", 'programs.parquet')
+
+
+def write_parquet_atomic(df, path):
+    # 임시 파일 → os.replace (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+    # 임시 파일은 '.' 으로 시작 → 실행이 중간에 죽어 남아도 load_programs(데이터셋 읽기)가 무시함
+    _require_pyarrow()
+    directory, name = os.path.split(path)
+    os.makedirs(directory or '.', exist_ok=True)
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        to_columnar(df).to_parquet(tmp_path, engine='pyarrow', index=False, compression='zstd')
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def write_daily_parquet(df, date_str, root=PARQUET_DIR):
+    # ✅ 같은 날짜 재실행은 해당 파티션 파일만 덮어씀
+    return write_parquet_atomic(df, daily_parquet_path(date_str, root))
+
+
+def load_programs(dates=None, channels=None, columns=None, root=PARQUET_DIR):
+    # ✅ 하류 작업용 로더: 필요한 날짜 파티션/채널/컬럼만 읽음 → date 는 datetime64, 나머지 타입은 저장된 그대로
+    _require_pyarrow()
+    filters = []
+    if dates is not None:
+        filters.append(('date', 'in', [str(d) for d in dates]))
+    if channels is not None:
+        filters.append(('channel', 'in', list(channels)))
+    if columns is not None and 'date' not in columns:
+        columns = list(columns) + ['date']
+
+    df = pd.read_parquet(root, engine='pyarrow', columns=columns, filters=filters or None)
+    df['date'] = pd.to_datetime(df['date'].astype(str))
+    return df.sort_values(['date', 'program_id'] if 'program_id' in df.columns else ['date']).reset_index(drop=True)
+
+
+def last_program_id(date_str, root=PARQUET_DIR):
+    # 날짜 파티션의 최대 program_id (없으면 None) — program_id 컬럼만 읽음
+    path = daily_parquet_path(date_str, root)
+    if not os.path.exists(path):
+        return None
+    _require_pyarrow()
+    ids = pd.read_parquet(path, engine='pyarrow', columns=['program_id'])['program_id']
+    return int(ids.max()) if len(ids) else None
+
+
+
+def read_parquet_as_text(path):
+    # 저장된 parquet → CSV 를 keep_default_na=False, dtype=str 로 읽은 것과 같은 문자열 프레임 (증분 비교 등 기존 로직용)
+    _require_pyarrow()
+    df = pd.read_parquet(path, engine='pyarrow').astype(object)
+    df['airtime'] = df['airtime'].map(lambda t: t.strftime('%H:%M:%S') if hasattr(t, 'strftime') else '')
+    return df.where(df.notna(), '').astype(str)
@@ -0,0 +1,78 @@
+import os
+from threading import Lock
+
+import pandas as pd
+
+from modules.program_output import read_parquet_as_text
+
+METADATA_COLUMNS = ['genre', 'subgenre', 'description', 'thumbnail', 'age_rating', 'cast']
+
+
+# ✅ 같은 날짜로 이전에 저장한 일일 CSV 와 새로 수집한 편성표를 (날짜, channel, airtime, title) 단위로 비교
+# - paths: {day_offset: 일일 CSV 또는 parquet 경로} (여러 날짜를 한 번에 수집하면 날짜별 파일)
+# - 유지(unchanged): 같은 슬롯에 같은 제목 → 저장된 메타데이터를 그대로 재사용 (보강 생략)
+# - 빈 값(incomplete): 같은 슬롯·같은 제목이지만 저장된 메타데이터에 빈 칸이 있음 → 재사용하지 않고 캐시/보강으로
+#   (일일 파일은 '정보 없음' 을 빈 값으로 저장하므로 그대로 쓰면 새로 보강한 행과 값이 달라짐)
+# - 변경(changed): 같은 슬롯에 다른 제목, 신규(new): 이전에 없던 슬롯 → 기존처럼 캐시/보강
+# - 삭제(removed): 이전에는 있었지만 이번 편성표에 없는 슬롯 (리포트용)
+class PreviousSchedule:
+
+    def __init__(self, paths):
+        self.paths = paths
+        self._lock = Lock()
+        self.slots = {}  # (day_offset, channel, airtime) → (title, metadata 6-tuple)
+        self.seen = set()
+        self.counts = {'unchanged': 0, 'incomplete': 0, 'changed': 0, 'new': 0}
+        self.reused_titles = set()
+
+        for day_offset, path in paths.items():
+            self.load(day_offset, path)
+
+    def load(self, day_offset, path):
+        if not os.path.exists(path):
+            print(f"[증분 비교] 이전 결과 없음 → 전체 수집: {path}")
+            return
+        try:
+            if path.endswith('.parquet'):
+                df = read_parquet_as_text(path)
+            else:
+                df = pd.read_csv(path, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+            slots = {}
+            for record in df.to_dict('records'):
+                key = (day_offset, record['channel'], record['airtime'])
+                slots.setdefault(key, (record['title'], tuple(record[col] for col in METADATA_COLUMNS)))
+        except Exception as e:
+            print(f"[증분 비교] 이전 결과 로딩 실패 → 전체 수집: {path} ({e})")
+            return
+        self.slots.update(slots)
+        print(f"[증분 비교] 이전 결과 {len(slots)}개 슬롯 ({path})")
+
+    def lookup(self, day_offset, channel, airtime, title):
+        # 유지된 슬롯이면 저장된 메타데이터, 아니면 None
+        key = (day_offset, channel, airtime)
+        previous = self.slots.get(key)
+        with self._lock:
+            self.seen.add(key)
+            if previous is None:
+                self.counts['new'] += 1
+                return None
+            if previous[0] != title:
+                self.counts['changed'] += 1
+                return None
+            if any(value == '' for value in previous[1]):
+                self.counts['incomplete'] += 1
+                return None
+            self.counts['unchanged'] += 1
+            self.reused_titles.add(title)
+        return previous[1]
+
+    def removed_count(self):
+        with self._lock:
+            return len(set(self.slots) - self.seen)
+
+    def print_summary(self):
+        print(
+            f"[증분 비교] 유지 {self.counts['unchanged']}개 (메타데이터 재사용), "
+            f"빈 값 {self.counts['incomplete']}개 (캐시/보강으로 다시 조회), "
+            f"변경 {self.counts['changed']}개, 신규 {self.counts['new']}개, 삭제 {self.removed_count()}개"
+        )
@@ -0,0 +1,210 @@
+import os
+import re
+import traceback
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from lib.config.genre_config import genre_map
+from lib.utils import metrics
+
+NOT_ON_AIR_TEXTS = ["방송 시간이 아닙니다", "방송시간이 아닙니다.", "방송시간이 아닙니다"]
+AIRTIME_PATTERN = re.compile(r'^\d{2}:\d{2}:\d{2}$')
+
+
+def parse_schedule_html(page_source, channel):
+    # ✅ 편성표 HTML 의 tr.point 행 → [channel, airtime, raw_name, genre]
+    soup = BeautifulSoup(page_source, 'html.parser')
+    program_soup_list = soup.select('tr.point')
+
+    temp_list = []
+    for item in program_soup_list:
+        try:
+            tds = item.select('td')
+            time_text = tds[0].text.strip()
+            name_parts = tds[1].text.split('\n')
+            raw_name = name_parts[1].strip() if len(name_parts) > 1 else tds[1].text.strip()
+            if raw_name in NOT_ON_AIR_TEXTS:
+                continue
+            genre = genre_map.get(tds[2].text.strip(), tds[2].text.strip())
+            temp_list.append([channel, time_text, raw_name, genre])
+        except Exception as e:
+            print(f"[파싱 오류] {e}")
+            continue
+    metrics.count('schedule_rows_total', len(temp_list))
+    return temp_list
+
+
+def validate_schedule_rows(rows):
+    # ✅ 비어 있거나, 시간 형식이 깨졌거나, 프로그램명이 없는 결과는 실패로 간주
+    if not rows:
+        return False
+    for row in rows:
+        if len(row) < 4 or not AIRTIME_PATTERN.match(row[1] or '') or not row[2]:
+            return False
+    return True
+
+
+def channel_code(channel):
+    # '투니버스[324]' → '324'
+    match = re.search(r'\[(\d+)\]', channel)
+    return match.group(1) if match else ''
+
+
+class ScheduleSource:
+    name = 'base'
+
+    def fetch(self, channel, day_offset):
+        raise NotImplementedError
+
+    def fetch_many(self, channel_list, day_offset):
+        results = {}
+        for channel in channel_list:
+            try:
+                results[channel] = self.fetch(channel, day_offset)
+            except Exception as e:
+                print(f"[편성표 소스 오류 - {self.name}] {channel} → {e}")
+                results[channel] = []
+        return results
+
+    def fetch_days(self, channel, day_offsets):
+        # 한 채널의 여러 날짜 → {day_offset: rows}
+        return {day_offset: self.fetch(channel, day_offset) for day_offset in day_offsets}
+
+
+class HttpScheduleSource(ScheduleSource):
+    # ✅ 브라우저 없이 편성표 XHR 응답(HTML 조각)을 직접 받아 파싱
+    # 엔드포인트는 코드에 추측해 두지 않고 설정으로만 받음 (둘 다 없으면 생성 시 바로 실패)
+    # - LGU_SCHEDULE_API_URL    : 편성표 페이지가 채널/날짜를 바꿀 때 호출하는 XHR 주소 (브라우저 개발자 도구에서 확인)
+    # - LGU_SCHEDULE_API_PARAMS : 그 요청의 쿼리 문자열 템플릿, {code} = 채널 번호('KBS1[9]' → 9), {date} = 대상 날짜
+    #                             예) 'chCode={code}&day={date:%Y%m%d}'
+    # 계약: GET url?<params> → 200 + 편성표 tbody 와 같은 tr.point 행 HTML
+    #       (td[0] 'HH:MM:SS', td[1] 두 번째 줄이 프로그램명, td[2] 장르 — parse_schedule_html 과 동일)
+    # 응답 형식이 다르면 parse_response 를 오버라이드
+    name = 'http'
+
+    def __init__(self, url=None, params=None, max_workers=8, timeout=10, session=None):
+        self.url = url or os.getenv("LGU_SCHEDULE_API_URL", "")
+        self.params = params or os.getenv("LGU_SCHEDULE_API_PARAMS", "")
+        if not self.url or not self.params:
+            raise ValueError(
+                "HTTP 편성표 소스에는 LGU_SCHEDULE_API_URL 과 LGU_SCHEDULE_API_PARAMS 설정이 필요합니다 "
+                "(없으면 schedule_source='selenium' 사용)"
+            )
+        self.max_workers = max_workers
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+    def build_params(self, channel, target_date):
+        query = self.params.format(code=channel_code(channel), date=target_date)
+        return dict(pair.split('=', 1) for pair in query.split('&') if pair)
+
+    def parse_response(self, response, channel):
+        return parse_schedule_html(response.text, channel)
+
+    def fetch(self, channel, day_offset):
+        target_date = datetime.now() + timedelta(days=day_offset)
+        try:
+            with metrics.timer('source_request_seconds', source='schedule'):
+                response = self.session.get(self.url, params=self.build_params(channel, target_date), timeout=self.timeout)
+                response.raise_for_status()
+        except Exception:
+            metrics.count('source_requests_total', source='schedule', outcome='error')
+            raise
+        metrics.count('source_requests_total', source='schedule', outcome='ok')
+        with metrics.timer('stage_seconds', stage='parse'):
+            return self.parse_response(response, channel)
+
+    def fetch_many(self, channel_list, day_offset):
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self.fetch, ch, day_offset): ch for ch in channel_list}
+            for future in as_completed(futures):
+                channel = futures[future]
+                try:
+                    results[channel] = future.result()
+                except Exception as e:
+                    print(f"[편성표 소스 오류 - {self.name}] {channel} → {e}")
+                    results[channel] = []
+        return results
+
+
+class SeleniumScheduleSource(ScheduleSource):
+    # ✅ 기존 Selenium 경로 (Crawler 의 드라이버 풀 사용)
+    name = 'selenium'
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    def fetch(self, channel, day_offset):
+        with self.crawler.driver_pool.session(warm=True) as (driver, wait):
+            return self.crawler.scrape_channel_schedule(driver, wait, channel, day_offset)
+
+    def fetch_days(self, channel, day_offsets):
+        # 한 세션에서 채널은 한 번만 선택하고 날짜 탭만 바꿔가며 수집
+        with self.crawler.driver_pool.session(warm=True) as (driver, wait):
+            return self.crawler.scrape_channel_days(driver, wait, channel, day_offsets)
+
+    def fetch_many(self, channel_list, day_offset):
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.crawler.max_workers) as executor:
+            futures = {executor.submit(self.fetch, ch, day_offset): ch for ch in channel_list}
+            for future in as_completed(futures):
+                channel = futures[future]
+                try:
+                    results[channel] = future.result()
+                except Exception:
+                    print(f"[편성표 소스 오류 - {self.name}] {channel}:\n{traceback.format_exc()}")
+                    results[channel] = []
+        return results
+
+
+class FallbackScheduleSource(ScheduleSource):
+    # ✅ primary 결과가 검증에 실패한 채널만 fallback 으로 다시 수집
+    name = 'fallback'
+
+    def __init__(self, primary, fallback, validate=validate_schedule_rows):
+        self.primary = primary
+        self.fallback = fallback
+        self.validate = validate
+
+    def fetch(self, channel, day_offset):
+        try:
+            rows = self.primary.fetch(channel, day_offset)
+            if self.validate(rows):
+                return rows
+            print(f"[편성표 검증 실패 - {self.primary.name}] {channel} → {self.fallback.name} 로 재시도")
+        except Exception as e:
+            print(f"[편성표 소스 오류 - {self.primary.name}] {channel} → {e} ({self.fallback.name} 로 재시도)")
+        metrics.count('schedule_fallback_total', source=self.fallback.name)
+        return self.fallback.fetch(channel, day_offset)
+
+    def fetch_days(self, channel, day_offsets):
+        try:
+            results = self.primary.fetch_days(channel, day_offsets)
+        except Exception as e:
+            print(f"[편성표 소스 오류 - {self.primary.name}] {channel} → {e} ({self.fallback.name} 로 재시도)")
+            results = {}
+        failed = [day_offset for day_offset in day_offsets if not self.validate(results.get(day_offset))]
+        if failed:
+            print(f"[편성표 검증 실패 - {self.primary.name}] {channel} {failed} → {self.fallback.name} 로 재시도")
+            metrics.count('schedule_fallback_total', len(failed), source=self.fallback.name)
+            results.update(self.fallback.fetch_days(channel, failed))
+        return results
+
+    def fetch_many(self, channel_list, day_offset):
+        results = self.primary.fetch_many(channel_list, day_offset)
+        failed = [ch for ch in channel_list if not self.validate(results.get(ch))]
+        if failed:
+            print(f"[편성표 검증 실패 - {self.primary.name}] {len(failed)}개 채널 → {self.fallback.name} 로 재시도")
+            metrics.count('schedule_fallback_total', len(failed), source=self.fallback.name)
+            results.update(self.fallback.fetch_many(failed, day_offset))
+        return results
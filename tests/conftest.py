@@ -0,0 +1,6 @@
+import os
+import sys
+
+# ✅ 저장소 루트(lib/, modules/, benchmarks/ 가 있는 위치)를 import 경로에 추가 → 어느 위치에서 pytest 를 실행해도 동일
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,91 @@
+import os
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from lib.config.genre_config import desc_keywords
+from lib.metadata.metadata_cache import metadata_exceptions, match_exception
+from lib.metadata.metadata_manager import guess_subgenre_by_desc, fallback_keyword_matcher
+from lib.utils.keyword_matcher import KeywordMatcher
+
+from conftest import ROOT
+
+CACHE_PATH = os.path.join(ROOT, 'cache', 'metadata_cache.csv')
+
+
+# ✅ 변경 전 구현 (호출마다 키워드를 정리하며 순서대로 `keyword in text`) → KeywordMatcher 와 결과 비교 기준
+def legacy_first(keywords, text):
+    return next((idx for idx, keyword in enumerate(keywords) if keyword in text), None)
+
+
+def legacy_guess_subgenre_by_desc(desc):
+    desc_clean = re.sub(r'[^\w\s]', ' ', desc).lower()
+    desc_clean = re.sub(r'\s+', ' ', desc_clean).strip()
+    for subgenre, keywords in desc_keywords.items():
+        for keyword in keywords:
+            if keyword.lower().strip() in desc_clean:
+                return subgenre
+    return ''
+
+
+def legacy_fallback(text):
+    if any(k in text for k in ['키즈', '어린이', '유아', '동요', 'TV만화', '아동']):
+        return 'kids'
+    elif any(k in text for k in ['교육', '학습', '영어', '수학', '학교', '과학']):
+        return 'edu'
+    elif any(k in text for k in ['정보', '생활', '교양', '인문학', '문화', '지식']):
+        return 'info'
+    return None
+
+
+def legacy_match_exception(title):
+    title_lower = title.strip().lower()
+    for entry in metadata_exceptions:
+        for keyword in entry['title_keywords']:
+            if keyword.lower() in title_lower:
+                return entry
+    return None
+
+
+@pytest.fixture(scope='module')
+def cache_frame():
+    return pd.read_csv(CACHE_PATH, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+
+
+def test_first_follows_keyword_order():
+    matcher = KeywordMatcher([('드라마', 'drama'), ('라마', 'llama'), ('', 'empty')])
+    assert matcher.first('주말드라마') == 'drama'
+    assert matcher.first('라마단') == 'llama'
+    assert matcher.first('뉴스') == 'empty'  # 빈 키워드는 모든 텍스트에 포함
+    assert KeywordMatcher([('a', 1)]).first('xyz', default=0) == 0
+    assert not KeywordMatcher([]).matches('anything')
+
+
+def test_duplicate_keyword_keeps_first_priority():
+    matcher = KeywordMatcher([('b', 'first'), ('a', 'second'), ('b', 'third')])
+    assert matcher.first_priority('ab') == 0
+    assert matcher.first('b') == 'first'
+
+
+def test_random_keywords_match_legacy_loop():
+    rng = random.Random(0)
+    alphabet = '가나다ab'
+    for _ in range(2000):
+        keywords = [''.join(rng.choices(alphabet, k=rng.randint(0, 3))) for _ in range(rng.randint(0, 8))]
+        text = ''.join(rng.choices(alphabet, k=rng.randint(0, 12)))
+        matcher = KeywordMatcher((keyword, idx) for idx, keyword in enumerate(keywords))
+        assert matcher.first_priority(text) == legacy_first(keywords, text), (keywords, text)
+
+
+def test_description_matchers_match_legacy(cache_frame):
+    for desc in cache_frame['description']:
+        assert guess_subgenre_by_desc(desc) == legacy_guess_subgenre_by_desc(desc), desc
+        assert fallback_keyword_matcher.first(f"{desc} ") == legacy_fallback(f"{desc} "), desc
+
+
+def test_match_exception_matches_legacy(cache_frame):
+    titles = list(cache_frame['title']) + [keyword for entry in metadata_exceptions for keyword in entry['title_keywords']]
+    for title in titles:
+        assert match_exception(title) is legacy_match_exception(title), title
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from modules.program_output import write_daily_parquet, load_programs, last_program_id
+
+
+def programs(start_id, channel='KBS1[9]'):
+    return pd.DataFrame({
+        'program_id': [start_id, start_id + 1],
+        'channel': [channel, channel],
+        'airtime': ['06:00:00', '07:30:00'],
+        'title': ['아침뉴스', '드라마'],
+        'episode': ['', '12회'],
+        'genre': ['보도', '드라마'],
+        'subgenre': ['', '가족'],
+        'runtime': [90, 60],
+        'description': ['설명', '설명'],
+        'thumbnail': ['', ''],
+        'age_rating': ['전체', '15세'],
+        'cast': ['', '배우'],
+    })
+
+
+def test_write_and_load_partitions(tmp_path):
+    root = str(tmp_path)
+    write_daily_parquet(programs(1), '2026-10-17', root)
+    write_daily_parquet(programs(3, 'MBC[11]'), '2026-10-18', root)
+
+    df = load_programs(root=root)
+    assert list(df['program_id']) == [1, 2, 3, 4]
+    assert str(df['airtime'][1]) == '07:30:00'
+    assert list(load_programs(dates=['2026-10-18'], root=root)['channel']) == ['MBC[11]', 'MBC[11]']
+    assert last_program_id('2026-10-17', root) == 2
+    assert not [name for name in os.listdir(tmp_path / 'date=2026-10-17') if name != 'programs.parquet']
+
+
+def test_temp_file_left_by_crash_is_ignored_by_loader(tmp_path, monkeypatch):
+    # 임시 파일을 다 쓴 뒤 os.replace 전에 프로세스가 죽은 경우 → 임시 파일이 파티션 디렉터리에 남음
+    root = str(tmp_path)
+    write_daily_parquet(programs(1), '2026-10-17', root)
+
+    def crash(src, dst):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(os, 'replace', crash)
+    with pytest.raises(KeyboardInterrupt):
+        write_daily_parquet(programs(100), '2026-10-17', root)
+    monkeypatch.undo()
+
+    leftovers = [name for name in os.listdir(tmp_path / 'date=2026-10-17') if name != 'programs.parquet']
+    assert leftovers and all(name.startswith('.') for name in leftovers)
+    assert list(load_programs(root=root)['program_id']) == [1, 2]
+
+
+def test_failed_write_removes_temp_file(tmp_path, monkeypatch):
+    root = str(tmp_path)
+
+    def fail(src, dst):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_daily_parquet(programs(1), '2026-10-17', root)
+    monkeypatch.undo()
+    assert os.listdir(tmp_path / 'date=2026-10-17') == []
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from modules.schedule_diff import PreviousSchedule
+
+COLUMNS = [
+    'program_id', 'channel', 'airtime', 'title', 'episode', 'genre', 'subgenre',
+    'runtime', 'description', 'thumbnail', 'age_rating', 'cast',
+]
+
+
+def write_daily(path, rows):
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False, encoding='utf-8-sig')
+
+
+def test_lookup_reuses_complete_slot_and_skips_changed_or_new(tmp_path):
+    path = tmp_path / 'daily.csv'
+    write_daily(path, [
+        [1, 'KBS1[9]', '06:00:00', '아침뉴스', '', '예능', '시사', 60, '설명', 'http://img', '전체 이용가', '앵커'],
+        [2, 'KBS1[9]', '07:00:00', '드라마', '3회', '드라마', '가족', 60, '설명', 'http://img', '15세 이상', '배우'],
+    ])
+    previous = PreviousSchedule({0: str(path)})
+
+    assert previous.lookup(0, 'KBS1[9]', '06:00:00', '아침뉴스') == (
+        '예능', '시사', '설명', 'http://img', '전체 이용가', '앵커'
+    )
+    assert previous.lookup(0, 'KBS1[9]', '07:00:00', '다른 드라마') is None
+    assert previous.lookup(0, 'KBS1[9]', '08:00:00', '신규') is None
+    assert previous.counts == {'unchanged': 1, 'incomplete': 0, 'changed': 1, 'new': 1}
+    assert previous.removed_count() == 0
+
+
+def test_slot_with_empty_fields_is_not_reused(tmp_path):
+    # 일일 파일은 '정보 없음' 을 빈 값으로 저장 → 그대로 재사용하면 새로 보강한 행('정보 없음')과 달라짐
+    path = tmp_path / 'daily.csv'
+    write_daily(path, [
+        [1, 'EBS[13]', '09:00:00', '만화', '', '애니', '키즈', 30, '설명', '', '전체 이용가', ''],
+    ])
+    previous = PreviousSchedule({0: str(path)})
+
+    assert previous.lookup(0, 'EBS[13]', '09:00:00', '만화') is None
+    assert previous.counts['incomplete'] == 1
+    assert previous.reused_titles == set()
@@ -0,0 +1,94 @@
+from lib.utils.schedule_frame import (
+    DEFAULT_LAST_RUNTIME, prepare_schedule_frame, frame_to_programs, first_airtimes,
+)
+
+
+def slots(frame):
+    return list(frame[['channel', 'airtime', 'title', 'genre', 'runtime', 'episode']].itertuples(index=False, name=None))
+
+
+def test_runtime_to_next_slot_and_default_last():
+    frame = prepare_schedule_frame([
+        ['A', '06:00:00', '아침뉴스', '보도'],
+        ['A', '06:40:00', '드라마 12회', '드라마'],
+        ['A', '08:10:00', '예능', '예능'],
+    ])
+    assert slots(frame) == [
+        ('A', '06:00:00', '아침뉴스', '보도', 40, ''),
+        ('A', '06:40:00', '드라마', '드라마', 90, '12회'),
+        ('A', '08:10:00', '예능', '예능', DEFAULT_LAST_RUNTIME, ''),
+    ]
+
+
+def test_pair_with_same_airtime_merges_into_one_slot_with_real_runtime():
+    # 변경 전 루프는 병합 전에 러닝타임을 계산해 병합 슬롯이 0분이었음 → 이제 다음 슬롯까지의 시간
+    frame = prepare_schedule_frame([
+        ['A', '10:00:00', '만화', '애니'],
+        ['A', '10:00:00', '만화', '키즈'],
+        ['A', '10:30:00', '뉴스', '보도'],
+    ])
+    assert slots(frame)[0] == ('A', '10:00:00', '만화', '애니키즈', 30, '')
+    assert len(frame) == 2
+
+
+def test_three_or_more_rows_with_same_airtime_merge_into_one_slot():
+    # 변경 전 루프는 (1+2) 쌍 + 3번째 단독 슬롯을 만들었음 → 이제 연속된 같은 시각 행은 모두 한 슬롯
+    frame = prepare_schedule_frame([
+        ['A', '10:00:00', '첫 제목', '애니'],
+        ['A', '10:00:00', '둘째', '키즈'],
+        ['A', '10:00:00', '셋째', '교육'],
+        ['A', '11:00:00', '뉴스', '보도'],
+    ])
+    assert slots(frame) == [
+        ('A', '10:00:00', '첫 제목', '애니키즈교육', 60, ''),
+        ('A', '11:00:00', '뉴스', '보도', DEFAULT_LAST_RUNTIME, ''),
+    ]
+
+
+def test_same_airtime_on_different_channels_is_not_merged():
+    frame = prepare_schedule_frame([
+        ['A', '10:00:00', '가', 'g'],
+        ['B', '10:00:00', '나', 'g'],
+    ])
+    assert list(frame['channel']) == ['A', 'B']
+    assert list(frame['runtime']) == [DEFAULT_LAST_RUNTIME, DEFAULT_LAST_RUNTIME]
+
+
+def test_midnight_wraparound():
+    frame = prepare_schedule_frame([
+        ['A', '23:30:00', '심야영화', '영화'],
+        ['A', '01:00:00', '재방송', '예능'],
+    ], next_day_first={'A': '05:00:00'})
+    assert list(frame['runtime']) == [90, 240]
+
+
+def test_last_slot_uses_next_day_first_airtime():
+    rows = [['A', '22:00:00', '가', 'g'], ['B', '23:00:00', '나', 'g']]
+    frame = prepare_schedule_frame(rows, next_day_first={'A': '05:00:00'})
+    assert list(frame['runtime']) == [420, DEFAULT_LAST_RUNTIME]
+    assert first_airtimes(rows) == {'A': '22:00:00', 'B': '23:00:00'}
+
+
+def test_malformed_airtime_row_is_dropped_and_runtime_spans_to_next_valid_slot(capsys):
+    frame = prepare_schedule_frame([
+        ['A', '06:00:00', '아침', '보도'],
+        ['A', '07:00', '깨진 시각', '예능'],
+        ['A', '08:00:00', '오전', '예능'],
+        ['B', None, '시각 없음', '예능'],
+    ])
+    # 깨진 행이 빠지면서 앞 슬롯의 러닝타임은 다음 정상 슬롯(08:00)까지
+    assert slots(frame) == [
+        ('A', '06:00:00', '아침', '보도', 120, ''),
+        ('A', '08:00:00', '오전', '예능', DEFAULT_LAST_RUNTIME, ''),
+    ]
+    assert '[편성표 시각 오류]' in capsys.readouterr().out
+
+
+def test_malformed_next_day_first_falls_back_to_default():
+    frame = prepare_schedule_frame([['A', '22:00:00', '가', 'g']], next_day_first={'A': 'bad'})
+    assert list(frame['runtime']) == [DEFAULT_LAST_RUNTIME]
+
+
+def test_all_rows_malformed_gives_empty_programs():
+    programs, episodes = frame_to_programs(prepare_schedule_frame([['A', '5:00', '가', 'g']]))
+    assert programs == [] and episodes == []
@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+from lib.utils.text_cleaning import clean_name, split_episode, clean_names, split_episodes
+
+from conftest import ROOT
+
+# benchmarks/bench_clean_name.py --update 가 변경 전 구현으로 만든 기대값
+GOLDEN_PATH = os.path.join(ROOT, 'benchmarks', 'golden', 'clean_name.csv')
+
+
+@pytest.fixture(scope='module')
+def golden():
+    return pd.read_csv(GOLDEN_PATH, encoding='utf-8-sig', keep_default_na=False, dtype=str)
+
+
+def test_golden_is_not_empty(golden):
+    assert len(golden) > 0
+
+
+def test_clean_name_matches_golden(golden):
+    mismatches = [
+        (raw, expected, clean_name(raw))
+        for raw, expected in zip(golden['input'], golden['clean_name'])
+        if clean_name(raw) != expected
+    ]
+    assert not mismatches, mismatches[:20]
+
+
+def test_split_episode_matches_golden(golden):
+    mismatches = [
+        (raw, (title, episode), split_episode(raw))
+        for raw, title, episode in zip(golden['input'], golden['title'], golden['episode'])
+        if split_episode(raw) != (title, episode)
+    ]
+    assert not mismatches, mismatches[:20]
+
+
+def test_batch_versions_match_golden(golden):
+    cleaned = clean_names(golden['input'])
+    split = split_episodes(golden['input'])
+    assert list(cleaned) == list(golden['clean_name'])
+    assert list(split['title']) == list(golden['title'])
+    assert list(split['episode']) == list(golden['episode'])